@@ -2,6 +2,7 @@
 
 from .database import DatabaseManager, DatabaseError, DatabaseStatus
 from .models import Session, Event, EventType
+from .retry import RetryPolicy, DeadlineExceeded
 from .settings import get_config
 
 __all__ = [
@@ -11,5 +12,7 @@ __all__ = [
     'Session',
     'Event',
     'EventType',
+    'RetryPolicy',
+    'DeadlineExceeded',
     'get_config'
 ]
\ No newline at end of file
@@ -10,7 +10,7 @@ import asyncio
 import aiosqlite
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from contextlib import asynccontextmanager
 from enum import Enum
@@ -23,6 +23,8 @@ except ImportError:
     SUPABASE_AVAILABLE = False
     Client = None
 
+from src.lib.json_codec import dumps_bytes, loads as json_loads
+from .retry import RetryPolicy, DeadlineExceeded
 from .models import (
     Session, Event, DATABASE_SCHEMA, SQLITE_SCHEMA,
     get_postgres_schema_sql, get_sqlite_schema_sql,
@@ -35,6 +37,76 @@ class DatabaseError(Exception):
     pass
 
 
+# Comparison operators accepted in select() filter dictionaries, mapped to SQL.
+# Names follow PostgREST so the same filters work against both backends.
+FILTER_OPERATORS = {
+    'eq': '=',
+    'neq': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+}
+
+
+def _normalize_filter(value: Any) -> Dict[str, Any]:
+    """
+    Expand a filter value into an operator dictionary.
+    
+    Shorthands: ``None`` means IS NULL, a list means IN, and any other
+    scalar means equality. Dictionaries are taken as explicit operators,
+    e.g. ``{'gte': start, 'lt': end}`` or ``{'is_null': False}``.
+    """
+    if value is None:
+        return {'is_null': True}
+    if isinstance(value, list):
+        return {'in': value}
+    if isinstance(value, dict):
+        for op in value:
+            if op not in FILTER_OPERATORS and op not in ('in', 'is_null'):
+                raise DatabaseError(f"Unsupported filter operator: {op}")
+        return value
+    return {'eq': value}
+
+
+def build_sqlite_where(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """Translate a select() filter dictionary into a SQL WHERE clause and params."""
+    conditions = []
+    params: List[Any] = []
+    
+    for key, value in (filters or {}).items():
+        for op, operand in _normalize_filter(value).items():
+            if op == 'is_null':
+                conditions.append(f"{key} IS NULL" if operand else f"{key} IS NOT NULL")
+            elif op == 'in':
+                if not operand:
+                    # An empty IN list can never match
+                    conditions.append("0")
+                    continue
+                placeholders = ','.join(['?' for _ in operand])
+                conditions.append(f"{key} IN ({placeholders})")
+                params.extend(operand)
+            else:
+                conditions.append(f"{key} {FILTER_OPERATORS[op]} ?")
+                params.append(operand)
+    
+    clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return clause, params
+
+
+def apply_supabase_filters(query, filters: Optional[Dict[str, Any]]):
+    """Apply a select() filter dictionary to a PostgREST query builder."""
+    for key, value in (filters or {}).items():
+        for op, operand in _normalize_filter(value).items():
+            if op == 'is_null':
+                query = query.is_(key, 'null') if operand else query.not_.is_(key, 'null')
+            elif op == 'in':
+                query = query.in_(key, operand)
+            else:
+                query = getattr(query, op)(key, operand)
+    return query
+
+
 class DatabaseStatus(Enum):
     """Database connection status."""
     HEALTHY = "healthy"
@@ -72,8 +144,15 @@ class DatabaseClient(ABC):
     
     @abstractmethod
     async def select(self, table: str, filters: Dict[str, Any] = None,
-                    limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
-        """Select records with optional filtering and pagination."""
+                    limit: int = None, offset: int = None,
+                    order_by: str = 'created_at',
+                    descending: bool = True) -> List[Dict[str, Any]]:
+        """
+        Select records with optional filtering, ordering and pagination.
+        
+        Filter values may be scalars (equality), lists (IN), ``None``
+        (IS NULL) or operator dictionaries such as ``{'gte': x, 'lt': y}``.
+        """
         pass
     
     @abstractmethod
@@ -218,7 +297,9 @@ class SupabaseClient(DatabaseClient):
             raise DatabaseError(f"Supabase bulk insert failed: {e}")
     
     async def select(self, table: str, filters: Dict[str, Any] = None,
-                    limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
+                    limit: int = None, offset: int = None,
+                    order_by: str = 'created_at',
+                    descending: bool = True) -> List[Dict[str, Any]]:
         """Select records from Supabase table."""
         if not self.connected:
             raise ConnectionError("Not connected to Supabase")
@@ -226,16 +307,12 @@ class SupabaseClient(DatabaseClient):
         try:
             query = self.client.table(table).select('*')
             
-            # Apply filters
-            if filters:
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        query = query.in_(key, value)
-                    else:
-                        query = query.eq(key, value)
+            # Apply filters server-side
+            query = apply_supabase_filters(query, filters)
             
-            # Apply ordering by created_at DESC
-            query = query.order('created_at', desc=True)
+            # Apply ordering
+            if order_by:
+                query = query.order(order_by, desc=descending)
             
             # Apply pagination
             if limit:
@@ -307,18 +384,48 @@ class SupabaseClient(DatabaseClient):
 
 
 class SQLiteClient(DatabaseClient):
-    """SQLite client implementation for local fallback."""
+    """
+    SQLite client implementation for local fallback.
+    
+    All writes go through a single writer task that drains a bounded queue
+    and commits in groups (by ``batch_size`` or ``batch_interval_ms``), so
+    concurrent producers share one fsync per batch instead of one per row.
+    A write's awaitable only resolves after its batch has committed. Reads
+    use a small pool of read-only WAL connections so selects don't queue
+    behind writes. In-memory databases can't be shared across connections,
+    so they read from the writer connection instead.
+    """
     
-    def __init__(self, db_path: str = "chronicle.db"):
+    def __init__(self, db_path: str = "chronicle.db",
+                 batch_size: int = 100,
+                 batch_interval_ms: float = 5.0,
+                 max_queue_size: int = 1000,
+                 read_pool_size: int = 4):
         self.db_path = Path(db_path)
         self.connection: Optional[aiosqlite.Connection] = None
         self.connected = False
         
+        # Writer configuration
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = max(0.0, batch_interval_ms) / 1000.0
+        self.max_queue_size = max_queue_size
+        self.read_pool_size = read_pool_size
+        
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self.write_stats = {"batches": 0, "operations": 0, "errors": 0}
+    
+    @property
+    def _is_memory(self) -> bool:
+        return str(self.db_path) == ":memory:"
+    
     async def connect(self) -> bool:
         """Establish connection to SQLite database."""
         try:
             # Handle in-memory database
-            if str(self.db_path) == ":memory:":
+            if self._is_memory:
                 self.connection = await aiosqlite.connect(":memory:")
             else:
                 # Ensure directory exists
@@ -327,12 +434,19 @@ class SQLiteClient(DatabaseClient):
             
             # Enable foreign keys and WAL mode for better performance
             await self.connection.execute("PRAGMA foreign_keys = ON")
-            if str(self.db_path) != ":memory:":
+            if not self._is_memory:
                 await self.connection.execute("PRAGMA journal_mode = WAL")
+                # WAL is crash-safe at NORMAL; FULL would fsync every commit
+                await self.connection.execute("PRAGMA synchronous = NORMAL")
             
             # Initialize schema
             await self._initialize_schema()
             
+            await self._open_reader_pool()
+            
+            self._write_queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            
             self.connected = True
             return True
             
@@ -341,8 +455,48 @@ class SQLiteClient(DatabaseClient):
             self.connected = False
             return False
     
+    async def _open_reader_pool(self) -> None:
+        """Open read-only connections for concurrent selects (file databases only)."""
+        if self._is_memory or self.read_pool_size <= 0:
+            return
+        
+        self._reader_pool = asyncio.Queue()
+        uri = f"file:{self.db_path.resolve()}?mode=ro"
+        for _ in range(self.read_pool_size):
+            reader = await aiosqlite.connect(uri, uri=True)
+            await reader.execute("PRAGMA query_only = ON")
+            self._readers.append(reader)
+            self._reader_pool.put_nowait(reader)
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a read connection, falling back to the writer connection."""
+        if self._reader_pool is None:
+            yield self.connection
+            return
+        
+        reader = await self._reader_pool.get()
+        try:
+            yield reader
+        finally:
+            self._reader_pool.put_nowait(reader)
+    
     async def disconnect(self) -> None:
-        """Close SQLite connection."""
+        """Flush pending writes and close SQLite connections."""
+        if self._writer_task:
+            if not self._writer_task.done():
+                # Sentinel lets the writer drain everything queued before it
+                await self._write_queue.put(None)
+            # Waits without raising if the writer was cancelled
+            await asyncio.wait([self._writer_task])
+            self._writer_task = None
+            self._write_queue = None
+        
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._reader_pool = None
+        
         if self.connection:
             await self.connection.close()
             self.connection = None
@@ -364,7 +518,7 @@ class SQLiteClient(DatabaseClient):
         """Initialize database schema for Chronicle tables."""
         # Execute PRAGMA statements first
         await self.connection.execute("PRAGMA foreign_keys = ON")
-        if str(self.db_path) != ":memory:":
+        if not self._is_memory:
             await self.connection.execute("PRAGMA journal_mode = WAL")
         
         # Create tables
@@ -378,6 +532,144 @@ class SQLiteClient(DatabaseClient):
         
         await self.connection.commit()
     
+    async def _write(self, query: str, params: Any = (), many: bool = False) -> int:
+        """
+        Queue a write for the writer task and wait until its batch commits.
+        
+        Blocks (backpressure) while the queue is full.
+        
+        Returns:
+            Number of rows affected
+        """
+        if self._writer_task is None or self._writer_task.done():
+            raise DatabaseError("SQLite writer is not running")
+        
+        future = asyncio.get_running_loop().create_future()
+        write_queue = self._write_queue
+        await write_queue.put((query, params, many, future))
+        if self._writer_task is None or self._writer_task.done():
+            # The writer stopped while this write waited for queue space
+            self._fail_queued(write_queue)
+        return await future
+    
+    def _fail_queued(self, write_queue: asyncio.Queue) -> None:
+        """Fail every write still queued once the writer has stopped."""
+        while True:
+            try:
+                item = write_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if item is not None:
+                self._fail_batch([item], DatabaseError("SQLite writer stopped"))
+    
+    def _fail_batch(self, batch: List[tuple], error: Exception) -> None:
+        for _, _, _, future in batch:
+            if not future.done():
+                self.write_stats["errors"] += 1
+                future.set_exception(error)
+    
+    async def _writer_loop(self) -> None:
+        """Drain the write queue, committing each batch in one transaction."""
+        loop = asyncio.get_running_loop()
+        write_queue = self._write_queue
+        batch: List[tuple] = []
+        stopping = False
+        
+        try:
+            while not stopping:
+                batch = []
+                stopping = await self._gather_batch(loop, write_queue, batch)
+                if not batch:
+                    continue
+                try:
+                    await self._commit_batch(batch)
+                except Exception as e:
+                    # Fail this batch's writers but keep serving later writes
+                    self._fail_batch(batch, DatabaseError(f"SQLite batch write failed: {e}"))
+                    await self._abandon_transaction()
+        finally:
+            # Cancelled or stopping: nobody may be left waiting on a future
+            self._fail_batch(batch, DatabaseError("SQLite writer stopped"))
+            self._fail_queued(write_queue)
+    
+    async def _gather_batch(self, loop, write_queue: asyncio.Queue, batch: List[tuple]) -> bool:
+        """
+        Collect queued writes into batch.
+        
+        Returns:
+            True once the stop sentinel has been taken from the queue
+        """
+        item = await write_queue.get()
+        if item is None:
+            return True
+        batch.append(item)
+        
+        # Gather more work until the batch is full or the window closes
+        deadline = loop.time() + self.batch_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = write_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(write_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+    
+    async def _abandon_transaction(self) -> None:
+        """Roll back whatever a failed batch left open, if the connection allows."""
+        try:
+            if self.connection.in_transaction:
+                await self.connection.rollback()
+        except Exception:
+            pass  # The next batch reports a connection that is unusable
+    
+    async def _commit_batch(self, batch: List[tuple]) -> None:
+        """
+        Execute a batch of writes in one transaction and commit once.
+        
+        Each write runs in its own savepoint, so a failing write (including
+        a failing row of an executemany) leaves none of its rows behind
+        while the rest of the batch still commits.
+        """
+        results = []
+        await self.connection.execute("BEGIN")
+        for query, params, many, future in batch:
+            await self.connection.execute("SAVEPOINT queued_write")
+            try:
+                if many:
+                    cursor = await self.connection.executemany(query, params)
+                else:
+                    cursor = await self.connection.execute(query, params)
+                results.append((future, cursor.rowcount, None))
+            except Exception as e:
+                await self.connection.execute("ROLLBACK TO queued_write")
+                results.append((future, None, e))
+            await self.connection.execute("RELEASE queued_write")
+        
+        try:
+            await self.connection.commit()
+        except Exception as e:
+            await self._abandon_transaction()
+            results = [(future, None, error or e) for future, _, error in results]
+        
+        self.write_stats["batches"] += 1
+        self.write_stats["operations"] += len(batch)
+        for future, rowcount, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                self.write_stats["errors"] += 1
+                future.set_exception(error)
+            else:
+                future.set_result(rowcount)
+    
     async def insert(self, table: str, data: Dict[str, Any]) -> Optional[str]:
         """Insert data into SQLite table."""
         if not self.connected:
@@ -400,13 +692,12 @@ class SQLiteClient(DatabaseClient):
             processed_data = self._serialize_data(clean_data)
             
             columns = list(processed_data.keys())
-            placeholders = ['?' for _ in columns]
             values = list(processed_data.values())
+            placeholders = [self._placeholder(value) for value in values]
             
             query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
             
-            await self.connection.execute(query, values)
-            await self.connection.commit()
+            await self._write(query, values)
             
             return clean_data['id']
             
@@ -443,15 +734,14 @@ class SQLiteClient(DatabaseClient):
             
             # Get column names from first record
             columns = list(processed_records[0].keys())
-            placeholders = ['?' for _ in columns]
+            placeholders = [self._placeholder(value) for value in processed_records[0].values()]
             
             query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
             
             # Prepare values for executemany
             values_list = [list(record.values()) for record in processed_records]
             
-            await self.connection.executemany(query, values_list)
-            await self.connection.commit()
+            await self._write(query, values_list, many=True)
             
             return ids
             
@@ -459,32 +749,20 @@ class SQLiteClient(DatabaseClient):
             raise DatabaseError(f"SQLite bulk insert failed: {e}")
     
     async def select(self, table: str, filters: Dict[str, Any] = None,
-                    limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
+                    limit: int = None, offset: int = None,
+                    order_by: str = 'created_at',
+                    descending: bool = True) -> List[Dict[str, Any]]:
         """Select records from SQLite table."""
         if not self.connected:
             raise ConnectionError("Not connected to SQLite")
         
         try:
-            query = f"SELECT * FROM {table}"
-            params = []
-            
-            # Apply filters
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        placeholders = ','.join(['?' for _ in value])
-                        conditions.append(f"{key} IN ({placeholders})")
-                        params.extend(value)
-                    else:
-                        conditions.append(f"{key} = ?")
-                        params.append(value)
-                
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
+            where_clause, params = build_sqlite_where(filters)
+            query = f"SELECT * FROM {table}{where_clause}"
             
             # Apply ordering
-            query += " ORDER BY created_at DESC"
+            if order_by:
+                query += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
             
             # Apply pagination
             if limit:
@@ -492,8 +770,9 @@ class SQLiteClient(DatabaseClient):
             if offset:
                 query += f" OFFSET {offset}"
             
-            cursor = await self.connection.execute(query, params)
-            rows = await cursor.fetchall()
+            async with self._reader() as conn:
+                cursor = await conn.execute(query, params)
+                rows = await cursor.fetchall()
             
             # Convert rows to dictionaries and deserialize JSON fields
             columns = [description[0] for description in cursor.description]
@@ -519,15 +798,14 @@ class SQLiteClient(DatabaseClient):
             processed_data = self._serialize_data(clean_data)
             
             columns = list(processed_data.keys())
-            set_clause = ', '.join([f"{col} = ?" for col in columns])
+            set_clause = ', '.join([f"{col} = {self._placeholder(value)}" for col, value in processed_data.items()])
             values = list(processed_data.values()) + [record_id]
             
             query = f"UPDATE {table} SET {set_clause} WHERE id = ?"
             
-            cursor = await self.connection.execute(query, values)
-            await self.connection.commit()
+            rowcount = await self._write(query, values)
             
-            return cursor.rowcount > 0
+            return rowcount > 0
             
         except Exception as e:
             raise DatabaseError(f"SQLite update failed: {e}")
@@ -538,10 +816,9 @@ class SQLiteClient(DatabaseClient):
             raise ConnectionError("Not connected to SQLite")
         
         try:
-            cursor = await self.connection.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
-            await self.connection.commit()
+            rowcount = await self._write(f"DELETE FROM {table} WHERE id = ?", (record_id,))
             
-            return cursor.rowcount > 0
+            return rowcount > 0
             
         except Exception as e:
             raise DatabaseError(f"SQLite delete failed: {e}")
@@ -552,11 +829,11 @@ class SQLiteClient(DatabaseClient):
             raise ConnectionError("Not connected to SQLite")
         
         try:
-            cursor = await self.connection.execute(query, params or ())
-            
             # Handle different query types
             if query.strip().upper().startswith(('SELECT', 'PRAGMA')):
-                rows = await cursor.fetchall()
+                async with self._reader() as conn:
+                    cursor = await conn.execute(query, params or ())
+                    rows = await cursor.fetchall()
                 
                 # Convert to dictionaries
                 if cursor.description:
@@ -571,20 +848,25 @@ class SQLiteClient(DatabaseClient):
                 else:
                     return []
             else:
-                # Non-SELECT queries
-                await self.connection.commit()
+                # Non-SELECT queries go through the writer
+                await self._write(query, params or ())
                 return []
             
         except Exception as e:
             raise DatabaseError(f"SQLite query execution failed: {e}")
     
+    @staticmethod
+    def _placeholder(value: Any) -> str:
+        """Bind JSON bytes as TEXT so they are stored without a str round trip."""
+        return 'CAST(? AS TEXT)' if isinstance(value, bytes) else '?'
+    
     def _serialize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Serialize complex data types to JSON strings for SQLite."""
+        """Serialize complex data types to UTF-8 JSON bytes for SQLite."""
         serialized = {}
         
         for key, value in data.items():
             if isinstance(value, (dict, list)) and key == 'data':
-                serialized[key] = json.dumps(value)
+                serialized[key] = dumps_bytes(value)
             else:
                 serialized[key] = value
         
@@ -597,7 +879,7 @@ class SQLiteClient(DatabaseClient):
         for key, value in data.items():
             if isinstance(value, str) and key == 'data':
                 try:
-                    deserialized[key] = json.loads(value)
+                    deserialized[key] = json_loads(value)
                 except (json.JSONDecodeError, TypeError):
                     deserialized[key] = {}
             else:
@@ -614,7 +896,8 @@ class DatabaseManager:
     """Database manager with automatic failover between Supabase and SQLite."""
     
     def __init__(self, supabase_config: Dict[str, str] = None, 
-                 sqlite_path: str = "chronicle.db"):
+                 sqlite_path: str = "chronicle.db",
+                 retry_policy: Optional[RetryPolicy] = None):
         self.primary_client = None
         if supabase_config and SUPABASE_AVAILABLE:
             try:
@@ -625,6 +908,7 @@ class DatabaseManager:
         self.fallback_client = SQLiteClient(sqlite_path)
         self.current_client: Optional[DatabaseClient] = None
         self.status = DatabaseStatus.FAILED
+        self.retry_policy = retry_policy or RetryPolicy()
         
     async def initialize(self) -> bool:
         """Initialize database connections with failover logic."""
@@ -688,50 +972,64 @@ class DatabaseManager:
         self.status = DatabaseStatus.FAILED
         return self.status
     
-    async def execute_with_retry(self, operation, *args, **kwargs):
-        """Execute database operation with automatic retry and failover."""
-        max_retries = 3
-        retry_delay = 1  # seconds
+    async def execute_with_retry(self, operation, *args, idempotent: bool = True,
+                                 timeout: Optional[float] = None, **kwargs):
+        """
+        Execute database operation with deadline-aware retry and failover.
         
-        for attempt in range(max_retries):
-            try:
-                if not self.current_client:
-                    await self.initialize()
-                
-                if not self.current_client:
-                    raise DatabaseError("No available database clients")
-                
-                return await operation(self.current_client, *args, **kwargs)
-                
-            except Exception as e:
-                print(f"Database operation failed (attempt {attempt + 1}): {e}")
-                
-                if attempt < max_retries - 1:
-                    # Try to switch clients
-                    await self.health_check()
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                else:
-                    raise DatabaseError(f"Database operation failed after {max_retries} attempts: {e}")
+        Args:
+            operation: Callable taking (client, *args, **kwargs)
+            idempotent: Only idempotent operations are retried or hedged
+            timeout: Time budget in seconds; defaults to the policy's timeout
+        """
+        async def attempt():
+            if not self.current_client:
+                await self.initialize()
+            
+            if not self.current_client:
+                raise DatabaseError("No available database clients")
+            
+            return await operation(self.current_client, *args, **kwargs)
+        
+        async def on_failure(error: Exception):
+            print(f"Database operation failed, retrying: {error}")
+            # Try to switch clients
+            await self.health_check()
+        
+        try:
+            return await self.retry_policy.run(
+                attempt, idempotent=idempotent, timeout=timeout, on_failure=on_failure
+            )
+        except DatabaseError:
+            raise
+        except DeadlineExceeded as e:
+            raise DatabaseError(f"Database operation timed out: {e}")
+        except Exception as e:
+            raise DatabaseError(f"Database operation failed: {e}")
     
     # Convenience methods with retry and failover
     async def insert(self, table: str, data: Dict[str, Any]) -> Optional[str]:
         """Insert with retry and failover."""
+        # Not idempotent: a retry after an ambiguous failure could duplicate rows
         return await self.execute_with_retry(
-            lambda client, t, d: client.insert(t, d), table, data
+            lambda client, t, d: client.insert(t, d), table, data,
+            idempotent=False
         )
     
     async def bulk_insert(self, table: str, data: List[Dict[str, Any]]) -> List[str]:
         """Bulk insert with retry and failover."""
         return await self.execute_with_retry(
-            lambda client, t, d: client.bulk_insert(t, d), table, data
+            lambda client, t, d: client.bulk_insert(t, d), table, data,
+            idempotent=False
         )
     
     async def select(self, table: str, filters: Dict[str, Any] = None,
-                    limit: int = None, offset: int = None) -> List[Dict[str, Any]]:
+                    limit: int = None, offset: int = None,
+                    order_by: str = 'created_at',
+                    descending: bool = True) -> List[Dict[str, Any]]:
         """Select with retry and failover."""
         return await self.execute_with_retry(
-            lambda client, t, f, l, o: client.select(t, f, l, o), 
+            lambda client, t, f, l, o: client.select(t, f, l, o, order_by, descending),
             table, filters, limit, offset
         )
     
@@ -756,7 +1054,8 @@ class DatabaseManager:
         return {
             "status": self.status.value,
             "client_type": self.current_client.client_type,
-            "healthy": await self.current_client.health_check()
+            "healthy": await self.current_client.health_check(),
+            "retry_metrics": dict(self.retry_policy.metrics)
         }
     
     async def close(self) -> None:
@@ -792,19 +1091,19 @@ async def create_event(event_data: Dict[str, Any], db_manager: DatabaseManager)
 async def get_session_events(session_id: str, db_manager: DatabaseManager,
                            event_types: List[str] = None,
                            limit: int = 100) -> List[Dict[str, Any]]:
-    """Get events for a specific session."""
+    """Get events for a specific session, newest first."""
     filters = {'session_id': session_id}
     if event_types:
-        # For multiple event types, we'll need to query each separately in SQLite
-        # or use a custom query for more complex filtering
-        pass
+        filters['event_type'] = list(event_types)
     
-    return await db_manager.select('events', filters, limit=limit)
+    # Served by idx_events_session_timestamp
+    return await db_manager.select('events', filters, limit=limit, order_by='timestamp')
 
 
-async def get_active_sessions(db_manager: DatabaseManager) -> List[Dict[str, Any]]:
-    """Get all active sessions (end_time is null)."""
-    # This would require a custom query for null checks
-    # For now, return all sessions and filter in Python
-    all_sessions = await db_manager.select('sessions')
-    return [s for s in all_sessions if s.get('end_time') is None]
\ No newline at end of file
+async def get_active_sessions(db_manager: DatabaseManager,
+                              limit: int = None) -> List[Dict[str, Any]]:
+    """Get all active sessions (end_time is null), most recently started first."""
+    # Served by the idx_sessions_active partial index
+    return await db_manager.select(
+        'sessions', {'end_time': None}, limit=limit, order_by='start_time'
+    )
\ No newline at end of file
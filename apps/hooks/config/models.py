@@ -10,6 +10,8 @@ from datetime import datetime
 from uuid import uuid4
 import json
 
+from src.lib.json_codec import dumps as json_dumps, loads as json_loads
+
 
 @dataclass
 class Session:
@@ -87,7 +89,7 @@ class Event:
         
         # Ensure data is JSON serializable
         if isinstance(result.get('data'), dict):
-            result['data'] = json.dumps(result['data'])
+            result['data'] = json_dumps(result['data'])
         
         return result
     
@@ -97,7 +99,7 @@ class Event:
         # Handle JSON data field
         if isinstance(data.get('data'), str):
             try:
-                data['data'] = json.loads(data['data'])
+                data['data'] = json_loads(data['data'])
             except (json.JSONDecodeError, TypeError):
                 data['data'] = {}
         
@@ -228,6 +230,7 @@ DATABASE_SCHEMA = {
             'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_claude_session_id ON sessions(claude_session_id)',
             'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_project_path ON sessions(project_path)',
             'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_start_time ON sessions(start_time DESC)',
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_active ON sessions(start_time DESC) WHERE end_time IS NULL',
         ]
     },
     'events': {
@@ -286,6 +289,7 @@ SQLITE_SCHEMA = {
         'CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type)',
         'CREATE INDEX IF NOT EXISTS idx_events_tool_name ON events(tool_name)',
         'CREATE INDEX IF NOT EXISTS idx_sessions_claude_session_id ON sessions(claude_session_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_active ON sessions(start_time DESC) WHERE end_time IS NULL',
     ]
 }
 
@@ -0,0 +1,200 @@
+"""
+Deadline-aware retry and hedging for Chronicle database operations.
+
+Hooks run under a hard 5-10 second timeout, so retries are budgeted
+against the caller's remaining deadline rather than a fixed schedule.
+Backoff comes from ``RetryConfig`` (exponential with jitter), only
+idempotent operations are retried, and slow idempotent operations can
+optionally be hedged with a second concurrent attempt.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    from src.lib.errors import RetryConfig
+except ImportError:
+    # Hook scripts put src/ rather than the app root on sys.path
+    from lib.errors import RetryConfig
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an operation's time budget runs out."""
+    pass
+
+
+class RetryPolicy:
+    """
+    Retry/hedge policy bounded by a per-call deadline.
+    
+    Every decision (retry, give up, hedge) is counted in ``metrics`` so
+    it can be reported alongside the other database statistics.
+    """
+    
+    def __init__(self, retry_config: Optional[RetryConfig] = None,
+                 default_timeout: float = 5.0,
+                 hedge: bool = False,
+                 hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 latency_window: int = 200):
+        """
+        Args:
+            retry_config: Attempt count and backoff schedule
+            default_timeout: Budget in seconds when the caller gives no deadline
+            hedge: Send a second attempt when the first runs past the latency quantile
+            hedge_quantile: Latency quantile that triggers a hedge
+            hedge_min_samples: Observations needed before hedging is enabled
+            latency_window: Number of recent latencies kept for the quantile
+        """
+        self.retry_config = retry_config or RetryConfig(
+            max_attempts=3, base_delay=0.25, max_delay=2.0, jitter=True
+        )
+        self.default_timeout = default_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=latency_window)
+        self.metrics: Dict[str, int] = {
+            "calls": 0,
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "not_retried_non_idempotent": 0,
+            "not_retried_deadline": 0,
+            "not_retried_exhausted": 0,
+            "attempt_timeouts": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+        }
+    
+    def hedge_threshold(self) -> Optional[float]:
+        """Latency (seconds) after which a hedge is sent, or None if unknown."""
+        if len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_quantile))
+        return ordered[index]
+    
+    async def run(self, operation: Callable[[], Awaitable[Any]],
+                  idempotent: bool = True,
+                  timeout: Optional[float] = None,
+                  deadline: Optional[float] = None,
+                  on_failure: Optional[Callable[[Exception], Awaitable[Any]]] = None) -> Any:
+        """
+        Run an operation under the policy.
+        
+        Args:
+            operation: Zero-argument coroutine factory; called once per attempt
+            idempotent: Whether the operation is safe to repeat
+            timeout: Budget in seconds (ignored if deadline is given)
+            deadline: Absolute ``time.monotonic()`` deadline
+            on_failure: Awaited after a failed attempt that will be retried
+                (e.g. to fail over to another client), within the budget
+                left after the backoff; running out means no retry
+        
+        Returns:
+            The operation's result
+        
+        Raises:
+            The last attempt's exception, or DeadlineExceeded if the budget
+            ran out before any attempt finished
+        """
+        if deadline is None:
+            deadline = time.monotonic() + (timeout if timeout is not None else self.default_timeout)
+        
+        self.metrics["calls"] += 1
+        max_attempts = self.retry_config.max_attempts if idempotent else 1
+        last_error: Optional[Exception] = None
+        
+        for attempt in range(max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.metrics["not_retried_deadline"] += 1
+                break
+            
+            try:
+                result = await self._attempt(operation, remaining, idempotent)
+                self.metrics["successes"] += 1
+                return result
+            except asyncio.TimeoutError:
+                self.metrics["attempt_timeouts"] += 1
+                last_error = DeadlineExceeded(f"Operation exceeded its {remaining:.2f}s budget")
+            except Exception as e:
+                last_error = e
+            
+            if not idempotent:
+                self.metrics["not_retried_non_idempotent"] += 1
+                break
+            if attempt == max_attempts - 1:
+                self.metrics["not_retried_exhausted"] += 1
+                break
+            
+            delay = self.retry_config.get_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                # Sleeping would leave no time for another attempt
+                self.metrics["not_retried_deadline"] += 1
+                break
+            
+            if on_failure:
+                try:
+                    # Failover may only use the budget left after the backoff
+                    await asyncio.wait_for(on_failure(last_error), deadline - delay - time.monotonic())
+                except asyncio.TimeoutError:
+                    self.metrics["not_retried_deadline"] += 1
+                    break
+            self.metrics["retries"] += 1
+            await asyncio.sleep(delay)
+        
+        self.metrics["failures"] += 1
+        raise last_error or DeadlineExceeded("No time left to attempt operation")
+    
+    async def _attempt(self, operation: Callable[[], Awaitable[Any]],
+                       budget: float, idempotent: bool) -> Any:
+        """Single attempt, hedged if enabled and the operation is idempotent."""
+        start = time.monotonic()
+        self.metrics["attempts"] += 1
+        
+        threshold = self.hedge_threshold() if (self.hedge and idempotent) else None
+        if threshold is None or threshold >= budget:
+            result = await asyncio.wait_for(operation(), budget)
+        else:
+            result = await self._hedged(operation, threshold, start + budget)
+        
+        self.latencies.append(time.monotonic() - start)
+        return result
+    
+    async def _hedged(self, operation: Callable[[], Awaitable[Any]],
+                      threshold: float, deadline: float) -> Any:
+        """Start a backup request if the primary is slower than threshold."""
+        primary = asyncio.ensure_future(operation())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done:
+                self.metrics["hedges_sent"] += 1
+                tasks.add(asyncio.ensure_future(operation()))
+            
+            while tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, _ = await asyncio.wait(
+                    tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics["hedges_won"] += 1
+                        return task.result()
+                    if not tasks:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
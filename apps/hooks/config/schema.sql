@@ -39,6 +39,10 @@ ON chronicle_sessions(project_path);
 CREATE INDEX IF NOT EXISTS idx_chronicle_sessions_start_time 
 ON chronicle_sessions(start_time DESC);
 
+-- Partial index so active-session lookups don't scan ended sessions
+CREATE INDEX IF NOT EXISTS idx_chronicle_sessions_active 
+ON chronicle_sessions(start_time DESC) WHERE end_time IS NULL;
+
 CREATE INDEX IF NOT EXISTS idx_chronicle_events_session_timestamp 
 ON chronicle_events(session_id, timestamp DESC);
 
@@ -42,6 +42,10 @@ ON sessions(project_path);
 CREATE INDEX IF NOT EXISTS idx_sessions_start_time 
 ON sessions(start_time DESC);
 
+-- Partial index so active-session lookups don't scan ended sessions
+CREATE INDEX IF NOT EXISTS idx_sessions_active 
+ON sessions(start_time DESC) WHERE end_time IS NULL;
+
 -- Performance indexes for events
 CREATE INDEX IF NOT EXISTS idx_events_session_id 
 ON events(session_id);
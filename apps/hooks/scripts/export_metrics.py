@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Export Chronicle hook and storage metrics for Prometheus.
+
+Reads the cross-process metrics that hooks persist at exit (see
+src/lib/latency_store.py) and exposes them either as a textfile for
+node_exporter's textfile collector or on a local HTTP /metrics endpoint.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lib.latency_store import LatencyStore
+from src.lib.metrics_exporter import MetricsExporter, serve_metrics
+
+
+def main():
+    """Write or serve the metrics."""
+    parser = argparse.ArgumentParser(description="Export Chronicle metrics in OpenMetrics format")
+    parser.add_argument("--db", help="Metrics store path (default: CHRONICLE_PERF_DB or data/perf.db)")
+    parser.add_argument("--textfile", help="Write Prometheus text to this .prom file")
+    parser.add_argument("--interval", type=float, default=0, help="Rewrite the textfile every N seconds")
+    parser.add_argument("--serve", action="store_true", help="Serve /metrics over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=9464, help="HTTP port")
+    args = parser.parse_args()
+    
+    exporter = MetricsExporter(store=LatencyStore(args.db))
+    
+    if args.serve:
+        server = serve_metrics(exporter, args.host, args.port)
+        print(f"Serving Chronicle metrics on http://{args.host}:{args.port}/metrics")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+        return
+    
+    if not args.textfile:
+        print(exporter.render(), end="")
+        return
+    
+    while True:
+        path = exporter.write_textfile(args.textfile)
+        if args.interval <= 0:
+            print(f"Metrics written to {path}")
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Report hook latency percentiles from the persistent histogram store.
+
+Every hook invocation records its timings into a shared histogram file
+(see src/lib/latency_store.py). This script merges them and prints
+p50/p95/p99 per hook and phase, so the 100ms budget can be checked
+across real usage rather than a single run.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lib.latency_store import LatencyStore
+
+
+def print_report(rows, budget_ms):
+    """Pretty print latency summaries."""
+    print("\n" + "=" * 96)
+    print(f"Chronicle Hook Latency (budget {budget_ms:.0f}ms)")
+    print("=" * 96)
+    print(f"{'hook':<20} {'phase':<22} {'count':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'>budget':>8}")
+    print("-" * 96)
+    
+    for row in rows:
+        print(
+            f"{row['hook']:<20} {row['phase']:<22} {row['count']:>8} "
+            f"{row['p50_ms']:>8.2f}ms {row['p95_ms']:>8.2f}ms {row['p99_ms']:>8.2f}ms "
+            f"{row['max_ms']:>8.2f}ms {row['over_budget_pct']:>7.1f}%"
+        )
+
+
+def main():
+    """Print the latency report."""
+    parser = argparse.ArgumentParser(description="Report hook latency percentiles")
+    parser.add_argument("--db", help="Histogram store path (default: CHRONICLE_PERF_DB or data/perf.db)")
+    parser.add_argument("--hook", help="Only report this hook")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Latency budget to check against")
+    parser.add_argument("--json", action="store_true", help="Output JSON instead of a table")
+    parser.add_argument("--reset", action="store_true", help="Clear the store after reporting")
+    args = parser.parse_args()
+    
+    store = LatencyStore(args.db)
+    rows = store.report(hook=args.hook, budget_ms=args.budget_ms)
+    
+    if args.json:
+        print(json.dumps({"db_path": str(store.db_path), "budget_ms": args.budget_ms, "latency": rows}, indent=2))
+    elif not rows:
+        print(f"No latency data recorded in {store.db_path}")
+    else:
+        print_report(rows, args.budget_ms)
+    
+    if args.reset:
+        store.reset()
+    
+    # Non-zero exit when any hook's p95 is over budget, for use in CI checks
+    over_budget = [row for row in rows if row["phase"] == "total" and row["p95_ms"] > args.budget_ms]
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Merge hook profiles into one flamegraph-ready collapsed-stack file.
+
+With CHRONICLE_PROFILE set, hook processes write a profile per invocation
+(see src/lib/profiling.py). This script sums them, CPU samples from the
+.collapsed files or retained bytes from the .mem.json files, into
+"frame;frame;frame count" lines for flamegraph.pl, inferno or speedscope.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.lib.profiling import (
+    COLLAPSED_SUFFIX, MEMORY_SUFFIX, list_profiles, merge_collapsed, merge_memory, profile_hook_name
+)
+from src.lib.utils import get_chronicle_data_dir
+
+
+def main():
+    """Write the merged profile."""
+    parser = argparse.ArgumentParser(description="Merge hook profiles into collapsed stacks")
+    parser.add_argument("--dir", help="Profile directory (default: CHRONICLE_PROFILE_DIR or data/profiles)")
+    parser.add_argument("--mode", choices=["cpu", "mem"], default="cpu",
+                        help="Merge CPU samples or retained memory in bytes")
+    parser.add_argument("--hook", help="Only merge profiles of this hook")
+    parser.add_argument("--by-hook", action="store_true", help="Root each stack at its hook's name")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+    
+    profile_dir = Path(args.dir or os.getenv("CHRONICLE_PROFILE_DIR") or get_chronicle_data_dir() / "profiles")
+    if not profile_dir.is_dir():
+        print(f"No profiles in {profile_dir}", file=sys.stderr)
+        sys.exit(1)
+    
+    suffix = COLLAPSED_SUFFIX if args.mode == "cpu" else MEMORY_SUFFIX
+    paths = [path for path in list_profiles(profile_dir, suffix)
+             if not args.hook or profile_hook_name(path) == args.hook]
+    if not paths:
+        print(f"No {args.mode} profiles in {profile_dir}", file=sys.stderr)
+        sys.exit(1)
+    
+    merge = merge_collapsed if args.mode == "cpu" else merge_memory
+    lines = "".join(f"{stack} {count}\n" for stack, count in merge(paths, by_hook=args.by_hook).most_common())
+    
+    if args.output:
+        Path(args.output).write_text(lines)
+        print(f"Merged {len(paths)} profiles into {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(lines)
+
+
+if __name__ == "__main__":
+    main()
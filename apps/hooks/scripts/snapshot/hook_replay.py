@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Chronicle Snapshot Hook Replay
+
+Replays captured snapshot sessions through the real hook classes
+(SessionStartHook, PreToolUseHook, PostToolUseHook, ...) as a
+production-shaped load generator. Each snapshot event is turned back into
+the stdin payload Claude Code would have sent, and every session runs
+concurrently while keeping its original inter-arrival times divided by an
+acceleration factor.
+
+Reports per-hook latency and schedule lateness: how far behind the
+recorded timeline each call started. Lateness that keeps growing means the
+storage path cannot sustain that load.
+"""
+
+import os
+import sys
+import json
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the hooks src directory to path so hook modules import as in production
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from lib.latency_store import LatencyHistogram
+from lib.lazy_json import LazyJSONObject
+from snapshot_format import load_snapshot
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Hook event name -> (script under src/hooks, class)
+HOOK_CLASSES = {
+    "SessionStart": ("session_start", "SessionStartHook"),
+    "UserPromptSubmit": ("user_prompt_submit", "UserPromptSubmitHook"),
+    "PreToolUse": ("pre_tool_use", "PreToolUseHook"),
+    "PostToolUse": ("post_tool_use", "PostToolUseHook"),
+    "Notification": ("notification", "NotificationHook"),
+    "Stop": ("stop", "StopHook"),
+    "SubagentStop": ("subagent_stop", "SubagentStopHook"),
+    "PreCompact": ("pre_compact", "PreCompactHook"),
+}
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 timestamp, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _tool_response(data: Dict[str, Any]) -> Any:
+    """The recorded tool response, or a stand-in of the recorded size."""
+    for key in ("tool_response", "tool_output"):
+        if key in data:
+            return data[key]
+    if data.get("error"):
+        return {"error": data["error"]}
+    return {"content": "x" * int(data.get("result_size") or 0)}
+
+
+def event_to_payloads(event: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Hook stdin payloads that would have produced a snapshot event.
+    
+    Legacy tool_use events become a PreToolUse/PostToolUse pair. Unknown
+    event types produce no payloads.
+    
+    Returns:
+        List of (hook_event_name, payload) without session fields
+    """
+    data = event.get("data") or {}
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            data = {}
+    event_type = event.get("event_type")
+    tool_name = data.get("tool_name") or event.get("tool_name") or "Unknown"
+    tool_input = data.get("tool_input") or {}
+    
+    if event_type == "pre_tool_use":
+        return [("PreToolUse", {"tool_name": tool_name, "tool_input": tool_input})]
+    if event_type == "post_tool_use":
+        return [("PostToolUse", {"tool_name": tool_name, "tool_input": tool_input, "tool_response": _tool_response(data)})]
+    if event_type == "tool_use":
+        return [
+            ("PreToolUse", {"tool_name": tool_name, "tool_input": tool_input}),
+            ("PostToolUse", {"tool_name": tool_name, "tool_input": tool_input, "tool_response": _tool_response(data)}),
+        ]
+    if event_type in ("user_prompt_submit", "prompt"):
+        return [("UserPromptSubmit", {"prompt": data.get("prompt_text") or data.get("prompt") or ""})]
+    if event_type == "session_start":
+        return [("SessionStart", {"source": data.get("source") or "startup"})]
+    if event_type in ("stop", "session_end"):
+        return [("Stop", {"stop_hook_active": False})]
+    if event_type == "subagent_stop":
+        return [("SubagentStop", {"stop_hook_active": False})]
+    if event_type == "notification":
+        return [("Notification", {"message": data.get("message") or ""})]
+    if event_type == "pre_compact":
+        return [("PreCompact", {"trigger": data.get("trigger") or "auto", "custom_instructions": data.get("custom_instructions") or ""})]
+    return []
+
+
+def build_schedules(snapshot: Dict[str, Any], copies: int = 1) -> List[List[Tuple[float, str, bytes]]]:
+    """
+    Per-session lists of (offset_seconds, hook, encoded payload).
+    
+    Offsets are relative to the first event in the whole snapshot, so
+    sessions keep their recorded overlap. With copies > 1 every session
+    is cloned under new session IDs to multiply the load.
+    """
+    sessions = {s.get("id"): s for s in snapshot.get("sessions", []) if s.get("id")}
+    by_session: Dict[str, List[Dict[str, Any]]] = {}
+    for event in snapshot.get("events", []):
+        by_session.setdefault(event.get("session_id") or "unknown", []).append(event)
+    
+    origin = min((parse_timestamp(e.get("timestamp")) for e in snapshot.get("events", [])
+                  if parse_timestamp(e.get("timestamp")) is not None), default=0.0)
+    
+    schedules = []
+    for copy in range(copies):
+        for session_id, events in by_session.items():
+            session = sessions.get(session_id, {})
+            claude_session_id = session.get("claude_session_id") or session_id
+            if copy:
+                claude_session_id = f"{claude_session_id}-replay{copy}"
+            common = {
+                "session_id": claude_session_id,
+                "transcript_path": f"/replay/{claude_session_id}.jsonl",
+                "cwd": session.get("project_path") or "/replay",
+            }
+            
+            schedule = []
+            last_offset = 0.0
+            for event in sorted(events, key=lambda e: e.get("timestamp") or ""):
+                timestamp = parse_timestamp(event.get("timestamp"))
+                offset = timestamp - origin if timestamp is not None else last_offset
+                last_offset = offset
+                for hook, payload in event_to_payloads(event):
+                    payload = dict(common, hook_event_name=hook, **payload)
+                    schedule.append((offset, hook, json.dumps(payload).encode("utf-8")))
+            if schedule:
+                schedules.append(schedule)
+    return schedules
+
+
+def _load_hook_classes() -> Dict[str, Any]:
+    """Load the hook classes from the hook scripts, by path as UV would run them."""
+    import importlib.util
+    classes = {}
+    for hook, (script, name) in HOOK_CLASSES.items():
+        module_name = f"chronicle_replay_{script}"
+        module = sys.modules.get(module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(module_name, os.path.join(SRC_DIR, "hooks", f"{script}.py"))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules[module_name] = module
+        classes[hook] = getattr(module, name)
+    return classes
+
+
+def invoke_hook(hook_classes: Dict[str, Any], hook: str, payload: bytes) -> bool:
+    """Run one payload through a fresh hook instance, as one hook process would."""
+    input_data = LazyJSONObject(payload)
+    instance = hook_classes[hook]()
+    if hook == "SessionStart":
+        success, session_data, event_data = instance.process_session_start(input_data)
+        context = instance.generate_session_context(session_data, event_data)
+        instance.create_session_start_response(success, session_data, event_data, context)
+        return bool(success)
+    response = instance.process_hook(input_data)
+    return isinstance(response, dict) and not response.get("error")
+
+
+class HookReplayDriver:
+    """
+    Concurrent, time-accelerated replay of snapshot sessions through the hooks.
+    
+    Args:
+        schedules: Output of build_schedules()
+        time_acceleration: Divide recorded gaps by this (0 = no waiting)
+        max_gap_seconds: Cap on any single recorded gap, to skip idle time
+        workers: Hook calls allowed to run at once
+        invoke: Callable(hook, payload) -> bool; defaults to the real hook classes
+    """
+    
+    def __init__(self, schedules: List[List[Tuple[float, str, bytes]]], time_acceleration: float = 10.0,
+                 max_gap_seconds: Optional[float] = None, workers: int = 32,
+                 invoke: Optional[Callable[[str, bytes], bool]] = None):
+        self.schedules = schedules
+        self.time_acceleration = time_acceleration
+        self.max_gap_seconds = max_gap_seconds
+        self.workers = workers
+        if invoke is None:
+            hook_classes = _load_hook_classes()
+            invoke = lambda hook, payload: invoke_hook(hook_classes, hook, payload)
+        self.invoke = invoke
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.lateness = LatencyHistogram()
+        self.failures: Dict[str, int] = {}
+        self.calls = 0
+    
+    def _compressed_offsets(self, schedule):
+        """Scheduled seconds from replay start for each call of a session."""
+        offsets = []
+        previous_recorded = previous_scheduled = None
+        for recorded, _, _ in schedule:
+            if previous_recorded is None:
+                gap = recorded
+            else:
+                gap = recorded - previous_recorded
+                if self.max_gap_seconds is not None:
+                    gap = min(gap, self.max_gap_seconds)
+            scheduled = (previous_scheduled or 0.0) + (gap / self.time_acceleration if self.time_acceleration > 0 else 0.0)
+            offsets.append(scheduled)
+            previous_recorded, previous_scheduled = recorded, scheduled
+        return offsets
+    
+    def _call(self, hook: str, payload: bytes) -> Tuple[bool, float]:
+        """Invoke a hook on a pool thread; return (ok, latency in ms)."""
+        start = time.perf_counter()
+        try:
+            ok = self.invoke(hook, payload)
+        except Exception as e:
+            logger.warning(f"{hook} replay call failed: {e}")
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
+    
+    async def _replay_session(self, loop, pool, schedule, started_at: float) -> None:
+        for (_, hook, payload), offset in zip(schedule, self._compressed_offsets(schedule)):
+            delay = started_at + offset - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.lateness.record(max(0.0, time.monotonic() - started_at - offset) * 1000)
+            ok, latency_ms = await loop.run_in_executor(pool, self._call, hook, payload)
+            # Results are recorded on the event loop thread, so counters need no lock
+            self.latency.setdefault(hook, LatencyHistogram()).record(latency_ms)
+            self.calls += 1
+            if not ok:
+                self.failures[hook] = self.failures.get(hook, 0) + 1
+    
+    async def run(self) -> Dict[str, Any]:
+        """Replay every session; return latency and lateness summaries."""
+        loop = asyncio.get_event_loop()
+        total_calls = sum(len(schedule) for schedule in self.schedules)
+        logger.info(f"🎬 Replaying {len(self.schedules)} sessions, {total_calls} hook calls "
+                    f"(acceleration: {self.time_acceleration}x)")
+        
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            await asyncio.gather(*(self._replay_session(loop, pool, s, started_at) for s in self.schedules))
+        duration = time.monotonic() - started_at
+        
+        return {
+            "replay_summary": {
+                "sessions": len(self.schedules),
+                "hook_calls": self.calls,
+                "failures": sum(self.failures.values()),
+                "duration_seconds": duration,
+                "calls_per_second": self.calls / duration if duration else 0.0,
+                "time_acceleration": self.time_acceleration,
+            },
+            "lateness": self.lateness.summary(),
+            "latency": {hook: histogram.summary() for hook, histogram in sorted(self.latency.items())},
+            "failures": dict(self.failures),
+        }
+
+
+async def main():
+    """Main function for CLI usage."""
+    parser = argparse.ArgumentParser(description="Replay Chronicle snapshot sessions through the real hooks")
+    parser.add_argument("snapshot", help="Path to snapshot file (.json or .ndjson[.gz])")
+    parser.add_argument("--speed", type=float, default=10.0,
+                       help="Time acceleration factor (default: 10.0, 0 = as fast as possible)")
+    parser.add_argument("--max-gap", type=float, help="Cap recorded gaps at this many seconds")
+    parser.add_argument("--copies", type=int, default=1, help="Replay each session this many times concurrently")
+    parser.add_argument("--workers", type=int, default=32, help="Maximum concurrent hook calls")
+    parser.add_argument("--db", help="SQLite file the hooks write to (default: a temporary file)")
+    parser.add_argument("--keep-supabase", action="store_true",
+                       help="Keep SUPABASE_URL/SUPABASE_ANON_KEY so hooks also write to Supabase")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    snapshot = load_snapshot(args.snapshot)
+    schedules = build_schedules(snapshot, args.copies)
+    
+    with tempfile.TemporaryDirectory(prefix="chronicle-replay-") as tmp_dir:
+        # Load hooks first: their import reads .env files that could redirect writes
+        hook_classes = _load_hook_classes()
+        os.environ["CLAUDE_HOOKS_DB_PATH"] = args.db or os.path.join(tmp_dir, "replay.db")
+        if not args.keep_supabase:
+            os.environ.pop("SUPABASE_URL", None)
+            os.environ.pop("SUPABASE_ANON_KEY", None)
+        # Hooks log every save at INFO; replaying thousands of calls would drown the report
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+            logger.setLevel(logging.INFO)
+        
+        driver = HookReplayDriver(
+            schedules, args.speed, args.max_gap, args.workers,
+            invoke=lambda hook, payload: invoke_hook(hook_classes, hook, payload),
+        )
+        results = await driver.run()
+    
+    summary = results["replay_summary"]
+    print(f"\n🎉 Replay complete!")
+    print(f"📊 Sessions: {summary['sessions']}, hook calls: {summary['hook_calls']}, failures: {summary['failures']}")
+    print(f"⏱️ Duration: {summary['duration_seconds']:.2f}s ({summary['calls_per_second']:.1f} calls/s)")
+    print(f"⏰ Lateness p50/p95/p99: {results['lateness']['p50_ms']:.1f}/{results['lateness']['p95_ms']:.1f}/"
+          f"{results['lateness']['p99_ms']:.1f}ms")
+    for hook, latency in results["latency"].items():
+        print(f"   {hook:<18} n={latency['count']:<6} p50={latency['p50_ms']:.1f}ms "
+              f"p95={latency['p95_ms']:.1f}ms p99={latency['p99_ms']:.1f}ms")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
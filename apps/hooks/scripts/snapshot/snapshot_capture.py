@@ -4,21 +4,27 @@ Chronicle Data Snapshot Capture Script
 
 Captures live session and event data from Supabase for testing purposes.
 Real data from real Claude Code sessions to create comprehensive test scenarios.
+
+Every complete snapshot records the latest (timestamp, id) captured per
+table as metadata["high_water_marks"]; passing a snapshot's marks back in
+captures only the rows added since. The hooks' local SQLite store can be captured
+too, through SQLite's online backup API so hooks keep writing meanwhile.
 """
 
 import os
 import sys
 import json
+import sqlite3
+import tempfile
 import argparse
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 import asyncio
 import logging
 
-# Add the hooks src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'lib'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
+# Add the hooks root to path so config and src import as packages
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 try:
     from supabase import create_client, Client
@@ -28,13 +34,25 @@ except ImportError:
     SUPABASE_AVAILABLE = False
 
 try:
-    from models import Session, Event, sanitize_data
-    from utils import validate_json
+    from config.models import Session, Event, sanitize_data
+    from src.lib.utils import validate_json
+    from snapshot_format import (
+        HIGH_WATER_FIELDS, SnapshotWriter, read_snapshot_header, save_snapshot as write_snapshot
+    )
 except ImportError as e:
     print(f"⚠️ Import error: {e}")
     print("Make sure you're running from the Chronicle root directory")
     sys.exit(1)
 
+# Session IDs per in_ filter; keeps request URLs well under proxy limits
+SESSION_BATCH_SIZE = 50
+
+# Tables captured for each snapshot section
+SECTION_TABLES = {"sessions": "sessions", "events": "events"}
+
+# Database pages copied per SQLite backup step; the source is only locked while a step runs
+BACKUP_PAGES_PER_STEP = 1024
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,6 +61,43 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def sanitize_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Sanitize a session, anonymizing its project path while keeping structure."""
+    sanitized = sanitize_data(session)
+    if sanitized.get('project_path'):
+        path_parts = sanitized['project_path'].split('/')
+        if len(path_parts) > 2:
+            sanitized['project_path'] = '/'.join(['[ANONYMIZED]'] + path_parts[-2:])
+    return sanitized
+
+
+def sanitize_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Sanitize an event, including its JSONB data field."""
+    sanitized_event = sanitize_data(event)
+    
+    # Parse and sanitize JSONB data field
+    if 'data' in sanitized_event and isinstance(sanitized_event['data'], str):
+        try:
+            data_obj = json.loads(sanitized_event['data'])
+            sanitized_event['data'] = sanitize_data(data_obj)
+        except json.JSONDecodeError:
+            sanitized_event['data'] = {}
+    
+    return sanitized_event
+
+
+SANITIZERS = {"sessions": sanitize_session, "events": sanitize_event}
+
+
+def read_high_water_marks(snapshot_file: str) -> Dict[str, Dict[str, str]]:
+    """High-water marks recorded in a snapshot's metadata."""
+    marks = read_snapshot_header(snapshot_file)["metadata"].get("high_water_marks")
+    if not marks:
+        raise ValueError(f"{snapshot_file} has no high_water_marks; capture a complete snapshot first "
+                         f"(--events 0 and more --sessions than the window holds)")
+    return marks
+
+
 class SnapshotCapture:
     """Captures live Chronicle data for test scenarios."""
     
@@ -61,6 +116,7 @@ class SnapshotCapture:
             "sessions": [],
             "events": []
         }
+        self.failed_batches = 0
     
     async def capture_recent_sessions(self, hours: int = 24, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -88,23 +144,81 @@ class SnapshotCapture:
             logger.info(f"📦 Captured {len(sessions)} sessions")
             
             # Sanitize sensitive data
-            sanitized_sessions = []
-            for session in sessions:
-                sanitized = sanitize_data(session)
-                # Anonymize project paths while keeping structure
-                if 'project_path' in sanitized:
-                    path_parts = sanitized['project_path'].split('/')
-                    if len(path_parts) > 2:
-                        sanitized['project_path'] = '/'.join(['[ANONYMIZED]'] + path_parts[-2:])
-                
-                sanitized_sessions.append(sanitized)
-            
-            return sanitized_sessions
+            return [sanitize_session(session) for session in sessions]
             
         except Exception as e:
             logger.error(f"❌ Failed to capture sessions: {e}")
             return []
     
+    async def _capture_event_batch(self, session_ids: List[str], sink: Callable[[Dict[str, Any]], None],
+                                   events_per_session: Optional[int], page_size: int,
+                                   semaphore: asyncio.Semaphore) -> int:
+        """Page through the events of a batch of sessions, feeding each to sink."""
+        captured = Counter()
+        active = list(session_ids)
+        mark = None
+        
+        try:
+            while active:
+                async with semaphore:
+                    page = await self._fetch_after('events', 'timestamp', mark, page_size, session_ids=active)
+                
+                for event in page:
+                    session_id = event.get('session_id')
+                    if events_per_session and captured[session_id] >= events_per_session:
+                        continue
+                    captured[session_id] += 1
+                    sink(sanitize_event(event))
+                
+                if len(page) < page_size:
+                    break
+                if events_per_session:
+                    # Sessions at their cap drop out of the filter for later pages
+                    active = [sid for sid in active if captured[sid] < events_per_session]
+                mark = {"timestamp": str(page[-1]['timestamp']), "id": str(page[-1]['id'])}
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"❌ Failed to capture events for {len(session_ids)} sessions "
+                         f"starting {session_ids[0][:8]}: {e}")
+        
+        return sum(captured.values())
+    
+    async def stream_events_for_sessions(self, session_ids: List[str], sink: Callable[[Dict[str, Any]], None],
+                                         events_per_session: Optional[int] = 50, page_size: int = 1000,
+                                         concurrency: int = 8) -> int:
+        """
+        Capture events for many sessions, passing each sanitized event to sink.
+        
+        Sessions are queried SESSION_BATCH_SIZE at a time with an in_ filter
+        and keyset-paginated on (timestamp, id), with up to `concurrency`
+        page requests in flight, so each session keeps its earliest events.
+        Sessions that reach events_per_session drop out of the in_ filter
+        for later pages.
+        
+        Args:
+            session_ids: List of session IDs to capture events for
+            sink: Called with each event, on the event loop thread
+            events_per_session: Maximum events per session (None or 0 = all)
+            page_size: Events per request
+            concurrency: Maximum requests in flight
+            
+        Returns:
+            Number of events captured
+        """
+        self.failed_batches = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        batches = [session_ids[i:i + SESSION_BATCH_SIZE] for i in range(0, len(session_ids), SESSION_BATCH_SIZE)]
+        
+        logger.info(f"🔍 Capturing events for {len(session_ids)} sessions "
+                    f"({len(batches)} batches, {concurrency} concurrent requests)")
+        counts = await asyncio.gather(*(
+            self._capture_event_batch(batch, sink, events_per_session, page_size, semaphore)
+            for batch in batches
+        ))
+        
+        logger.info(f"📦 Captured {sum(counts)} events")
+        return sum(counts)
+    
     async def capture_events_for_sessions(self, session_ids: List[str], 
                                         events_per_session: int = 50) -> List[Dict[str, Any]]:
         """
@@ -118,37 +232,7 @@ class SnapshotCapture:
             List of event dictionaries
         """
         all_events = []
-        
-        for session_id in session_ids:
-            try:
-                logger.info(f"🔍 Capturing events for session {session_id[:8]}...")
-                
-                # Query events for this session
-                response = self.supabase.table('events').select('*').eq(
-                    'session_id', session_id
-                ).order('timestamp', desc=False).limit(events_per_session).execute()
-                
-                events = response.data if response.data else []
-                logger.info(f"📦 Captured {len(events)} events for session {session_id[:8]}")
-                
-                # Sanitize event data
-                for event in events:
-                    sanitized_event = sanitize_data(event)
-                    
-                    # Parse and sanitize JSONB data field
-                    if 'data' in sanitized_event and isinstance(sanitized_event['data'], str):
-                        try:
-                            data_obj = json.loads(sanitized_event['data'])
-                            sanitized_event['data'] = sanitize_data(data_obj)
-                        except json.JSONDecodeError:
-                            sanitized_event['data'] = {}
-                    
-                    all_events.append(sanitized_event)
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to capture events for session {session_id}: {e}")
-                continue
-        
+        await self.stream_events_for_sessions(session_ids, all_events.append, events_per_session)
         return all_events
     
     async def capture_comprehensive_snapshot(self, hours: int = 24, 
@@ -199,6 +283,139 @@ class SnapshotCapture:
         logger.info(f"✅ Snapshot complete: {len(sessions)} sessions, {len(self.captured_data['events'])} events")
         return self.captured_data
     
+    async def capture_to_file(self, output_file: str, hours: int = 24,
+                              max_sessions: int = 5,
+                              events_per_session: int = 100,
+                              page_size: int = 1000,
+                              concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Capture a snapshot straight to a file as event pages arrive.
+        
+        Unlike capture_comprehensive_snapshot(), events are never all held in
+        memory. The format follows the output file extension.
+        
+        High-water marks are recorded only when the capture is complete:
+        fewer than max_sessions sessions found, no events_per_session cap
+        and no failed event batch. A sample would leave gaps that --since
+        captures chained from it could never fill.
+        
+        Args:
+            output_file: Path to save snapshot
+            hours: How many hours back to capture
+            max_sessions: Maximum sessions to include
+            events_per_session: Maximum events per session (0 = all)
+            page_size: Events per request
+            concurrency: Maximum requests in flight
+            
+        Returns:
+            Snapshot metadata, including captured counts
+        """
+        logger.info("🚀 Starting streaming snapshot capture...")
+        
+        with SnapshotWriter(output_file, self.captured_data["metadata"], track_high_water_marks=True) as writer:
+            sessions = await self.capture_recent_sessions(hours, max_sessions)
+            if not sessions:
+                logger.warning("⚠️ No sessions captured")
+            for session in sessions:
+                writer.write_session(session)
+            
+            session_ids = [s.get('id') or s.get('claude_session_id') for s in sessions]
+            session_ids = [sid for sid in session_ids if sid]  # Filter out None values
+            
+            await self.stream_events_for_sessions(
+                session_ids, writer.write_event, events_per_session, page_size, concurrency
+            )
+            
+            complete = len(sessions) < max_sessions and not events_per_session and not self.failed_batches
+            if not complete:
+                logger.warning("⚠️ Capture is capped or incomplete; not recording high-water marks")
+            writer.track_high_water_marks = complete
+            writer.metadata.update({
+                "sessions_captured": writer.counts["sessions"],
+                "events_captured": writer.counts["events"],
+                "complete": complete,
+                "session_ids": session_ids[:5],  # First 5 for reference
+                "capture_parameters": {
+                    "hours_back": hours,
+                    "max_sessions": max_sessions,
+                    "events_per_session": events_per_session,
+                    "page_size": page_size
+                }
+            })
+        
+        logger.info(f"✅ Snapshot complete: {writer.counts['sessions']} sessions, {writer.counts['events']} events")
+        logger.info(f"💾 Snapshot saved to {output_file}")
+        return writer.metadata
+    
+    async def _fetch_after(self, table: str, time_field: str, mark: Optional[Dict[str, str]],
+                           page_size: int, session_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Fetch one page of rows ordered by (time_field, id), after mark, optionally for some sessions only."""
+        def query():
+            request = self.supabase.table(table).select('*')
+            if session_ids is not None:
+                request = request.in_('session_id', session_ids)
+            if mark is not None:
+                # Keyset: (time, id) > (mark time, mark id); values quoted for the or filter
+                ts, row_id = mark['timestamp'], mark['id']
+                request = request.or_(
+                    f'{time_field}.gt."{ts}",and({time_field}.eq."{ts}",id.gt."{row_id}")'
+                )
+            return request.order(f'{time_field},id').limit(page_size).execute()
+        
+        # supabase-py is synchronous; run the request off the event loop
+        response = await asyncio.get_running_loop().run_in_executor(None, query)
+        return response.data if response.data else []
+    
+    async def _capture_section_after(self, section: str, mark: Optional[Dict[str, str]],
+                                     sink: Callable[[Dict[str, Any]], None], page_size: int) -> int:
+        """Page through every row of a section newer than mark, feeding each to sink."""
+        time_field = HIGH_WATER_FIELDS[section]
+        captured = 0
+        while True:
+            page = await self._fetch_after(SECTION_TABLES[section], time_field, mark, page_size)
+            for row in page:
+                sink(SANITIZERS[section](row))
+            captured += len(page)
+            if len(page) < page_size:
+                return captured
+            mark = {"timestamp": str(page[-1][time_field]), "id": str(page[-1]['id'])}
+    
+    async def capture_incremental_to_file(self, output_file: str, since: Dict[str, Dict[str, str]],
+                                          page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Capture only the rows added after a previous snapshot's high-water marks.
+        
+        Rows are keyset-paginated on (timestamp, id) per table, so nothing is
+        re-read and rows sharing a timestamp are neither skipped nor repeated.
+        Fold the result into its base with snapshot_merge.py.
+        
+        Args:
+            output_file: Path to save snapshot
+            since: high_water_marks from the previous snapshot's metadata
+            page_size: Rows per request
+            
+        Returns:
+            Snapshot metadata, including captured counts and the new marks
+        """
+        logger.info(f"🚀 Starting incremental capture after {since}")
+        
+        metadata = dict(self.captured_data["metadata"], incremental=True,
+                        base_high_water_marks=since, high_water_marks=since)
+        with SnapshotWriter(output_file, metadata, track_high_water_marks=True) as writer:
+            await asyncio.gather(*(
+                self._capture_section_after(section, since.get(section), sink, page_size)
+                for section, sink in (("sessions", writer.write_session), ("events", writer.write_event))
+            ))
+            writer.metadata.update({
+                "sessions_captured": writer.counts["sessions"],
+                "events_captured": writer.counts["events"],
+                "capture_parameters": {"page_size": page_size}
+            })
+        
+        logger.info(f"✅ Incremental snapshot complete: {writer.counts['sessions']} sessions, "
+                    f"{writer.counts['events']} events")
+        return writer.metadata
+    
     def save_snapshot(self, output_file: str, data: Optional[Dict[str, Any]] = None) -> bool:
         """
         Save snapshot data to file.
@@ -213,11 +430,8 @@ class SnapshotCapture:
         try:
             snapshot_data = data or self.captured_data
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
-            
-            with open(output_file, 'w') as f:
-                json.dump(snapshot_data, f, indent=2, default=str)
+            # Format follows the extension: .ndjson[.gz] or JSON
+            write_snapshot(output_file, snapshot_data)
             
             logger.info(f"💾 Snapshot saved to {output_file}")
             return True
@@ -227,43 +441,150 @@ class SnapshotCapture:
             return False
 
 
+class SQLiteSnapshotCapture:
+    """Captures Chronicle data from the hooks' local SQLite store."""
+    
+    def __init__(self, db_path: str, pages_per_step: int = BACKUP_PAGES_PER_STEP):
+        """Initialize with the path of the hooks' SQLite database."""
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite database not found: {db_path}")
+        self.db_path = db_path
+        self.pages_per_step = pages_per_step
+    
+    def backup(self, target_path: str) -> None:
+        """
+        Copy the live database to target_path with SQLite's online backup API.
+        
+        The copy runs pages_per_step pages at a time, so hooks writing to the
+        store are only held up for one step rather than the whole copy.
+        """
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30.0)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=self.pages_per_step, sleep=0.005)
+        finally:
+            target.close()
+            source.close()
+    
+    @staticmethod
+    def _decode(section: str, row: sqlite3.Row) -> Dict[str, Any]:
+        """Row as a record, with its JSON text columns parsed."""
+        record = dict(row)
+        for column in ('data', 'metadata'):
+            if isinstance(record.get(column), str):
+                try:
+                    record[column] = json.loads(record[column])
+                except json.JSONDecodeError:
+                    record[column] = {}
+        return SANITIZERS[section](record)
+    
+    def capture_to_file(self, output_file: str,
+                        since: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+        """
+        Capture every session and event, or only those after `since`, to a file.
+        
+        Rows are read from a backup copy in (timestamp, id) order, one at a time.
+        
+        Args:
+            output_file: Path to save snapshot
+            since: high_water_marks from a previous snapshot, for an incremental capture
+            
+        Returns:
+            Snapshot metadata, including captured counts and the new marks
+        """
+        since = since or {}
+        metadata = {
+            "captured_at": datetime.utcnow().isoformat() + 'Z',
+            "source": "local_sqlite",
+            "version": "1.0.0",
+            "incremental": bool(since),
+        }
+        if since:
+            metadata.update(base_high_water_marks=since, high_water_marks=since)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            copy_path = os.path.join(tmp_dir, "chronicle_backup.db")
+            self.backup(copy_path)
+            logger.info(f"📦 Backed up {self.db_path} for capture")
+            
+            conn = sqlite3.connect(copy_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                with SnapshotWriter(output_file, metadata, track_high_water_marks=True) as writer:
+                    for section, table in SECTION_TABLES.items():
+                        time_field = HIGH_WATER_FIELDS[section]
+                        where, params = "", []
+                        mark = since.get(section)
+                        if mark:
+                            where = f" WHERE {time_field} > ? OR ({time_field} = ? AND id > ?)"
+                            params = [mark['timestamp'], mark['timestamp'], mark['id']]
+                        rows = conn.execute(f"SELECT * FROM {table}{where} ORDER BY {time_field}, id", params)
+                        for row in rows:
+                            writer.write(section, self._decode(section, row))
+                    
+                    writer.metadata.update({
+                        "sessions_captured": writer.counts["sessions"],
+                        "events_captured": writer.counts["events"],
+                    })
+            finally:
+                conn.close()
+        
+        logger.info(f"✅ Snapshot complete: {writer.counts['sessions']} sessions, {writer.counts['events']} events")
+        logger.info(f"💾 Snapshot saved to {output_file}")
+        return writer.metadata
+
+
 async def main():
     """Main function for CLI usage."""
-    parser = argparse.ArgumentParser(description="Capture Chronicle data snapshots from Supabase")
-    parser.add_argument("--url", required=True, help="Supabase URL")
-    parser.add_argument("--key", required=True, help="Supabase anon key")
+    parser = argparse.ArgumentParser(description="Capture Chronicle data snapshots from Supabase or local SQLite")
+    parser.add_argument("--url", help="Supabase URL")
+    parser.add_argument("--key", help="Supabase anon key")
+    parser.add_argument("--sqlite", help="Capture from this local SQLite database instead of Supabase")
+    parser.add_argument("--since", help="Capture only rows newer than this snapshot's high-water marks")
     parser.add_argument("--hours", type=int, default=24, help="Hours back to capture (default: 24)")
     parser.add_argument("--sessions", type=int, default=5, help="Max sessions to capture (default: 5)")
-    parser.add_argument("--events", type=int, default=100, help="Max events per session (default: 100)")
-    parser.add_argument("--output", default="./test_snapshots/live_snapshot.json", 
-                       help="Output file path (default: ./test_snapshots/live_snapshot.json)")
+    parser.add_argument("--events", type=int, default=100, help="Max events per session, 0 for all (default: 100)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Events per request (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight (default: 8)")
+    parser.add_argument("--output", default="./test_snapshots/live_snapshot.ndjson.gz", 
+                       help="Output file path; .json writes the legacy single-document format "
+                            "(default: ./test_snapshots/live_snapshot.ndjson.gz)")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
     
+    if not args.sqlite and not (args.url and args.key):
+        parser.error("--url and --key are required unless --sqlite is given")
+    
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Initialize capture
     try:
-        capture = SnapshotCapture(args.url, args.key)
-        
-        # Capture comprehensive snapshot
-        snapshot_data = await capture.capture_comprehensive_snapshot(
-            hours=args.hours,
-            max_sessions=args.sessions, 
-            events_per_session=args.events
-        )
-        
-        # Save to file
-        if capture.save_snapshot(args.output, snapshot_data):
-            print(f"🎉 Snapshot capture complete!")
-            print(f"📊 Sessions: {len(snapshot_data['sessions'])}")
-            print(f"📊 Events: {len(snapshot_data['events'])}")
-            print(f"📁 Saved to: {args.output}")
+        since = read_high_water_marks(args.since) if args.since else None
+        
+        if args.sqlite:
+            metadata = SQLiteSnapshotCapture(args.sqlite).capture_to_file(args.output, since)
+        elif since:
+            capture = SnapshotCapture(args.url, args.key)
+            metadata = await capture.capture_incremental_to_file(args.output, since, args.page_size)
         else:
-            print("❌ Failed to save snapshot")
-            sys.exit(1)
+            capture = SnapshotCapture(args.url, args.key)
+            
+            # Capture straight to file
+            metadata = await capture.capture_to_file(
+                args.output,
+                hours=args.hours,
+                max_sessions=args.sessions, 
+                events_per_session=args.events,
+                page_size=args.page_size,
+                concurrency=args.concurrency
+            )
+        
+        print(f"🎉 Snapshot capture complete!")
+        print(f"📊 Sessions: {metadata['sessions_captured']}")
+        print(f"📊 Events: {metadata['events_captured']}")
+        print(f"📁 Saved to: {args.output}")
             
     except Exception as e:
         logger.error(f"❌ Snapshot capture failed: {e}")
@@ -271,7 +592,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    if not SUPABASE_AVAILABLE:
+    if not SUPABASE_AVAILABLE and "--sqlite" not in sys.argv:
         print("❌ Supabase library required. Install with: pip install supabase")
         sys.exit(1)
     
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Chronicle Snapshot File Formats
+
+Reads and writes snapshots one record at a time so memory stays constant
+regardless of snapshot size. Two formats are supported:
+
+- NDJSON (``.ndjson``, ``.jsonl``, optionally ``.gz``): a header line with
+  format version, metadata and record counts, then one
+  ``{"section": "sessions"|"events", "record": {...}}`` line per record.
+  Gzip output is a sequence of gzip members, which any gzip reader
+  decompresses as a single stream.
+- JSON (anything else): the original single document with ``metadata``,
+  ``sessions`` and ``events`` keys, still read incrementally.
+"""
+
+import os
+import sys
+import codecs
+import gzip
+import json
+import shutil
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+
+# Add the hooks root to path so src imports as a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.lib.json_codec import dumps_bytes, loads as json_loads
+
+FORMAT_NAME = "chronicle-snapshot"
+FORMAT_VERSION = 2
+SECTIONS = ("sessions", "events")
+# Column each section is ordered by for incremental capture, with id as tie-breaker
+HIGH_WATER_FIELDS = {"sessions": "start_time", "events": "timestamp"}
+NDJSON_SUFFIXES = ('.ndjson', '.ndjson.gz', '.jsonl', '.jsonl.gz')
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def is_ndjson_snapshot(path: str) -> bool:
+    """True if path names a line-delimited snapshot."""
+    return str(path).lower().endswith(NDJSON_SUFFIXES)
+
+
+def _open_binary(path: str) -> IO[bytes]:
+    """Open a snapshot for reading, decompressing gzip transparently."""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    return gzip.open(path, 'rb') if compressed else open(path, 'rb')
+
+
+class _JSONStream:
+    """Incremental decoder over a JSON file, read in fixed-size chunks."""
+    
+    def __init__(self, file, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed."""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+    
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be char."""
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of snapshot stream")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+class _TextReader:
+    """UTF-8 text view over a binary file that never splits a character."""
+    
+    def __init__(self, raw: IO[bytes]):
+        self.raw = raw
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+    
+    def read(self, size: int) -> str:
+        while True:
+            chunk = self.raw.read(size)
+            text = self.decoder.decode(chunk, final=not chunk)
+            if text or not chunk:
+                return text
+
+
+def _iter_json_document(snapshot_file: str, chunk_size: int) -> Iterator[Tuple[str, Any]]:
+    with _open_binary(snapshot_file) as raw:
+        stream = _JSONStream(_TextReader(raw), chunk_size)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if stream.peek() == '[':
+                stream.expect('[')
+                if stream.peek() != ']':
+                    while True:
+                        yield key, stream.value()
+                        if stream.peek() != ',':
+                            break
+                        stream.expect(',')
+                stream.expect(']')
+            else:
+                yield key, stream.value()
+            if stream.peek() != ',':
+                break
+            stream.expect(',')
+        stream.expect('}')
+
+
+def _read_header(raw: IO[bytes]) -> Dict[str, Any]:
+    header = json_loads(raw.readline())
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise ValueError("Not a Chronicle NDJSON snapshot (missing header line)")
+    if header.get("format_version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {header['format_version']}")
+    return header
+
+
+def read_snapshot_header(snapshot_file: str) -> Dict[str, Any]:
+    """
+    Read snapshot metadata without reading the records.
+    
+    Returns:
+        Dict with "metadata" and "counts" (None for JSON snapshots, which
+        don't record counts up front)
+    """
+    if is_ndjson_snapshot(snapshot_file):
+        with _open_binary(snapshot_file) as raw:
+            header = _read_header(raw)
+        return {"metadata": header.get("metadata", {}), "counts": header.get("counts")}
+    
+    for key, value in iter_snapshot_records(snapshot_file):
+        if key == "metadata":
+            return {"metadata": value, "counts": None}
+        break
+    return {"metadata": {}, "counts": None}
+
+
+def iter_snapshot_records(snapshot_file: str, chunk_size: int = 1 << 20) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream a snapshot without loading it whole.
+    
+    Sessions and events are yielded one at a time as (section, record);
+    other top-level values, such as metadata, are yielded whole as
+    (key, value). NDJSON snapshots yield their metadata first.
+    """
+    if not is_ndjson_snapshot(snapshot_file):
+        yield from _iter_json_document(snapshot_file, chunk_size)
+        return
+    
+    with _open_binary(snapshot_file) as raw:
+        header = _read_header(raw)
+        yield "metadata", header.get("metadata", {})
+        for line_number, line in enumerate(raw, 2):
+            if not line.strip():
+                continue
+            try:
+                entry = json_loads(line)
+                section, record = entry["section"], entry["record"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Malformed snapshot record on line {line_number}: {e}")
+            yield section, record
+
+
+def load_snapshot(snapshot_file: str) -> Dict[str, Any]:
+    """Load a whole snapshot of either format into one dictionary."""
+    if not is_ndjson_snapshot(snapshot_file):
+        with _open_binary(snapshot_file) as raw:
+            return json.load(raw)
+    
+    snapshot: Dict[str, Any] = {"metadata": {}, "sessions": [], "events": []}
+    for key, record in iter_snapshot_records(snapshot_file):
+        if key in SECTIONS:
+            snapshot[key].append(record)
+        else:
+            snapshot[key] = record
+    return snapshot
+
+
+def record_sort_key(section: str, record: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(timestamp, id) of a record for high-water marks, or None if it has no timestamp."""
+    value = record.get(HIGH_WATER_FIELDS.get(section, ""))
+    if value is None:
+        return None
+    return str(value), str(record.get("id") or "")
+
+
+def merge_high_water_marks(*mark_sets: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Combine high-water marks, keeping the latest (timestamp, id) per section.
+    
+    Marks look like {"events": {"timestamp": "...", "id": "..."}, ...}.
+    """
+    merged: Dict[str, Dict[str, str]] = {}
+    for marks in mark_sets:
+        for section, mark in (marks or {}).items():
+            current = merged.get(section)
+            if current is None or (mark["timestamp"], mark["id"]) > (current["timestamp"], current["id"]):
+                merged[section] = {"timestamp": mark["timestamp"], "id": mark["id"]}
+    return merged
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot record by record, in either format.
+    
+    Each section is spooled to its own temporary file next to the output
+    and the snapshot is assembled on close(), so metadata and counts can
+    be finalized after the records are written and sessions always
+    precede events. The snapshot is assembled in a temporary file and
+    renamed into place, so if writing fails nothing is left at the output
+    path and an existing snapshot there is untouched.
+    
+    With track_high_water_marks, the latest (timestamp, id) written per
+    section is recorded as metadata["high_water_marks"], combined with any
+    marks already in the metadata, so the next incremental capture can
+    start after it.
+    
+    Usage:
+        with SnapshotWriter("snapshot.ndjson.gz", metadata) as writer:
+            writer.write_session(session)
+            writer.write_event(event)
+            writer.metadata["events_captured"] = writer.counts["events"]
+    """
+    
+    def __init__(self, output_file: str, metadata: Optional[Dict[str, Any]] = None,
+                 track_high_water_marks: bool = False):
+        self.output_file = output_file
+        self.metadata = dict(metadata or {})
+        self.track_high_water_marks = track_high_water_marks
+        self.counts = {section: 0 for section in SECTIONS}
+        self._latest: Dict[str, Tuple[str, str]] = {}
+        self.ndjson = is_ndjson_snapshot(output_file)
+        self.compress = self.ndjson and output_file.lower().endswith('.gz')
+        
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        self._part_paths = {section: f"{output_file}.{section}.part" for section in SECTIONS}
+        self._parts = {
+            section: gzip.open(path, 'wb', compresslevel=6) if self.compress else open(path, 'wb')
+            for section, path in self._part_paths.items()
+        }
+    
+    def write(self, section: str, record: Dict[str, Any]) -> None:
+        """Append one record to a section."""
+        if self.ndjson:
+            line = dumps_bytes({"section": section, "record": record}) + b"\n"
+        else:
+            line = (b",\n" if self.counts[section] else b"\n") + dumps_bytes(record)
+        self._parts[section].write(line)
+        self.counts[section] += 1
+        
+        key = record_sort_key(section, record)
+        if key is not None and (section not in self._latest or key > self._latest[section]):
+            self._latest[section] = key
+    
+    def write_session(self, session: Dict[str, Any]) -> None:
+        self.write("sessions", session)
+    
+    def write_event(self, event: Dict[str, Any]) -> None:
+        self.write("events", event)
+    
+    def _remove_parts(self) -> None:
+        for part in self._parts.values():
+            part.close()
+        for path in self._part_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+    
+    @property
+    def high_water_marks(self) -> Dict[str, Dict[str, str]]:
+        """Marks from the metadata advanced by the records written so far."""
+        written = {section: {"timestamp": key[0], "id": key[1]} for section, key in self._latest.items()}
+        return merge_high_water_marks(self.metadata.get("high_water_marks"), written)
+    
+    def close(self) -> None:
+        """Assemble the snapshot and move it to the output path."""
+        for part in self._parts.values():
+            part.close()
+        if self.track_high_water_marks and self.high_water_marks:
+            self.metadata["high_water_marks"] = self.high_water_marks
+        tmp_path = f"{self.output_file}.tmp"
+        try:
+            with open(tmp_path, 'wb') as out:
+                if self.ndjson:
+                    header = dumps_bytes({
+                        "format": FORMAT_NAME,
+                        "format_version": FORMAT_VERSION,
+                        "metadata": self.metadata,
+                        "counts": self.counts,
+                    }) + b"\n"
+                    out.write(gzip.compress(header) if self.compress else header)
+                else:
+                    out.write(b'{"metadata": ' + dumps_bytes(self.metadata))
+                for section in SECTIONS:
+                    if not self.ndjson:
+                        out.write(f', "{section}": ['.encode('ascii'))
+                    with open(self._part_paths[section], 'rb') as part:
+                        shutil.copyfileobj(part, out, 1 << 20)
+                    if not self.ndjson:
+                        out.write(b"\n]" if self.counts[section] else b"]")
+                if not self.ndjson:
+                    out.write(b"}\n")
+            os.replace(tmp_path, self.output_file)
+        finally:
+            self._remove_parts()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._remove_parts()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def save_snapshot(output_file: str, snapshot: Dict[str, Any]) -> None:
+    """Write an in-memory snapshot; the format follows the file extension."""
+    with SnapshotWriter(output_file, snapshot.get("metadata", {})) as writer:
+        for section in SECTIONS:
+            for record in snapshot.get(section, []):
+                writer.write(section, record)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Chronicle Snapshot Merge
+
+Folds incremental snapshots (captured with snapshot_capture.py --since) into
+a base snapshot. Records are keyed by id, so a record captured again in a
+later snapshot replaces the earlier copy, and the merged snapshot carries
+the latest high-water marks so capture can continue from it.
+
+Records are staged in a temporary SQLite file rather than in memory, so
+merging stays within constant memory however large the base snapshot is.
+"""
+
+import os
+import sys
+import argparse
+import logging
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add the hooks root to path so src imports as a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from snapshot_format import (
+    SECTIONS, SnapshotWriter, iter_snapshot_records, merge_high_water_marks, record_sort_key
+)
+from src.lib.json_codec import dumps_bytes, loads as json_loads
+
+# Rows per executemany() when staging records
+STAGE_BATCH_SIZE = 5000
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _record_key(section: str, record: Dict[str, Any], position: str) -> str:
+    """Identity of a record across snapshots; records without one are never replaced."""
+    key = record.get("id")
+    if key is None and section == "sessions":
+        key = record.get("claude_session_id")
+    return str(key) if key is not None else f"__unkeyed_{position}"
+
+
+def _gap_sections(increment_base: Optional[Dict[str, Any]], merged: Dict[str, Dict[str, str]]) -> List[str]:
+    """Sections where an increment starts after the marks merged so far."""
+    gaps = []
+    for section, mark in (increment_base or {}).items():
+        current = merged.get(section)
+        if current is None or (mark["timestamp"], mark["id"]) > (current["timestamp"], current["id"]):
+            gaps.append(section)
+    return gaps
+
+
+def merge_snapshots(base_file: str, increment_files: List[str], output_file: str) -> Dict[str, Any]:
+    """
+    Merge incremental snapshots into a base snapshot, later files winning.
+    
+    Args:
+        base_file: Full snapshot to start from
+        increment_files: Incremental snapshots, oldest first
+        output_file: Path to save the merged snapshot; format follows the extension
+    
+    Returns:
+        Merge summary with record counts and the merged high-water marks
+    """
+    metadata: Dict[str, Any] = {}
+    marks: Dict[str, Dict[str, str]] = {}
+    staged = 0
+    
+    with tempfile.TemporaryDirectory(prefix="chronicle-merge-") as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "merge.db"))
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("""
+                CREATE TABLE records (
+                    section TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    sort_time TEXT NOT NULL,
+                    sort_id TEXT NOT NULL,
+                    doc BLOB NOT NULL,
+                    PRIMARY KEY (section, key)
+                )
+            """)
+            
+            for index, snapshot_file in enumerate([base_file] + list(increment_files)):
+                batch = []
+                for position, (section, record) in enumerate(iter_snapshot_records(snapshot_file)):
+                    if section == "metadata":
+                        if index == 0:
+                            metadata = dict(record)
+                        else:
+                            gaps = _gap_sections(record.get("base_high_water_marks"), marks)
+                            if gaps:
+                                logger.warning(f"⚠️ {snapshot_file} starts after the merged {', '.join(gaps)}; "
+                                               f"an increment may be missing")
+                        marks = merge_high_water_marks(marks, record.get("high_water_marks"))
+                        continue
+                    
+                    sort_time, sort_id = record_sort_key(section, record) or ("", "")
+                    batch.append((section, _record_key(section, record, f"{index}_{position}"),
+                                  sort_time, sort_id, dumps_bytes(record)))
+                    if len(batch) >= STAGE_BATCH_SIZE:
+                        conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", batch)
+                        staged += len(batch)
+                        batch = []
+                
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", batch)
+                staged += len(batch)
+                conn.commit()
+                logger.info(f"📥 Staged {snapshot_file}")
+            
+            conn.execute("CREATE INDEX idx_records_order ON records(section, sort_time, sort_id)")
+            
+            metadata.pop("base_high_water_marks", None)
+            metadata.update({
+                "incremental": False,
+                "high_water_marks": marks,
+                "merged_from": [base_file] + list(increment_files),
+                "merged_at": datetime.utcnow().isoformat() + 'Z',
+            })
+            
+            with SnapshotWriter(output_file, metadata, track_high_water_marks=True) as writer:
+                for section in SECTIONS:
+                    rows = conn.execute(
+                        "SELECT doc FROM records WHERE section = ? ORDER BY sort_time, sort_id", (section,)
+                    )
+                    for (doc,) in rows:
+                        writer.write(section, json_loads(doc))
+                
+                writer.metadata["sessions_captured"] = writer.counts["sessions"]
+                writer.metadata["events_captured"] = writer.counts["events"]
+        finally:
+            conn.close()
+    
+    summary = {
+        "sessions": writer.counts["sessions"],
+        "events": writer.counts["events"],
+        "replaced": staged - writer.counts["sessions"] - writer.counts["events"],
+        "high_water_marks": writer.metadata["high_water_marks"],
+        "output": output_file,
+    }
+    logger.info(f"✅ Merged {len(increment_files)} increments: {summary['sessions']} sessions, "
+                f"{summary['events']} events ({summary['replaced']} replaced)")
+    return summary
+
+
+def main():
+    """Main function for CLI usage."""
+    parser = argparse.ArgumentParser(description="Merge incremental Chronicle snapshots into a base snapshot")
+    parser.add_argument("base", help="Full snapshot to merge into")
+    parser.add_argument("increments", nargs="+", help="Incremental snapshots, oldest first")
+    parser.add_argument("--output", required=True,
+                       help="Merged snapshot path; .json writes the legacy single-document format")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    
+    args = parser.parse_args()
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    try:
+        summary = merge_snapshots(args.base, args.increments, args.output)
+    except Exception as e:
+        logger.error(f"❌ Snapshot merge failed: {e}")
+        sys.exit(1)
+    
+    print(f"🎉 Snapshot merge complete!")
+    print(f"📊 Sessions: {summary['sessions']}")
+    print(f"📊 Events: {summary['events']}")
+    print(f"📊 Replaced: {summary['replaced']}")
+    print(f"📁 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
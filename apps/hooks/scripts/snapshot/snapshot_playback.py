@@ -13,19 +13,20 @@ import argparse
 import asyncio
 import logging
 import sqlite3
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from pathlib import Path
 
-# Add the hooks src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'lib'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
+# Add the hooks root to path so config and src import as packages
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 try:
-    from models import Session, Event, EventType, get_sqlite_schema_sql
-    from database import SupabaseClient, DatabaseManager
-    from utils import validate_json
+    from config.models import Session, Event, EventType, SQLITE_SCHEMA
+    from config.database import SupabaseClient, DatabaseManager
+    from src.lib.json_codec import dumps as json_dumps
+    from src.lib.utils import validate_json
+    from snapshot_format import iter_snapshot_records, load_snapshot
 except ImportError as e:
     print(f"⚠️ Import error: {e}")
     print("Make sure you're running from the Chronicle root directory")
@@ -39,6 +40,156 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_sqlite_tables(connection: sqlite3.Connection) -> None:
+    """Create the Chronicle tables without their indexes."""
+    for table_name, table_sql in SQLITE_SCHEMA.items():
+        if table_name != 'indexes':
+            connection.execute(table_sql)
+
+
+def create_sqlite_indexes(connection: sqlite3.Connection) -> None:
+    """Create the Chronicle indexes."""
+    for index_sql in SQLITE_SCHEMA['indexes']:
+        connection.execute(index_sql)
+
+
+class SnapshotBulkLoader:
+    """
+    Loads a snapshot into SQLite as fast as possible, for test fixtures.
+    
+    Streams the snapshot file, inserts rows with executemany in large
+    transactions, and creates indexes and checks foreign keys only after
+    the load. No timestamps are rewritten and no delays are simulated.
+    """
+    
+    def __init__(self, snapshot_file: str, db_path: str = ":memory:", batch_size: int = 10000,
+                 synchronous_off: bool = False):
+        """
+        Initialize bulk loader.
+        
+        Args:
+            snapshot_file: Path to snapshot file (JSON or NDJSON)
+            db_path: SQLite database to load into (":memory:" by default)
+            batch_size: Rows per executemany batch and per transaction
+            synchronous_off: Disable fsync and keep the journal in memory;
+                only for throwaway databases, as a crash can corrupt them
+        """
+        self.snapshot_file = snapshot_file
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.synchronous_off = synchronous_off
+        self.connection = None
+        self.metadata = {}
+        self.rows_loaded = {"sessions": 0, "events": 0}
+        self.rows_failed = {"sessions": 0, "events": 0}
+        self._columns = {}
+    
+    def _prepare_row(self, table: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep known columns and serialize event data."""
+        row = {key: value for key, value in record.items() if key in self._columns[table]}
+        if table == "events" and isinstance(row.get('data'), (dict, list)):
+            row['data'] = json_dumps(row['data'])
+        return row
+    
+    def _insert_batch(self, table: str, records: List[Dict[str, Any]]) -> None:
+        """Insert one batch, falling back to row-at-a-time if any row is rejected."""
+        verb = "INSERT OR REPLACE" if table == "sessions" else "INSERT"
+        
+        # executemany needs one column list; snapshot rows may omit optional fields
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+        for record in records:
+            row = self._prepare_row(table, record)
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
+        
+        for columns, values in groups.items():
+            sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            self.connection.execute("SAVEPOINT batch")
+            try:
+                self.connection.executemany(sql, values)
+                self.rows_loaded[table] += len(values)
+            except sqlite3.Error as e:
+                logger.debug(f"Batch insert into {table} failed ({e}), retrying row by row")
+                self.connection.execute("ROLLBACK TO batch")
+                for row_values in values:
+                    try:
+                        self.connection.execute(sql, row_values)
+                        self.rows_loaded[table] += 1
+                    except sqlite3.Error as row_error:
+                        logger.error(f"Failed to insert into {table}: {row_error}")
+                        self.rows_failed[table] += 1
+            self.connection.execute("RELEASE batch")
+    
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the snapshot.
+        
+        Returns:
+            Summary with row counts, timings and rows/sec
+        """
+        start = time.perf_counter()
+        self.connection = sqlite3.connect(self.db_path, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        
+        # Foreign keys are checked once after the load instead of per row
+        self.connection.execute('PRAGMA foreign_keys = OFF')
+        if self.synchronous_off:
+            self.connection.execute('PRAGMA synchronous = OFF')
+            self.connection.execute('PRAGMA journal_mode = MEMORY')
+        create_sqlite_tables(self.connection)
+        for table in ("sessions", "events"):
+            self._columns[table] = {row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+        
+        pending = {"sessions": [], "events": []}
+        self.connection.execute("BEGIN")
+        for key, record in iter_snapshot_records(self.snapshot_file):
+            if key not in pending:
+                self.metadata[key] = record
+                continue
+            pending[key].append(record)
+            if len(pending[key]) >= self.batch_size:
+                self._insert_batch(key, pending[key])
+                pending[key] = []
+                self.connection.execute("COMMIT")
+                self.connection.execute("BEGIN")
+        for table, records in pending.items():
+            if records:
+                self._insert_batch(table, records)
+        self.connection.execute("COMMIT")
+        load_seconds = time.perf_counter() - start
+        
+        index_start = time.perf_counter()
+        create_sqlite_indexes(self.connection)
+        index_seconds = time.perf_counter() - index_start
+        
+        orphaned_events = len(self.connection.execute('PRAGMA foreign_key_check(events)').fetchall())
+        if orphaned_events:
+            logger.warning(f"⚠️ {orphaned_events} events reference sessions missing from the snapshot")
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        
+        total_seconds = time.perf_counter() - start
+        total_rows = sum(self.rows_loaded.values())
+        results = {
+            "sessions_loaded": self.rows_loaded["sessions"],
+            "events_loaded": self.rows_loaded["events"],
+            "rows_failed": sum(self.rows_failed.values()),
+            "orphaned_events": orphaned_events,
+            "load_seconds": load_seconds,
+            "index_seconds": index_seconds,
+            "duration_seconds": total_seconds,
+            "rows_per_second": total_rows / total_seconds if total_seconds else 0.0,
+            "db_path": self.db_path,
+        }
+        logger.info(f"✅ Bulk loaded {total_rows} rows in {total_seconds:.2f}s "
+                    f"({results['rows_per_second']:.0f} rows/s)")
+        return results
+    
+    def cleanup(self) -> None:
+        """Clean up resources."""
+        if self.connection:
+            self.connection.close()
+            logger.info("🧹 SQLite connection closed")
+
+
 class SnapshotPlayback:
     """Replays Chronicle snapshot data for testing."""
     
@@ -47,7 +198,7 @@ class SnapshotPlayback:
         Initialize playback system.
         
         Args:
-            snapshot_file: Path to snapshot JSON file
+            snapshot_file: Path to snapshot file (JSON or NDJSON)
             target: Where to replay data ("memory", "sqlite", "supabase")
         """
         self.snapshot_file = snapshot_file
@@ -68,8 +219,7 @@ class SnapshotPlayback:
     def load_snapshot(self) -> None:
         """Load snapshot data from file."""
         try:
-            with open(self.snapshot_file, 'r') as f:
-                self.snapshot_data = json.load(f)
+            self.snapshot_data = load_snapshot(self.snapshot_file)
             
             sessions_count = len(self.snapshot_data.get('sessions', []))
             events_count = len(self.snapshot_data.get('events', []))
@@ -120,10 +270,9 @@ class SnapshotPlayback:
             self.sqlite_connection.row_factory = sqlite3.Row
             
             # Create schema
-            schema_sql = get_sqlite_schema_sql()
-            for statement in schema_sql.split(';'):
-                if statement.strip():
-                    self.sqlite_connection.execute(statement)
+            self.sqlite_connection.execute('PRAGMA foreign_keys = ON')
+            create_sqlite_tables(self.sqlite_connection)
+            create_sqlite_indexes(self.sqlite_connection)
             
             self.sqlite_connection.commit()
             logger.info("✅ SQLite database initialized for playback")
@@ -376,13 +525,21 @@ class SnapshotPlayback:
 async def main():
     """Main function for CLI usage."""
     parser = argparse.ArgumentParser(description="Replay Chronicle snapshot data")
-    parser.add_argument("snapshot", help="Path to snapshot JSON file")
+    parser.add_argument("snapshot", help="Path to snapshot file (.json or .ndjson[.gz])")
     parser.add_argument("--target", choices=["memory", "sqlite", "supabase"], 
                        default="memory", help="Replay target (default: memory)")
     parser.add_argument("--speed", type=float, default=10.0, 
                        help="Time acceleration factor (default: 10.0)")
     parser.add_argument("--stats-only", action="store_true", 
                        help="Only show snapshot statistics")
+    parser.add_argument("--bulk", action="store_true",
+                       help="Bulk load into SQLite without simulated timing (implies --target sqlite)")
+    parser.add_argument("--db", default=":memory:",
+                       help="SQLite database for --bulk (default: in-memory)")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                       help="Rows per transaction for --bulk (default: 10000)")
+    parser.add_argument("--synchronous-off", action="store_true",
+                       help="Disable fsync for --bulk; only for throwaway databases")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
@@ -390,6 +547,23 @@ async def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if args.bulk:
+        loader = SnapshotBulkLoader(args.snapshot, args.db, args.batch_size, args.synchronous_off)
+        try:
+            results = loader.load()
+        except Exception as e:
+            logger.error(f"❌ Bulk load failed: {e}")
+            sys.exit(1)
+        finally:
+            loader.cleanup()
+        
+        print(f"\n🎉 Bulk load complete!")
+        print(f"📊 Sessions: {results['sessions_loaded']}")
+        print(f"📊 Events: {results['events_loaded']}")
+        print(f"⏱️ Duration: {results['duration_seconds']:.2f}s "
+              f"(indexes: {results['index_seconds']:.2f}s, {results['rows_per_second']:.0f} rows/s)")
+        return
+    
     # Initialize playback
     try:
         playback = SnapshotPlayback(args.snapshot, args.target)
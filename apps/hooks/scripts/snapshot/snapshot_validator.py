@@ -4,6 +4,9 @@ Chronicle Snapshot Validation and Sanitization Script
 
 Validates and sanitizes Chronicle snapshot data for privacy and security compliance.
 Ensures snapshot data is safe for testing while maintaining realistic patterns.
+
+Events can be sanitized in chunks on a process pool; validation stays in the
+main process since it depends on the sessions seen so far.
 """
 
 import os
@@ -11,37 +14,77 @@ import sys
 import json
 import argparse
 import re
-from typing import Dict, List, Any, Optional, Union, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Union, Tuple
 from datetime import datetime
 from pathlib import Path
 
-# Add the hooks src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'lib'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'config'))
+# Add the hooks root to path so config and src import as packages
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 try:
-    from models import EventType, validate_session_data, validate_event_data
-    from utils import validate_json
+    from config.models import EventType, validate_session_data, validate_event_data
+    from src.lib.utils import validate_json
+    from snapshot_format import SnapshotWriter, iter_snapshot_records, read_snapshot_header
 except ImportError as e:
     print(f"⚠️ Import error: {e}")
     print("Make sure you're running from the Chronicle root directory")
     sys.exit(1)
 
+# Placeholder each pattern type is replaced with
+REDACTIONS = {
+    'api_keys': '[API_KEY_REDACTED]',
+    'secrets': '[SECRET_REDACTED]',
+    'emails': 'user@example.com',
+    'file_paths': '/[PATH_REDACTED]',
+    'passwords': 'password="[REDACTED]"',
+}
+
+# Example changes kept per pattern type; the rest are only counted
+MAX_CHANGE_SAMPLES = 10
+
+# Events per task sent to a sanitization worker
+DEFAULT_CHUNK_SIZE = 1000
+
+# Validator used by each pool worker process
+_worker_validator = None
+
+
+def _init_worker(sensitive_patterns: Dict[str, List[str]]) -> None:
+    """Build the worker's validator once, with the parent's patterns."""
+    global _worker_validator
+    _worker_validator = SnapshotValidator()
+    _worker_validator.sensitive_patterns = sensitive_patterns
+    _worker_validator.compile_patterns()
+
+
+def _sanitize_event_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Sanitize (position, event) pairs in a worker; return the events and change summary."""
+    _worker_validator.sanitization_changes = {}
+    events = [_worker_validator.sanitize_event(i, event) for i, event in chunk]
+    return events, _worker_validator.sanitization_changes
+
 
 class SnapshotValidator:
     """Validates and sanitizes Chronicle snapshot data."""
     
-    def __init__(self, strict_mode: bool = False):
+    def __init__(self, strict_mode: bool = False, workers: int = 1,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
         """
         Initialize validator.
         
         Args:
             strict_mode: Enable strict validation (fails on any issues)
+            workers: Processes sanitizing events; 1 sanitizes in this process
+            chunk_size: Events per worker task
         """
         self.strict_mode = strict_mode
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
         self.validation_errors = []
-        self.sanitization_changes = []
+        # pattern_type -> {"count": matches replaced, "samples": first MAX_CHANGE_SAMPLES changes}
+        self.sanitization_changes: Dict[str, Dict[str, Any]] = {}
         
         # Sensitive patterns to detect and sanitize
         self.sensitive_patterns = {
@@ -70,6 +113,14 @@ class SnapshotValidator:
                 r'pwd["\']?\s*[:=]\s*["\'][^"\']+["\']',
             ]
         }
+        self.compile_patterns()
+    
+    def compile_patterns(self) -> None:
+        """Compile sensitive_patterns; call again after changing them."""
+        self.compiled_patterns = {
+            pattern_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for pattern_type, patterns in self.sensitive_patterns.items()
+        }
     
     def validate_snapshot_structure(self, snapshot: Dict[str, Any]) -> bool:
         """
@@ -89,16 +140,9 @@ class SnapshotValidator:
                 return False
         
         # Validate metadata
-        metadata = snapshot['metadata']
-        if not isinstance(metadata, dict):
-            self.validation_errors.append("Metadata must be a dictionary")
+        if not self.validate_metadata(snapshot['metadata']):
             return False
         
-        required_metadata = ['captured_at', 'source', 'version']
-        for key in required_metadata:
-            if key not in metadata:
-                self.validation_errors.append(f"Missing metadata key: {key}")
-        
         # Validate sessions and events are lists
         if not isinstance(snapshot['sessions'], list):
             self.validation_errors.append("Sessions must be a list")
@@ -110,6 +154,71 @@ class SnapshotValidator:
         
         return len(self.validation_errors) == 0
     
+    def validate_metadata(self, metadata: Any) -> bool:
+        """
+        Validate snapshot metadata.
+        
+        Args:
+            metadata: Snapshot metadata
+            
+        Returns:
+            False if metadata is not a dictionary; missing keys are
+            recorded as errors
+        """
+        if not isinstance(metadata, dict):
+            self.validation_errors.append("Metadata must be a dictionary")
+            return False
+        
+        required_metadata = ['captured_at', 'source', 'version']
+        for key in required_metadata:
+            if key not in metadata:
+                self.validation_errors.append(f"Missing metadata key: {key}")
+        
+        return True
+    
+    def validate_session(self, i: int, session: Dict[str, Any], seen_ids: Dict[str, int]) -> bool:
+        """
+        Validate a single session.
+        
+        Args:
+            i: Position of the session in the snapshot
+            session: Session dictionary
+            seen_ids: Session IDs seen so far mapped to their position;
+                updated with this session
+            
+        Returns:
+            True if the session is valid
+        """
+        if not validate_session_data(session):
+            self.validation_errors.append(f"Session {i}: Invalid structure")
+            return False
+        
+        valid = True
+            
+        # Check required fields
+        if not session.get('claude_session_id'):
+            self.validation_errors.append(f"Session {i}: Missing claude_session_id")
+            valid = False
+            
+        # Validate timestamps
+        start_time = session.get('start_time')
+        if start_time:
+            try:
+                datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+            except ValueError:
+                self.validation_errors.append(f"Session {i}: Invalid start_time format")
+                valid = False
+            
+        # Check for duplicates
+        session_id = session.get('id') or session.get('claude_session_id')
+        if session_id in seen_ids:
+            self.validation_errors.append(f"Duplicate session ID: {session_id} (sessions {seen_ids[session_id]}, {i})")
+            valid = False
+        else:
+            seen_ids[session_id] = i
+        
+        return valid
+    
     def validate_sessions(self, sessions: List[Dict[str, Any]]) -> bool:
         """
         Validate session data.
@@ -120,35 +229,60 @@ class SnapshotValidator:
         Returns:
             True if all sessions are valid
         """
-        valid = True
+        seen_ids: Dict[str, int] = {}
+        results = [self.validate_session(i, session, seen_ids) for i, session in enumerate(sessions)]
+        return all(results)
+    
+    def validate_event(self, i: int, event: Dict[str, Any], session_ids: set) -> bool:
+        """
+        Validate a single event.
         
-        for i, session in enumerate(sessions):
-            if not validate_session_data(session):
-                self.validation_errors.append(f"Session {i}: Invalid structure")
-                valid = False
-                continue
+        Args:
+            i: Position of the event in the snapshot
+            event: Event dictionary
+            session_ids: Set of valid session IDs
+            
+        Returns:
+            True if the event is valid
+        """
+        if not validate_event_data(event):
+            self.validation_errors.append(f"Event {i}: Invalid structure")
+            return False
+        
+        valid = True
+            
+        # Check session reference
+        session_id = event.get('session_id')
+        if session_id not in session_ids:
+            self.validation_errors.append(f"Event {i}: References unknown session {session_id}")
+            valid = False
             
-            # Check required fields
-            if not session.get('claude_session_id'):
-                self.validation_errors.append(f"Session {i}: Missing claude_session_id")
+        # Validate event type
+        event_type = event.get('event_type')
+        if not EventType.is_valid(event_type):
+            self.validation_errors.append(f"Event {i}: Invalid event type '{event_type}'")
+            valid = False
+            
+        # Validate timestamp
+        timestamp = event.get('timestamp')
+        if timestamp:
+            try:
+                datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            except ValueError:
+                self.validation_errors.append(f"Event {i}: Invalid timestamp format")
                 valid = False
             
-            # Validate timestamps
-            start_time = session.get('start_time')
-            if start_time:
-                try:
-                    datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                except ValueError:
-                    self.validation_errors.append(f"Session {i}: Invalid start_time format")
-                    valid = False
+        # Tool events should have tool_name
+        if event_type == EventType.TOOL_USE and not event.get('tool_name'):
+            self.validation_errors.append(f"Event {i}: Tool event missing tool_name")
+            valid = False
             
-            # Check for duplicates
-            session_id = session.get('id') or session.get('claude_session_id')
-            for j, other_session in enumerate(sessions[i+1:], i+1):
-                other_id = other_session.get('id') or other_session.get('claude_session_id')
-                if session_id == other_id:
-                    self.validation_errors.append(f"Duplicate session ID: {session_id} (sessions {i}, {j})")
-                    valid = False
+        # Validate duration if present
+        duration = event.get('duration_ms')
+        if duration is not None:
+            if not isinstance(duration, int) or duration < 0:
+                self.validation_errors.append(f"Event {i}: Invalid duration_ms")
+                valid = False
         
         return valid
     
@@ -164,48 +298,8 @@ class SnapshotValidator:
         Returns:
             True if all events are valid
         """
-        valid = True
-        
-        for i, event in enumerate(events):
-            if not validate_event_data(event):
-                self.validation_errors.append(f"Event {i}: Invalid structure")
-                valid = False
-                continue
-            
-            # Check session reference
-            session_id = event.get('session_id')
-            if session_id not in session_ids:
-                self.validation_errors.append(f"Event {i}: References unknown session {session_id}")
-                valid = False
-            
-            # Validate event type
-            event_type = event.get('event_type')
-            if not EventType.is_valid(event_type):
-                self.validation_errors.append(f"Event {i}: Invalid event type '{event_type}'")
-                valid = False
-            
-            # Validate timestamp
-            timestamp = event.get('timestamp')
-            if timestamp:
-                try:
-                    datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                except ValueError:
-                    self.validation_errors.append(f"Event {i}: Invalid timestamp format")
-                    valid = False
-            
-            # Tool events should have tool_name
-            if event_type == EventType.TOOL_USE and not event.get('tool_name'):
-                self.validation_errors.append(f"Event {i}: Tool event missing tool_name")
-                valid = False
-            
-            # Validate duration if present
-            duration = event.get('duration_ms')
-            if duration is not None:
-                if not isinstance(duration, int) or duration < 0:
-                    self.validation_errors.append(f"Event {i}: Invalid duration_ms")
-                    valid = False
-        
-        return valid
+        results = [self.validate_event(i, event, session_ids) for i, event in enumerate(events)]
+        return all(results)
     
     def detect_sensitive_data(self, text: str) -> List[Tuple[str, str]]:
         """
@@ -219,10 +313,9 @@ class SnapshotValidator:
         """
         findings = []
         
-        for pattern_type, patterns in self.sensitive_patterns.items():
+        for pattern_type, patterns in self.compiled_patterns.items():
             for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+                for match in pattern.finditer(text):
                     findings.append((pattern_type, match.group()))
         
         return findings
@@ -238,39 +331,41 @@ class SnapshotValidator:
         Returns:
             Sanitized text
         """
-        original_text = text
-        
-        # Replace sensitive patterns
-        for pattern_type, patterns in self.sensitive_patterns.items():
+        # Replace sensitive patterns; subn counts the matches in the same pass
+        for pattern_type, patterns in self.compiled_patterns.items():
+            replacement = REDACTIONS.get(pattern_type, '[REDACTED]')
             for pattern in patterns:
-                matches = list(re.finditer(pattern, text, re.IGNORECASE))
-                if matches:
-                    # Replace with appropriate placeholder
-                    if pattern_type == 'api_keys':
-                        replacement = '[API_KEY_REDACTED]'
-                    elif pattern_type == 'secrets':
-                        replacement = '[SECRET_REDACTED]'
-                    elif pattern_type == 'emails':
-                        replacement = 'user@example.com'
-                    elif pattern_type == 'file_paths':
-                        replacement = '/[PATH_REDACTED]'
-                    elif pattern_type == 'passwords':
-                        replacement = 'password="[REDACTED]"'
-                    else:
-                        replacement = '[REDACTED]'
-                    
-                    text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-                    
-                    for match in matches:
-                        self.sanitization_changes.append({
-                            "context": context,
-                            "pattern_type": pattern_type,
-                            "original": match.group(),
-                            "replacement": replacement
-                        })
+                sanitized, count = pattern.subn(replacement, text)
+                if count:
+                    self._record_changes(pattern_type, pattern, text, count, replacement, context)
+                    text = sanitized
         
         return text
     
+    def _record_changes(self, pattern_type: str, pattern: 're.Pattern', text: str, count: int,
+                        replacement: str, context: str) -> None:
+        """Count replacements in text, keeping the first few as samples."""
+        summary = self.sanitization_changes.setdefault(pattern_type, {"count": 0, "samples": []})
+        summary["count"] += count
+        if len(summary["samples"]) >= MAX_CHANGE_SAMPLES:
+            return
+        for match in pattern.finditer(text):
+            summary["samples"].append({
+                "context": context,
+                "original": match.group(),
+                "replacement": replacement
+            })
+            if len(summary["samples"]) >= MAX_CHANGE_SAMPLES:
+                break
+    
+    def merge_changes(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        """Add a change summary from another validator, such as a pool worker."""
+        for pattern_type, other in changes.items():
+            summary = self.sanitization_changes.setdefault(pattern_type, {"count": 0, "samples": []})
+            summary["count"] += other["count"]
+            room = MAX_CHANGE_SAMPLES - len(summary["samples"])
+            summary["samples"].extend(other["samples"][:max(room, 0)])
+    
     def sanitize_dict_recursive(self, data: Dict[str, Any], 
                                context: str = "") -> Dict[str, Any]:
         """
@@ -319,52 +414,118 @@ class SnapshotValidator:
         Returns:
             Sanitized snapshot
         """
-        sanitized = {
-            "metadata": snapshot.get("metadata", {}).copy(),
-            "sessions": [],
-            "events": []
+        return {
+            "metadata": self.sanitize_metadata(snapshot.get("metadata", {})),
+            "sessions": [self.sanitize_session(i, session) for i, session in enumerate(snapshot.get("sessions", []))],
+            "events": list(self.sanitize_events(enumerate(snapshot.get("events", []))))
         }
         
-        # Update metadata to indicate sanitization
-        sanitized["metadata"]["sanitized_at"] = datetime.utcnow().isoformat() + 'Z'
-        sanitized["metadata"]["sanitization_applied"] = True
+    def sanitize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy metadata, marking it as sanitized."""
+        sanitized = dict(metadata) if isinstance(metadata, dict) else {}
+        sanitized["sanitized_at"] = datetime.utcnow().isoformat() + 'Z'
+        sanitized["sanitization_applied"] = True
+        return sanitized
+        
+    def sanitize_session(self, i: int, session: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sanitize a single session.
         
-        # Sanitize sessions
-        for i, session in enumerate(snapshot.get("sessions", [])):
-            sanitized_session = self.sanitize_dict_recursive(
-                session.copy(), f"session[{i}]"
-            )
+        Args:
+            i: Position of the session in the snapshot
+            session: Session to sanitize
             
-            # Anonymize project paths while preserving structure
-            if 'project_path' in sanitized_session:
-                path = sanitized_session['project_path']
-                if path and not path.startswith('['):  # Don't double-sanitize
-                    path_parts = Path(path).parts
-                    if len(path_parts) > 2:
-                        # Keep last 2 parts, anonymize the rest
-                        anonymized_parts = ['[ANONYMIZED]'] * (len(path_parts) - 2) + list(path_parts[-2:])
-                        sanitized_session['project_path'] = str(Path(*anonymized_parts))
+        Returns:
+            Sanitized session
+        """
+        sanitized_session = self.sanitize_dict_recursive(
+            session.copy(), f"session[{i}]"
+        )
             
-            sanitized["sessions"].append(sanitized_session)
+        # Anonymize project paths while preserving structure
+        if 'project_path' in sanitized_session:
+            path = sanitized_session['project_path']
+            if path and not path.startswith('['):  # Don't double-sanitize
+                path_parts = Path(path).parts
+                if len(path_parts) > 2:
+                    # Keep last 2 parts, anonymize the rest
+                    anonymized_parts = ['[ANONYMIZED]'] * (len(path_parts) - 2) + list(path_parts[-2:])
+                    sanitized_session['project_path'] = str(Path(*anonymized_parts))
+            
+        return sanitized_session
+        
+    def sanitize_event(self, i: int, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sanitize a single event.
         
-        # Sanitize events
-        for i, event in enumerate(snapshot.get("events", [])):
-            sanitized_event = self.sanitize_dict_recursive(
-                event.copy(), f"event[{i}]"
-            )
+        Args:
+            i: Position of the event in the snapshot
+            event: Event to sanitize
             
-            # Parse and sanitize JSON data field if it's a string
-            if 'data' in sanitized_event and isinstance(sanitized_event['data'], str):
-                try:
-                    data_obj = json.loads(sanitized_event['data'])
-                    sanitized_data = self.sanitize_dict_recursive(data_obj, f"event[{i}].data")
-                    sanitized_event['data'] = json.dumps(sanitized_data)
-                except json.JSONDecodeError:
-                    # Leave as-is if not valid JSON
-                    pass
+        Returns:
+            Sanitized event
+        """
+        sanitized_event = self.sanitize_dict_recursive(
+            event.copy(), f"event[{i}]"
+        )
+            
+        # Parse and sanitize JSON data field if it's a string
+        if 'data' in sanitized_event and isinstance(sanitized_event['data'], str):
+            try:
+                data_obj = json.loads(sanitized_event['data'])
+                sanitized_data = self.sanitize_dict_recursive(data_obj, f"event[{i}].data")
+                sanitized_event['data'] = json.dumps(sanitized_data)
+            except json.JSONDecodeError:
+                # Leave as-is if not valid JSON
+                pass
             
-            sanitized["events"].append(sanitized_event)
+        return sanitized_event
+    
+    def sanitize_events(self, events: Iterable[Tuple[int, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Sanitize (position, event) pairs, yielding events in their original order.
         
+        With more than one worker, chunks of chunk_size events are sanitized
+        on a process pool. At most two chunks per worker are in flight, so
+        memory stays bounded however many events there are.
+        
+        Args:
+            events: (position, event) pairs, e.g. from enumerate()
+            
+        Returns:
+            Iterator of sanitized events
+        """
+        if self.workers == 1:
+            for i, event in events:
+                yield self.sanitize_event(i, event)
+            return
+        
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.sensitive_patterns,)
+        )
+        pending = deque()
+        try:
+            chunk = []
+            for item in events:
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    pending.append(pool.submit(_sanitize_event_chunk, chunk))
+                    chunk = []
+                while len(pending) >= 2 * self.workers:
+                    yield from self._collect(pending.popleft())
+            if chunk:
+                pending.append(pool.submit(_sanitize_event_chunk, chunk))
+            while pending:
+                yield from self._collect(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown()
+    
+    def _collect(self, future) -> List[Dict[str, Any]]:
+        """Events from a finished chunk, merging its change summary."""
+        sanitized, changes = future.result()
+        self.merge_changes(changes)
         return sanitized
     
     def validate_and_sanitize(self, snapshot: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
@@ -379,7 +540,7 @@ class SnapshotValidator:
         """
         # Reset state
         self.validation_errors = []
-        self.sanitization_changes = []
+        self.sanitization_changes = {}
         
         # Validate structure
         structure_valid = self.validate_snapshot_structure(snapshot)
@@ -409,6 +570,92 @@ class SnapshotValidator:
         
         return is_valid, sanitized_snapshot
     
+    def validate_and_sanitize_file(self, input_file: str, output_file: Optional[str] = None) -> bool:
+        """
+        Validate and sanitize a snapshot file record by record.
+        
+        Memory stays constant apart from the set of session IDs. Events are
+        checked against the sessions that precede them, which is always the
+        case for snapshots written by SnapshotWriter. Events are validated
+        here and sanitized by sanitize_events(), on the pool if configured.
+        
+        Args:
+            input_file: Snapshot to process (JSON or NDJSON)
+            output_file: Where to write the sanitized snapshot; the format
+                follows its extension. Not written in strict mode if the
+                snapshot is invalid.
+            
+        Returns:
+            True if the snapshot is valid
+        """
+        # Reset state
+        self.validation_errors = []
+        self.sanitization_changes = {}
+        
+        writer = SnapshotWriter(output_file) if output_file else None
+        seen_ids: Dict[str, int] = {}
+        session_ids = set()
+        counts = {"sessions": 0, "events": 0}
+        metadata = None
+        valid = True
+        
+        def validated_events() -> Iterator[Tuple[int, Dict[str, Any]]]:
+            """Validate every record, handling metadata and sessions and yielding events."""
+            nonlocal metadata, valid
+            for key, record in iter_snapshot_records(input_file):
+                if key == "metadata":
+                    metadata = record
+                    valid = self.validate_metadata(record) and valid
+                    if writer:
+                        writer.metadata = self.sanitize_metadata(record)
+                elif key == "sessions":
+                    i = counts["sessions"]
+                    valid = self.validate_session(i, record, seen_ids) and valid
+                    session_id = record.get('id') or record.get('claude_session_id')
+                    if session_id:
+                        session_ids.add(session_id)
+                    if writer:
+                        writer.write_session(self.sanitize_session(i, record))
+                    counts["sessions"] += 1
+                elif key == "events":
+                    i = counts["events"]
+                    valid = self.validate_event(i, record, session_ids) and valid
+                    counts["events"] += 1
+                    yield i, record
+        
+        try:
+            if writer:
+                for event in self.sanitize_events(validated_events()):
+                    writer.write_event(event)
+            else:
+                for _ in validated_events():
+                    pass
+            
+            if metadata is None:
+                self.validation_errors.append("Missing required key: metadata")
+                valid = False
+            
+            expected_counts = read_snapshot_header(input_file)["counts"]
+            if expected_counts:
+                for section, count in counts.items():
+                    if expected_counts.get(section, count) != count:
+                        self.validation_errors.append(
+                            f"Header declares {expected_counts[section]} {section}, found {count}"
+                        )
+                        valid = False
+        except Exception:
+            if writer:
+                writer.abort()
+            raise
+        
+        if writer:
+            if valid or not self.strict_mode:
+                writer.close()
+            else:
+                writer.abort()
+        
+        return valid
+    
     def get_validation_report(self) -> Dict[str, Any]:
         """
         Get detailed validation and sanitization report.
@@ -423,12 +670,14 @@ class SnapshotValidator:
                 "is_valid": len(self.validation_errors) == 0
             },
             "sanitization": {
-                "changes_count": len(self.sanitization_changes),
-                "changes": self.sanitization_changes,
+                "changes_count": sum(summary["count"] for summary in self.sanitization_changes.values()),
                 "patterns_found": {
-                    pattern_type: len([c for c in self.sanitization_changes 
-                                     if c['pattern_type'] == pattern_type])
+                    pattern_type: self.sanitization_changes.get(pattern_type, {}).get("count", 0)
                     for pattern_type in self.sensitive_patterns.keys()
+                },
+                "samples": {
+                    pattern_type: summary["samples"]
+                    for pattern_type, summary in self.sanitization_changes.items()
                 }
             }
         }
@@ -437,26 +686,26 @@ class SnapshotValidator:
 def main():
     """Main function for CLI usage."""
     parser = argparse.ArgumentParser(description="Validate and sanitize Chronicle snapshots")
-    parser.add_argument("input", help="Input snapshot file")
-    parser.add_argument("--output", help="Output sanitized snapshot file")
+    parser.add_argument("input", help="Input snapshot file (.json or .ndjson[.gz])")
+    parser.add_argument("--output", help="Output sanitized snapshot file; format follows the extension")
     parser.add_argument("--strict", action="store_true", help="Strict validation mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Processes sanitizing events (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                       help=f"Events per worker task (default: {DEFAULT_CHUNK_SIZE})")
     parser.add_argument("--report", help="Save validation report to file")
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
     
     args = parser.parse_args()
     
-    # Load snapshot
+    # Validate and sanitize, streaming from input to output
+    validator = SnapshotValidator(strict_mode=args.strict, workers=args.workers, chunk_size=args.chunk_size)
     try:
-        with open(args.input, 'r') as f:
-            snapshot = json.load(f)
+        is_valid = validator.validate_and_sanitize_file(args.input, args.output)
     except Exception as e:
-        print(f"❌ Failed to load snapshot: {e}")
+        print(f"❌ Failed to process snapshot: {e}")
         sys.exit(1)
     
-    # Validate and sanitize
-    validator = SnapshotValidator(strict_mode=args.strict)
-    is_valid, sanitized_snapshot = validator.validate_and_sanitize(snapshot)
-    
     # Get report
     report = validator.get_validation_report()
     
@@ -472,25 +721,18 @@ def main():
             for error in report['validation']['errors']:
                 print(f"  - {error}")
         
-        if report['sanitization']['changes'] and args.verbose:
+        if report['sanitization']['samples'] and args.verbose:
             print(f"\n🔧 Sanitization Changes:")
-            for change in report['sanitization']['changes'][:10]:  # Show first 10
-                print(f"  - {change['context']}: {change['pattern_type']}")
-            
-            if len(report['sanitization']['changes']) > 10:
-                remaining = len(report['sanitization']['changes']) - 10
-                print(f"  ... and {remaining} more changes")
+            for pattern_type, samples in report['sanitization']['samples'].items():
+                for change in samples:
+                    print(f"  - {change['context']}: {pattern_type}")
+                
+                remaining = report['sanitization']['patterns_found'][pattern_type] - len(samples)
+                if remaining > 0:
+                    print(f"  ... and {remaining} more {pattern_type} changes")
     
-    # Save sanitized snapshot
-    if args.output and sanitized_snapshot:
-        try:
-            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
-            with open(args.output, 'w') as f:
-                json.dump(sanitized_snapshot, f, indent=2, default=str)
-            print(f"💾 Sanitized snapshot saved to {args.output}")
-        except Exception as e:
-            print(f"❌ Failed to save sanitized snapshot: {e}")
-            sys.exit(1)
+    if args.output and os.path.exists(args.output):
+        print(f"💾 Sanitized snapshot saved to {args.output}")
     
     # Save report
     if args.report:
@@ -5,6 +5,7 @@
 #     "python-dotenv>=1.0.0",
 #     "supabase>=2.0.0",
 #     "ujson>=5.8.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -32,6 +33,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
 from lib.utils import load_chronicle_env
 
 # UJSON for fast JSON processing
@@ -120,7 +124,9 @@ def main():
         
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="notification") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
             logger.info(f"Parsed input data keys: {list(input_data.keys())}")
         except json.JSONDecodeError as e:
             logger.warning(f"No input data received or invalid JSON: {e}")
@@ -132,12 +138,14 @@ def main():
         
         hook = NotificationHook()
         logger.info("Processing notification hook...")
-        result = hook.process_hook(input_data)
+        with trace_span("notification"):
+            result = hook.process_hook(input_data)
         logger.info(f"Notification hook processing result: {result}")
         
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         result["execution_time_ms"] = execution_time
+        record_latency("notification", "total", execution_time)
         
         # Log performance
         if execution_time > 100:
@@ -8,6 +8,7 @@
 #     "typing-extensions>=4.7.0",
 #     "supabase>=2.0.0",
 #     "ujson>=5.8.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -36,9 +37,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
 from lib.utils import (
     load_chronicle_env, sanitize_data, is_mcp_tool, extract_mcp_server_name,
-    parse_tool_response, calculate_duration_ms
+    parse_tool_response, calculate_duration_ms, estimate_payload_size
 )
 
 # UJSON for fast JSON processing
@@ -198,8 +202,7 @@ class PostToolUseHook(BaseHook):
             summary["param_names"] = list(tool_input.keys())
             
             try:
-                input_str = json_impl.dumps(tool_input)
-                summary["input_size"] = len(input_str.encode('utf-8'))
+                summary["input_size"] = estimate_payload_size(tool_input)
             except:
                 summary["input_size"] = 0
             
@@ -286,7 +289,9 @@ def main():
         
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="post_tool_use") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
             logger.info(f"Parsed input data keys: {list(input_data.keys())}")
             
             # Log tool-specific details as per Claude Code spec
@@ -294,15 +299,12 @@ def main():
             if tool_name:
                 logger.info(f"Tool name: {tool_name}")
             
-            tool_input = input_data.get('tool_input')
-            if tool_input:
-                tool_input_size = len(str(tool_input))
-                logger.info(f"Tool input size: {tool_input_size} characters")
+            # Measured from the raw stdin bytes; the bodies stay undecoded
+            if 'tool_input' in input_data:
+                logger.info(f"Tool input size: {input_data.raw_size('tool_input')} bytes")
             
-            tool_response = input_data.get('tool_response')
-            if tool_response:
-                tool_response_size = len(str(tool_response))
-                logger.info(f"Tool response size: {tool_response_size} characters")
+            if 'tool_response' in input_data:
+                logger.info(f"Tool response size: {input_data.raw_size('tool_response')} bytes")
             
             execution_time = input_data.get('execution_time')
             if execution_time:
@@ -317,12 +319,14 @@ def main():
         
         hook = PostToolUseHook()
         logger.info("Processing hook...")
-        result = hook.process_hook(input_data)
+        with trace_span("post_tool_use", tool_name=input_data.get("tool_name", "unknown")):
+            result = hook.process_hook(input_data)
         logger.info(f"Hook processing result: {result}")
         
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         result["execution_time_ms"] = execution_time
+        record_latency("post_tool_use", "total", execution_time)
         
         # Log performance
         if execution_time > 100:
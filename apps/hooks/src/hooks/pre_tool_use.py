@@ -7,6 +7,7 @@
 #     "supabase>=2.18.0",
 #     "typing-extensions>=4.7.0",
 #     "ujson>=5.8.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -35,7 +36,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
-from lib.utils import load_chronicle_env
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
+from lib.utils import estimate_payload_size, load_chronicle_env
 
 # UJSON for fast JSON processing
 try:
@@ -188,7 +192,9 @@ class PreToolUseHook(BaseHook):
             tool_input = input_data.get('tool_input', {})
             
             # Fast permission evaluation
-            permission_result = self.evaluate_permission_decision(input_data)
+            with trace_span("permission_decision", tool_name=tool_name) as span:
+                permission_result = self.evaluate_permission_decision(input_data)
+                span.set_attribute("decision", permission_result["permissionDecision"])
             
             # Create event data for logging
             event_data = create_event_data(
@@ -200,7 +206,7 @@ class PreToolUseHook(BaseHook):
                     "permission_decision": permission_result["permissionDecision"],
                     "permission_reason": permission_result["permissionDecisionReason"],
                     "analysis": {
-                        "input_size_bytes": len(str(tool_input)),
+                        "input_size_bytes": estimate_payload_size(tool_input),
                         "parameter_count": len(tool_input) if isinstance(tool_input, dict) else 0,
                         "sensitive_params": check_sensitive_parameters(tool_input)
                     }
@@ -420,7 +426,9 @@ def main():
         
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="pre_tool_use") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
             logger.info(f"Parsed input data keys: {list(input_data.keys())}")
             
             # Log specific PreToolUse data as per Claude Code spec
@@ -442,7 +450,8 @@ def main():
         
         hook = PreToolUseHook()
         logger.info("Processing permission evaluation...")
-        result = hook.process_hook(input_data)
+        with trace_span("pre_tool_use", tool_name=input_data.get("tool_name", "unknown")):
+            result = hook.process_hook(input_data)
         
         # Log permission decision
         hook_output = result.get('hookSpecificOutput', {})
@@ -455,6 +464,7 @@ def main():
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         result["execution_time_ms"] = execution_time
+        record_latency("pre_tool_use", "total", execution_time)
         
         # Log performance
         if execution_time > 100:
@@ -4,6 +4,7 @@
 # dependencies = [
 #     "python-dotenv>=1.0.0",
 #     "supabase>=2.0.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -44,6 +45,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
 from lib.utils import load_chronicle_env, sanitize_data, get_project_path, extract_session_id
 
 # UJSON for fast JSON processing
@@ -68,9 +72,12 @@ def measure_performance(operation_name):
     """Simple performance measurement context manager."""
     start_time = time.perf_counter()
     metrics = {}
-    yield metrics
+    with trace_span(operation_name):
+        yield metrics
     end_time = time.perf_counter()
     metrics['duration_ms'] = (end_time - start_time) * 1000
+    hook_name, _, phase = operation_name.partition('.')
+    record_latency(hook_name, phase or "total", metrics['duration_ms'])
 
 def get_git_info(cwd: Optional[str] = None) -> Dict[str, Any]:
     """Safely extract git branch and commit information."""
@@ -355,7 +362,9 @@ def main():
     try:
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="session_start") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
         except json.JSONDecodeError as e:
             logger.warning(f"No input data received or invalid JSON: {e}")
             input_data = {}
@@ -366,13 +375,15 @@ def main():
         # Process session start
         start_time = time.perf_counter()
         
-        success, session_data, event_data = hook.process_session_start(input_data)
-        additional_context = hook.generate_session_context(session_data, event_data)
-        response = hook.create_session_start_response(success, session_data, event_data, additional_context)
+        with trace_span("session_start"):
+            success, session_data, event_data = hook.process_session_start(input_data)
+            additional_context = hook.generate_session_context(session_data, event_data)
+            response = hook.create_session_start_response(success, session_data, event_data, additional_context)
         
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         response["execution_time_ms"] = execution_time
+        record_latency("session_start", "total", execution_time)
         
         # Log performance
         if execution_time > 100:
@@ -5,6 +5,7 @@
 #     "python-dotenv>=1.0.0",
 #     "supabase>=2.0.0",
 #     "ujson>=5.8.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -35,6 +36,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
 from lib.utils import load_chronicle_env, extract_session_id, format_error_message
 
 # Load environment variables
@@ -253,7 +257,9 @@ def main():
         
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="stop") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
             logger.info(f"Parsed input data keys: {list(input_data.keys())}")
         except json.JSONDecodeError as e:
             logger.warning(f"No input data received or invalid JSON: {e}")
@@ -265,12 +271,14 @@ def main():
         
         hook = StopHook()
         logger.info("Processing session stop...")
-        result = hook.process_hook(input_data)
+        with trace_span("stop"):
+            result = hook.process_hook(input_data)
         logger.info(f"Session stop processing result: {result}")
         
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         result["execution_time_ms"] = execution_time
+        record_latency("stop", "total", execution_time)
         
         # Log performance and session metrics
         if execution_time > 100:
@@ -5,6 +5,7 @@
 #     "python-dotenv>=1.0.0",
 #     "supabase>=2.0.0",
 #     "ujson>=5.8.0",
+#     "orjson>=3.9.0",
 # ]
 # ///
 """
@@ -26,6 +27,7 @@ import os
 import re
 import sys
 import time
+from collections.abc import Mapping
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -36,6 +38,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 # Import shared library modules
 from lib.database import DatabaseManager
 from lib.base_hook import BaseHook, create_event_data, setup_hook_logging
+from lib.latency_store import record_latency
+from lib.lazy_json import read_hook_input
+from lib.tracing import trace_span
 from lib.utils import load_chronicle_env
 
 # UJSON for fast JSON processing
@@ -223,7 +228,7 @@ class UserPromptSubmitHook(BaseHook):
     
     def _is_valid_prompt_input(self, input_data: Dict[str, Any]) -> bool:
         """Check if input contains valid prompt data."""
-        if not isinstance(input_data, dict):
+        if not isinstance(input_data, Mapping):
             return False
         
         # Check for common prompt fields
@@ -276,9 +281,11 @@ def main():
         
         # Read input from stdin
         try:
-            input_data = json_impl.load(sys.stdin)
+            with trace_span("stdin_parse", hook="user_prompt_submit") as span:
+                input_data = read_hook_input()
+                span.set_attribute("payload_bytes", len(input_data.buffer))
             logger.info(f"Parsed input data keys: {list(input_data.keys())}")
-            logger.debug(f"Input data: {json_impl.dumps(input_data, indent=2)[:500]}...")  # Debug only, truncated
+            logger.debug(f"Input data: {input_data.buffer[:500].decode('utf-8', 'ignore')}...")  # Debug only, truncated
         except json.JSONDecodeError as e:
             logger.warning(f"No input data received or invalid JSON: {e}")
             input_data = {}
@@ -289,12 +296,14 @@ def main():
         
         hook = UserPromptSubmitHook()
         logger.info("Processing hook...")
-        result = hook.process_hook(input_data)
+        with trace_span("user_prompt_submit"):
+            result = hook.process_hook(input_data)
         logger.info(f"Hook processing result: {result}")
         
         # Add execution time
         execution_time = (time.perf_counter() - start_time) * 1000
         result["execution_time_ms"] = execution_time
+        record_latency("user_prompt_submit", "total", execution_time)
         
         # Log performance
         if execution_time > 100:
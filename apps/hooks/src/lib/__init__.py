@@ -17,7 +17,9 @@ from .database import (
     get_database_config,
     get_valid_event_types,
     normalize_event_type,
-    validate_event_type
+    validate_event_type,
+    generate_time_ordered_id,
+    to_epoch_micros
 )
 
 from .base_hook import (
@@ -63,6 +65,8 @@ __all__ = [
     "get_valid_event_types",
     "normalize_event_type",
     "validate_event_type",
+    "generate_time_ordered_id",
+    "to_epoch_micros",
     
     # Base hook components
     "BaseHook",
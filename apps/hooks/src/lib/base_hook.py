@@ -10,12 +10,14 @@ import logging
 import os
 import time
 import uuid
+from collections.abc import Mapping
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, Optional, Generator, Tuple, List, Callable
 
 try:
-    from .database import DatabaseManager
+    from .database import DatabaseManager, generate_time_ordered_id
+    from .tracing import trace_span
     from .utils import (
         extract_session_context, get_git_info, sanitize_data, format_error_message,
         resolve_project_path, get_project_context_with_env_support, validate_environment_setup
@@ -31,7 +33,8 @@ try:
     )
 except ImportError:
     # For UV script compatibility - fallback to basic imports
-    from .database import DatabaseManager
+    from .database import DatabaseManager, generate_time_ordered_id
+    from .tracing import trace_span
     from .utils import sanitize_data
     
     # Mock the advanced functionality for UV compatibility
@@ -191,11 +194,12 @@ class BaseHook:
     
     def process_hook_data(self, input_data: Dict[str, Any], hook_event_name: str) -> Dict[str, Any]:
         """Process and validate input data for any hook type."""
-        if not isinstance(input_data, dict):
+        if not isinstance(input_data, Mapping):
             return {"hook_event_name": hook_event_name, "error": "Invalid input"}
         
         self.claude_session_id = self.get_claude_session_id(input_data)
-        sanitized_input = sanitize_data(input_data)
+        with trace_span("sanitize", hook=hook_event_name):
+            sanitized_input = sanitize_data(input_data)
         
         return {
             "hook_event_name": hook_event_name,
@@ -216,7 +220,9 @@ class BaseHook:
                     "start_time": datetime.now().isoformat(),
                     "project_path": os.getcwd(),
                 }
-                success, session_uuid = self.db_manager.save_session(session_data)
+                with trace_span("session_resolve") as span:
+                    success, session_uuid = self.db_manager.save_session(session_data)
+                    span.set_attribute("success", success)
                 if success:
                     self.session_uuid = session_uuid
                     logger.info(f"Created session with UUID: {session_uuid}")
@@ -232,7 +238,7 @@ class BaseHook:
             if "timestamp" not in event_data:
                 event_data["timestamp"] = datetime.now().isoformat()
             if "event_id" not in event_data:
-                event_data["event_id"] = str(uuid.uuid4())
+                event_data["event_id"] = generate_time_ordered_id()
             
             logger.info(f"Saving event with ID: {event_data['event_id']}, event_type: {event_data.get('event_type')}")
             result = self.db_manager.save_event(event_data)
@@ -496,6 +502,7 @@ def create_event_data(event_type: str, hook_event_name: str,
         Properly structured event data dictionary
     """
     event_data = {
+        "event_id": generate_time_ordered_id(),
         "event_type": event_type,
         "hook_event_name": hook_event_name,
         "timestamp": datetime.now().isoformat(),
@@ -0,0 +1,276 @@
+"""
+LRU cache with TTL expiry for Chronicle hooks.
+
+Every operation is O(1): entries live in an OrderedDict in recency order,
+expiry is checked lazily when an entry is read or reaches the LRU end, and
+eviction pops from the front. Caches can be bounded by entry count and by
+serialized size, and count hits, misses, evictions and expirations.
+
+Hooks are short-lived processes, so an optional SQLite backing store lets
+entries written by one hook invocation be read by the next.
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Share of store opens that prune; every hook process opens the store, and
+# pruning scans the whole table inside a write transaction
+DEFAULT_PRUNE_PROBABILITY = 0.02
+
+
+class SQLiteCacheStore:
+    """
+    Cross-process backing store for LRUCache.
+    
+    Values are stored as JSON with an absolute expiry time. Expired rows
+    are pruned when the store is opened, with probability prune_probability;
+    rows past max_entries, or beyond max_bytes of stored values, are dropped
+    oldest-first at the same time. The limits can therefore be exceeded
+    between prunes; LRUCache never serves an expired row.
+    """
+    
+    def __init__(self, db_path: str, max_entries: int = 10000, timeout: float = 1.0,
+                 max_bytes: Optional[int] = None,
+                 prune_probability: float = DEFAULT_PRUNE_PROBABILITY):
+        self.db_path = Path(db_path).expanduser()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                written_at REAL NOT NULL
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries(expires_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_written_at ON cache_entries(written_at)")
+        if random.random() < prune_probability:
+            self.prune()
+    
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (serialized value, expires_at) or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+    
+    def set(self, key: str, serialized: str, expires_at: float) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)",
+                (key, serialized, expires_at, time.time())
+            )
+    
+    def delete(self, key: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+    
+    def clear(self) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM cache_entries")
+    
+    def prune(self) -> int:
+        """Delete expired rows and rows beyond the size limits; return rows removed."""
+        with self.lock, self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            removed += self.conn.execute('''
+                DELETE FROM cache_entries WHERE key IN (
+                    SELECT key FROM cache_entries ORDER BY written_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,)).rowcount
+            if self.max_bytes is not None:
+                removed += self.conn.execute('''
+                    DELETE FROM cache_entries WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(LENGTH(value)) OVER (ORDER BY written_at DESC) AS running_bytes
+                            FROM cache_entries
+                        ) WHERE running_bytes > ?
+                    )
+                ''', (self.max_bytes,)).rowcount
+        return removed
+    
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and optional size limits.
+    
+    Args:
+        max_size: Maximum number of entries held in memory
+        ttl_seconds: Default time-to-live for entries
+        max_bytes: Optional limit on the total JSON-serialized size of entries
+        backing_store: Optional SQLiteCacheStore shared across processes
+    """
+    
+    def __init__(self, max_size: int = 100, ttl_seconds: float = 300,
+                 max_bytes: Optional[int] = None,
+                 backing_store: Optional[SQLiteCacheStore] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.backing_store = backing_store
+        # key -> (value, expires_at, size_bytes), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.store_hits = 0
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired."""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+            
+            value = self._load_from_store(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.store_hits += 1
+            return value
+    
+    def _load_from_store(self, key: str) -> Any:
+        """Promote an unexpired entry from the backing store into memory."""
+        if self.backing_store is None:
+            return _MISSING
+        try:
+            row = self.backing_store.get(key)
+            if row is None:
+                return _MISSING
+            serialized, expires_at = row
+            if expires_at <= time.time():
+                return _MISSING
+            value = json.loads(serialized)
+        except Exception as e:
+            logger.debug(f"Cache backing store read failed for {key}: {e}")
+            return _MISSING
+        
+        self._insert(key, value, expires_at, len(serialized))
+        return value
+    
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Cache a value, evicting least recently used entries as needed."""
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        
+        serialized = None
+        size = 0
+        if self.max_bytes is not None or self.backing_store is not None:
+            try:
+                serialized = json.dumps(value)
+                size = len(serialized)
+            except (TypeError, ValueError):
+                # Not JSON-serializable: keep in memory only, unsized
+                pass
+        
+        with self.lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Larger than the whole cache; caching it would evict everything
+                self._remove(key)
+                return
+            self._insert(key, value, expires_at, size)
+        
+        if self.backing_store is not None and serialized is not None:
+            try:
+                self.backing_store.set(key, serialized, expires_at)
+            except Exception as e:
+                logger.debug(f"Cache backing store write failed for {key}: {e}")
+    
+    def _insert(self, key: str, value: Any, expires_at: float, size: int) -> None:
+        self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self.current_bytes += size
+        
+        now = time.time()
+        while self._entries and (
+            len(self._entries) > self.max_size
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            oldest_key, (_, oldest_expires_at, _) = next(iter(self._entries.items()))
+            self._remove(oldest_key)
+            if oldest_expires_at <= now:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+    
+    def delete(self, key: str) -> None:
+        """Remove a key from memory and the backing store."""
+        with self.lock:
+            self._remove(key)
+        if self.backing_store is not None:
+            self.backing_store.delete(key)
+    
+    def clear(self) -> None:
+        """Clear all cached data, including the backing store."""
+        with self.lock:
+            self._entries.clear()
+            self.current_bytes = 0
+        if self.backing_store is not None:
+            self.backing_store.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] > time.time()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "store_hits": self.store_hits,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "persistent": self.backing_store is not None,
+            }
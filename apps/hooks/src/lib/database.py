@@ -6,16 +6,16 @@ from Supabase (PostgreSQL) to SQLite when needed. Extracted from inline hooks
 with updated event type mappings and UV compatibility.
 """
 
-import json
 import logging
 import os
+import re
 import sqlite3
 import time
 import uuid
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Load environment variables
 try:
@@ -32,11 +32,14 @@ except ImportError:
     SUPABASE_AVAILABLE = False
     Client = None
 
-# UJSON for fast JSON processing
 try:
-    import ujson as json_impl
+    from .json_codec import dumps_bytes
+    from .latency_store import record_counter
+    from .tracing import trace_span
 except ImportError:
-    import json as json_impl
+    from json_codec import dumps_bytes
+    from latency_store import record_counter
+    from tracing import trace_span
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -201,15 +204,35 @@ class DatabaseManager:
                 data TEXT NOT NULL DEFAULT '{}',
                 tool_name TEXT,
                 duration_ms INTEGER CHECK (duration_ms >= 0),
+                timestamp_us INTEGER,
                 created_at TEXT DEFAULT (datetime('now', 'utc')),
                 FOREIGN KEY(session_id) REFERENCES sessions(id) ON DELETE CASCADE
             )
         ''')
         
+        # Bring databases created before timestamp_us existed up to date
+        self._migrate_sqlite_schema(conn)
+        
         # Create indexes
         conn.execute('CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp_us ON events(timestamp_us)')
+    
+    def _migrate_sqlite_schema(self, conn: sqlite3.Connection):
+        """Add the timestamp_us column to existing events tables and backfill it."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        if "timestamp_us" in columns:
+            return
+        
+        conn.execute("ALTER TABLE events ADD COLUMN timestamp_us INTEGER")
+        
+        # Parse in Python: stored timestamps mix naive local time and 'Z' UTC,
+        # which SQLite's date functions would both read as UTC
+        rows = conn.execute("SELECT id, timestamp FROM events").fetchall()
+        updates = [(to_epoch_micros(ts), event_id) for event_id, ts in rows]
+        conn.executemany("UPDATE events SET timestamp_us = ? WHERE id = ?", updates)
+        logger.info(f"Backfilled timestamp_us for {len(updates)} existing events")
     
     def save_session(self, session_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Save session data to BOTH databases (Supabase and SQLite)."""
@@ -335,15 +358,100 @@ class DatabaseManager:
             
             return False, None
     
+    # Valid event types for the Supabase CHECK constraint
+    SUPABASE_EVENT_TYPES = [
+        "prompt", "tool_use", "session_start", "session_end", "notification", "error",
+        "pre_tool_use", "post_tool_use", "user_prompt_submit", "stop", "subagent_stop",
+        "pre_compact", "subagent_termination", "pre_compaction"
+    ]
+    
+    def _resolve_event_id(self, event_data: Dict[str, Any]) -> str:
+        """
+        Use the caller's event_id when it is a valid UUID, else generate one.
+        
+        The chosen ID is written back to event_data so retries and replays of
+        the same dict reuse it and are deduplicated by the primary key.
+        """
+        event_id = event_data.get("event_id")
+        try:
+            uuid.UUID(str(event_id))
+        except (ValueError, TypeError):
+            event_id = generate_time_ordered_id()
+        event_data["event_id"] = event_id
+        return event_id
+    
+    def _build_event_metadata(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge data, hook_event_name and metadata into the stored JSON payload."""
+        metadata_jsonb = dict(event_data.get("data") or {})
+        
+        if "hook_event_name" in event_data:
+            metadata_jsonb["hook_event_name"] = event_data.get("hook_event_name")
+        
+        if "metadata" in event_data:
+            metadata_jsonb.update(event_data.get("metadata", {}))
+        
+        return metadata_jsonb
+    
+    def _build_supabase_event(self, event_id: str, session_id: str,
+                              event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a chronicle_events row for Supabase."""
+        event_type = event_data.get("event_type")
+        if event_type not in self.SUPABASE_EVENT_TYPES:
+            event_type = "notification"
+        
+        return {
+            "id": event_id,
+            "session_id": session_id,
+            "event_type": event_type,
+            "timestamp": event_data.get("timestamp"),
+            "metadata": self._build_event_metadata(event_data),
+        }
+    
+    def _build_sqlite_event(self, event_id: str, session_id: str,
+                            event_data: Dict[str, Any]) -> Tuple:
+        """Build the parameter tuple for SQLITE_EVENT_INSERT."""
+        metadata_jsonb = self._build_event_metadata(event_data)
+        
+        return (
+            event_id,
+            session_id,
+            event_data.get("event_type"),
+            event_data.get("timestamp"),
+            dumps_bytes(metadata_jsonb),
+            metadata_jsonb.get("tool_name"),
+            to_epoch_micros(event_data.get("timestamp")),
+        )
+    
+    # Duplicate IDs are skipped rather than raised, so re-sending an event is a no-op.
+    # data arrives as UTF-8 bytes; the CAST stores it as TEXT without a str round trip.
+    SQLITE_EVENT_INSERT = '''
+        INSERT INTO events 
+        (id, session_id, event_type, timestamp, data, tool_name, timestamp_us)
+        VALUES (?, ?, ?, ?, CAST(? AS TEXT), ?, ?)
+        ON CONFLICT(id) DO NOTHING
+    '''
+    
+    def _upsert_supabase_events(self, rows) -> None:
+        """Insert event rows into Supabase, ignoring IDs that already exist."""
+        self.supabase_client.table(self.EVENTS_TABLE).upsert(
+            rows, on_conflict="id", ignore_duplicates=True
+        ).execute()
+    
     def save_event(self, event_data: Dict[str, Any]) -> bool:
-        """Save event data to BOTH databases (Supabase and SQLite)."""
+        """
+        Save event data to BOTH databases (Supabase and SQLite).
+        
+        Idempotent: the caller's event_id is used as the primary key and an
+        event that was already saved is silently skipped, so the same event
+        can be retried or replayed without creating duplicates.
+        """
         try:
-            event_id = str(uuid.uuid4())
-            
             if "session_id" not in event_data:
                 logger.error("Event data missing required session_id")
                 return False
             
+            event_id = self._resolve_event_id(event_data)
+            
             # Ensure session_id is a valid UUID
             session_id = ensure_valid_uuid(event_data.get("session_id"))
             
@@ -354,74 +462,37 @@ class DatabaseManager:
             # Try Supabase first
             if self.supabase_client:
                 try:
-                    metadata_jsonb = event_data.get("data", {})
-                    
-                    if "hook_event_name" in event_data:
-                        metadata_jsonb["hook_event_name"] = event_data.get("hook_event_name")
-                    
-                    if "metadata" in event_data:
-                        metadata_jsonb.update(event_data.get("metadata", {}))
-                    
-                    # UPDATED valid event types from inline hook analysis
-                    event_type = event_data.get("event_type")
-                    valid_types = [
-                        "prompt", "tool_use", "session_start", "session_end", "notification", "error",
-                        "pre_tool_use", "post_tool_use", "user_prompt_submit", "stop", "subagent_stop",
-                        "pre_compact", "subagent_termination", "pre_compaction"
-                    ]
-                    if event_type not in valid_types:
-                        event_type = "notification"
-                    
-                    supabase_data = {
-                        "id": event_id,
-                        "session_id": session_id,
-                        "event_type": event_type,
-                        "timestamp": event_data.get("timestamp"),
-                        "metadata": metadata_jsonb,
-                    }
-                    
-                    logger.info(f"Saving to Supabase - event_type: {event_type} (original: {event_data.get('event_type')})")
-                    self.supabase_client.table(self.EVENTS_TABLE).insert(supabase_data).execute()
-                    logger.info(f"Supabase event saved successfully: {event_type}")
-                    supabase_saved = True
+                    with trace_span("supabase_write", backend="supabase") as span:
+                        supabase_data = self._build_supabase_event(event_id, session_id, event_data)
+                        event_type = supabase_data["event_type"]
+                        span.set_attribute("event_type", event_type)
+                        span.set_attribute("payload_bytes", len(dumps_bytes(supabase_data["metadata"])))
+                        
+                        logger.info(f"Saving to Supabase - event_type: {event_type} (original: {event_data.get('event_type')})")
+                        self._upsert_supabase_events(supabase_data)
+                        logger.info(f"Supabase event saved successfully: {event_type}")
+                        supabase_saved = True
                     
                 except Exception as e:
                     logger.warning(f"Supabase event save failed: {e}")
             
             # Always try SQLite regardless of Supabase result
             try:
-                with sqlite3.connect(str(self.sqlite_path), timeout=self.timeout) as conn:
-                    metadata_jsonb = event_data.get("data", {})
-                    
-                    if "hook_event_name" in event_data:
-                        metadata_jsonb["hook_event_name"] = event_data.get("hook_event_name")
-                    
-                    if "metadata" in event_data:
-                        metadata_jsonb.update(event_data.get("metadata", {}))
-                    
-                    # Extract tool_name if present in data
-                    tool_name = None
-                    if metadata_jsonb and "tool_name" in metadata_jsonb:
-                        tool_name = metadata_jsonb["tool_name"]
-                    
-                    conn.execute('''
-                        INSERT INTO events 
-                        (id, session_id, event_type, timestamp, data, tool_name)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        event_id,
-                        session_id,
-                        event_data.get("event_type"),
-                        event_data.get("timestamp"),
-                        json.dumps(metadata_jsonb),
-                        tool_name,
-                    ))
-                    conn.commit()
-                    logger.info(f"SQLite event saved successfully: {event_data.get('event_type')}")
-                    sqlite_saved = True
+                with trace_span("sqlite_write", backend="sqlite") as span:
+                    row = self._build_sqlite_event(event_id, session_id, event_data)
+                    span.set_attribute("payload_bytes", len(row[4]))
+                    if row[5]:
+                        span.set_attribute("tool_name", row[5])
+                    with sqlite3.connect(str(self.sqlite_path), timeout=self.timeout) as conn:
+                        conn.execute(self.SQLITE_EVENT_INSERT, row)
+                        conn.commit()
+                        logger.info(f"SQLite event saved successfully: {event_data.get('event_type')}")
+                        sqlite_saved = True
             except Exception as e:
                 logger.warning(f"SQLite event save failed: {e}")
             
+            self._record_write_outcome(supabase_saved, sqlite_saved)
+            
             # Log final result
             if supabase_saved and sqlite_saved:
                 logger.info(f"Event saved to BOTH databases: {event_data.get('event_type')}")
@@ -434,31 +505,19 @@ class DatabaseManager:
             
             # Return success if at least one database saved
             return supabase_saved or sqlite_saved
-            
+        
         except Exception as e:
             logger.error(f"Event save failed: {e}")
             
-            # If SQLite failed but Supabase is available, try Supabase as fallback
-            if self.supabase_client:
+            # Retry once with Supabase; safe because duplicate IDs are ignored
+            if self.supabase_client and event_data.get("event_id"):
                 try:
-                    logger.info("Retrying event save with Supabase after SQLite failure...")
-                    metadata_jsonb = event_data.get("data", {})
-                    
-                    if "hook_event_name" in event_data:
-                        metadata_jsonb["hook_event_name"] = event_data.get("hook_event_name")
-                    
-                    if "metadata" in event_data:
-                        metadata_jsonb.update(event_data.get("metadata", {}))
-                    
-                    supabase_data = {
-                        "id": event_id,
-                        "session_id": session_id,
-                        "event_type": event_data.get("event_type"),
-                        "timestamp": event_data.get("timestamp"),
-                        "metadata": metadata_jsonb,
-                    }
-                    
-                    self.supabase_client.table(self.EVENTS_TABLE).insert(supabase_data).execute()
+                    logger.info("Retrying event save with Supabase...")
+                    self._upsert_supabase_events(self._build_supabase_event(
+                        event_data["event_id"],
+                        ensure_valid_uuid(event_data.get("session_id")),
+                        event_data
+                    ))
                     logger.info(f"Successfully saved event to Supabase on retry: {event_data.get('event_type')}")
                     return True
                 except Exception as retry_error:
@@ -466,6 +525,66 @@ class DatabaseManager:
             
             return False
     
+    def _record_write_outcome(self, supabase_saved: bool, sqlite_saved: bool, count: int = 1) -> None:
+        """Count event writes per backend, and Supabase failures covered by SQLite."""
+        if self.supabase_client:
+            record_counter("event_writes", count, backend="supabase",
+                           result="success" if supabase_saved else "failure")
+            if sqlite_saved and not supabase_saved:
+                record_counter("supabase_fallbacks", count)
+        record_counter("event_writes", count, backend="sqlite",
+                       result="success" if sqlite_saved else "failure")
+    
+    def save_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Save a batch of events to BOTH databases in one round trip each.
+        
+        Like save_event, rows whose event_id already exists are skipped, so a
+        whole batch can be re-sent after a partial or unknown failure.
+        
+        Args:
+            events: Event dictionaries, each with a session_id
+        
+        Returns:
+            True if the batch was saved to at least one database
+        """
+        events = [event for event in events if "session_id" in event]
+        if not events:
+            return False
+        
+        prepared = [
+            (self._resolve_event_id(event), ensure_valid_uuid(event.get("session_id")), event)
+            for event in events
+        ]
+        
+        supabase_saved = False
+        sqlite_saved = False
+        
+        if self.supabase_client:
+            try:
+                self._upsert_supabase_events([
+                    self._build_supabase_event(event_id, session_id, event)
+                    for event_id, session_id, event in prepared
+                ])
+                supabase_saved = True
+            except Exception as e:
+                logger.warning(f"Supabase batch event save failed: {e}")
+        
+        try:
+            with sqlite3.connect(str(self.sqlite_path), timeout=self.timeout) as conn:
+                conn.executemany(self.SQLITE_EVENT_INSERT, [
+                    self._build_sqlite_event(event_id, session_id, event)
+                    for event_id, session_id, event in prepared
+                ])
+                conn.commit()
+                sqlite_saved = True
+        except Exception as e:
+            logger.warning(f"SQLite batch event save failed: {e}")
+        
+        self._record_write_outcome(supabase_saved, sqlite_saved, len(prepared))
+        logger.info(f"Batch of {len(prepared)} events saved (supabase={supabase_saved}, sqlite={sqlite_saved})")
+        return supabase_saved or sqlite_saved
+    
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve session by ID from database."""
         try:
@@ -622,4 +741,80 @@ def ensure_valid_uuid(value: str) -> str:
         uuid.UUID(value)
         return value
     except ValueError:
-        return str(uuid.uuid4())
\ No newline at end of file
+        return str(uuid.uuid4())
+
+
+# Per-process state keeping UUIDv7s monotonic within the same millisecond
+_uuid7_state = {"ms": 0, "seq": 0}
+
+
+def generate_time_ordered_id() -> str:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562) string.
+    
+    The leading 48 bits are the Unix time in milliseconds, so new IDs
+    sort after old ones and primary-key inserts append to the end of the
+    index instead of landing at random pages. Within one millisecond a
+    12-bit counter keeps IDs from the same process strictly increasing.
+    
+    Returns:
+        A UUIDv7 string
+    """
+    ms = time.time_ns() // 1_000_000
+    if ms <= _uuid7_state["ms"]:
+        ms = _uuid7_state["ms"]
+        seq = _uuid7_state["seq"] + 1
+        if seq > 0xFFF:
+            ms += 1
+            seq = 0
+    else:
+        # Random start, leaving headroom for the counter
+        seq = int.from_bytes(os.urandom(2), "big") & 0x7FF
+    _uuid7_state["ms"] = ms
+    _uuid7_state["seq"] = seq
+    
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (seq << 64) | (0x2 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Seconds fraction of an ISO 8601 time; before Python 3.11 fromisoformat only
+# accepts 3 or 6 digits, while PostgreSQL writes 1 to 6 and others up to 9
+_ISO_FRACTION = re.compile(r"(:\d{2})\.(\d+)")
+
+
+def _six_digit_fraction(match: "re.Match") -> str:
+    """Pad or truncate a matched seconds fraction to microseconds."""
+    return f"{match.group(1)}.{match.group(2)[:6].ljust(6, '0')}"
+
+
+def to_epoch_micros(timestamp: Union[str, datetime, None]) -> Optional[int]:
+    """
+    Convert a timestamp to integer microseconds since the Unix epoch.
+    
+    Naive values are interpreted as local time (how hooks write them);
+    'Z'-suffixed or offset values are honored.
+    
+    Args:
+        timestamp: ISO 8601 string or datetime
+        
+    Returns:
+        Epoch microseconds, or None if the value can't be parsed
+    """
+    if timestamp is None:
+        return None
+    
+    try:
+        if isinstance(timestamp, datetime):
+            dt = timestamp
+        else:
+            text = _ISO_FRACTION.sub(_six_digit_fraction, str(timestamp).replace("Z", "+00:00"), count=1)
+            dt = datetime.fromisoformat(text)
+        
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        return (dt - _EPOCH) // timedelta(microseconds=1)
+    except (ValueError, TypeError, OverflowError):
+        return None
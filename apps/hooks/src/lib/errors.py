@@ -26,6 +26,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 from contextlib import contextmanager
 
+try:
+    from .latency_store import record_counter
+except ImportError:
+    from latency_store import record_counter
+
 
 class ErrorSeverity(Enum):
     """Error severity levels for classification and handling."""
@@ -515,6 +520,7 @@ class ErrorHandler:
         if error_key not in self.error_counts:
             self.error_counts[error_key] = 0
         self.error_counts[error_key] += 1
+        record_counter("errors", code=error.error_code, type=error.__class__.__name__)
         
         # Track last occurrence
         self.last_errors[error_key] = {
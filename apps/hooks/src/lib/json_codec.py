@@ -0,0 +1,96 @@
+"""
+JSON serialization facade for Chronicle hooks.
+
+Uses orjson when it is installed, otherwise ujson, otherwise the standard
+library. dumps_bytes() returns UTF-8 bytes so payloads headed for SQLite
+or files never round-trip through str; dumps() returns text for callers
+that need it. Output is compact and keeps non-ASCII characters unescaped.
+
+Values a fast backend rejects (integers beyond 64 bits, lone surrogates,
+non-string keys under ujson) are retried with the standard library using
+default=str, so every backend accepts what json.dumps(..., default=str)
+accepts. Decode errors are always json.JSONDecodeError.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+_FALLBACK_ERRORS = (TypeError, ValueError, OverflowError, UnicodeEncodeError)
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    # ASCII-escaped so the result always encodes, even with lone surrogates
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+        except _FALLBACK_ERRORS:
+            pass
+    elif ujson is not None:
+        try:
+            return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+        except _FALLBACK_ERRORS:
+            pass
+    return _stdlib_dumps(obj).encode("ascii")
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to compact JSON text."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode("utf-8")
+        except _FALLBACK_ERRORS:
+            pass
+    elif ujson is not None:
+        try:
+            return ujson.dumps(obj, ensure_ascii=False)
+        except _FALLBACK_ERRORS:
+            pass
+    return _stdlib_dumps(obj)
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Deserialize JSON text or UTF-8 bytes.
+    
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    elif ujson is not None and not isinstance(data, memoryview):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            pass
+    # Accepts NaN/Infinity, which the fast parsers reject, and raises the standard error
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
@@ -0,0 +1,449 @@
+"""
+Persistent cross-process latency histograms for Chronicle hooks.
+
+Each hook runs as a short-lived process, so in-memory statistics are lost
+at exit. This module records hook and phase timings into fixed log-linear
+histogram buckets and flushes them at process exit into a shared SQLite
+file. Because bucket boundaries are fixed, histograms from any number of
+processes merge by adding counts, and percentiles can be reported across
+thousands of invocations. Labelled counters (writes per backend, errors,
+security findings) are persisted the same way.
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from .utils import get_chronicle_data_dir
+except ImportError:
+    from utils import get_chronicle_data_dir
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Log-linear buckets: two significant digits per decade (10..99 x 10^e ms),
+# from 1 microsecond to 1000 seconds. Relative error is at most 10%.
+MIN_EXPONENT = -3
+MAX_EXPONENT = 5
+SUB_BUCKETS = 90
+BUCKET_COUNT = (MAX_EXPONENT - MIN_EXPONENT + 1) * SUB_BUCKETS + 2  # plus underflow/overflow
+
+
+def bucket_index(duration_ms: float) -> int:
+    """
+    Map a duration to its histogram bucket.
+    
+    Bucket 0 holds values below 1 microsecond and the last bucket holds
+    values of 1000 seconds or more.
+    """
+    if duration_ms < 10.0 ** MIN_EXPONENT:
+        return 0
+    
+    exponent = math.floor(math.log10(duration_ms))
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    
+    mantissa = int(duration_ms / (10.0 ** exponent) * 10)
+    mantissa = min(max(mantissa, 10), 99)  # guard float rounding at decade edges
+    return 1 + (exponent - MIN_EXPONENT) * SUB_BUCKETS + (mantissa - 10)
+
+
+def bucket_upper_bound(index: int) -> float:
+    """Upper bound in milliseconds of a bucket."""
+    if index <= 0:
+        return 10.0 ** MIN_EXPONENT
+    if index >= BUCKET_COUNT - 1:
+        return math.inf
+    
+    exponent, offset = divmod(index - 1, SUB_BUCKETS)
+    return (offset + 11) / 10 * 10.0 ** (exponent + MIN_EXPONENT)
+
+
+class LatencyHistogram:
+    """Mergeable latency histogram with fixed log-linear buckets."""
+    
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+    
+    def record(self, duration_ms: float) -> None:
+        """Add one observation."""
+        if duration_ms is None or duration_ms < 0:
+            return
+        index = bucket_index(duration_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        self.min_ms = min(self.min_ms, duration_ms)
+        self.max_ms = max(self.max_ms, duration_ms)
+    
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's observations to this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile (0-1) in milliseconds.
+        
+        Returns the upper bound of the bucket containing the quantile,
+        capped at the largest observed value, so estimates never understate.
+        """
+        if not self.count:
+            return 0.0
+        
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max_ms)
+        return self.max_ms
+    
+    def fraction_above(self, threshold_ms: float) -> float:
+        """Approximate fraction of observations above a threshold."""
+        if not self.count:
+            return 0.0
+        limit = bucket_index(threshold_ms)
+        above = sum(count for index, count in self.buckets.items() if index > limit)
+        return above / self.count
+    
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, extremes and standard percentiles."""
+        return {
+            "count": self.count,
+            "avg_ms": self.sum_ms / self.count if self.count else 0.0,
+            "min_ms": self.min_ms if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dictionary."""
+        return {
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "count": self.count,
+            "sum_ms": self.sum_ms,
+            "min_ms": self.min_ms if self.count else None,
+            "max_ms": self.max_ms,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """Rebuild a histogram serialized by to_dict()."""
+        histogram = cls()
+        histogram.buckets = {int(index): int(count) for index, count in data.get("buckets", {}).items()}
+        histogram.count = int(data.get("count", 0))
+        histogram.sum_ms = float(data.get("sum_ms", 0.0))
+        min_ms = data.get("min_ms")
+        histogram.min_ms = math.inf if min_ms is None else float(min_ms)
+        histogram.max_ms = float(data.get("max_ms", 0.0))
+        return histogram
+
+
+class LatencyStore:
+    """
+    SQLite-backed store of (hook, phase) latency histograms.
+    
+    Observations are buffered in memory and written in one short
+    transaction by flush(), which runs automatically at interpreter exit.
+    Writers from concurrent hook processes only ever add to counters, so
+    no read-modify-write coordination is needed beyond SQLite's own
+    locking.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None, timeout: float = 2.0):
+        self.db_path = Path(
+            db_path or os.getenv("CHRONICLE_PERF_DB") or get_chronicle_data_dir() / "perf.db"
+        ).expanduser()
+        self.timeout = timeout
+        self.pending: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.pending_counters: Dict[Tuple[str, str], float] = {}
+        self.lock = threading.Lock()
+        self._exit_hook_registered = False
+    
+    def record(self, hook: str, phase: str, duration_ms: float) -> None:
+        """Buffer one observation; flushed at exit or on flush()."""
+        with self.lock:
+            histogram = self.pending.get((hook, phase))
+            if histogram is None:
+                histogram = self.pending[(hook, phase)] = LatencyHistogram()
+            histogram.record(duration_ms)
+            self._register_exit_hook()
+    
+    def increment(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1.0) -> None:
+        """Buffer a counter increment; flushed with the histograms."""
+        key = (name, json.dumps(labels or {}, sort_keys=True))
+        with self.lock:
+            self.pending_counters[key] = self.pending_counters.get(key, 0.0) + amount
+            self._register_exit_hook()
+    
+    def _register_exit_hook(self) -> None:
+        if not self._exit_hook_registered:
+            atexit.register(self._flush_at_exit)
+            self._exit_hook_registered = True
+    
+    def _flush_at_exit(self) -> None:
+        # Re-check the switch: it may have been set after recording started
+        if is_latency_store_enabled():
+            self.flush()
+    
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=self.timeout)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS latency_buckets (
+                hook TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (hook, phase, bucket)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS latency_totals (
+                hook TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum_ms REAL NOT NULL,
+                min_ms REAL NOT NULL,
+                max_ms REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (hook, phase)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS metric_counters (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels)
+            ) WITHOUT ROWID
+        ''')
+        return conn
+    
+    def flush(self) -> int:
+        """
+        Write buffered observations to the store.
+        
+        Returns:
+            Number of observations and counter updates written (0 on failure; never raises)
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            counters, self.pending_counters = self.pending_counters, {}
+        if not pending and not counters:
+            return 0
+        
+        bucket_rows = [
+            (hook, phase, index, count)
+            for (hook, phase), histogram in pending.items()
+            for index, count in histogram.buckets.items()
+        ]
+        now = time.time()
+        total_rows = [
+            (hook, phase, h.count, h.sum_ms, h.min_ms, h.max_ms, now)
+            for (hook, phase), h in pending.items()
+        ]
+        
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany('''
+                        INSERT INTO latency_buckets (hook, phase, bucket, count)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(hook, phase, bucket) DO UPDATE SET count = count + excluded.count
+                    ''', bucket_rows)
+                    conn.executemany('''
+                        INSERT INTO latency_totals (hook, phase, count, sum_ms, min_ms, max_ms, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(hook, phase) DO UPDATE SET
+                            count = count + excluded.count,
+                            sum_ms = sum_ms + excluded.sum_ms,
+                            min_ms = MIN(min_ms, excluded.min_ms),
+                            max_ms = MAX(max_ms, excluded.max_ms),
+                            updated_at = excluded.updated_at
+                    ''', total_rows)
+                    conn.executemany('''
+                        INSERT INTO metric_counters (name, labels, value)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(name, labels) DO UPDATE SET value = value + excluded.value
+                    ''', [(name, labels, value) for (name, labels), value in counters.items()])
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.debug(f"Failed to flush latency histograms to {self.db_path}: {e}")
+            return 0
+        
+        return sum(h.count for h in pending.values()) + len(counters)
+    
+    def load(self, hook: Optional[str] = None) -> Dict[Tuple[str, str], LatencyHistogram]:
+        """Read merged histograms, optionally for a single hook."""
+        if not self.db_path.exists():
+            return {}
+        
+        where = " WHERE hook = ?" if hook else ""
+        params = (hook,) if hook else ()
+        histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        
+        conn = self._connect()
+        try:
+            for name, phase, count, sum_ms, min_ms, max_ms in conn.execute(
+                f"SELECT hook, phase, count, sum_ms, min_ms, max_ms FROM latency_totals{where}", params
+            ):
+                histogram = histograms[(name, phase)] = LatencyHistogram()
+                histogram.count = count
+                histogram.sum_ms = sum_ms
+                histogram.min_ms = min_ms
+                histogram.max_ms = max_ms
+            
+            for name, phase, index, count in conn.execute(
+                f"SELECT hook, phase, bucket, count FROM latency_buckets{where}", params
+            ):
+                if (name, phase) in histograms:
+                    histograms[(name, phase)].buckets[index] = count
+        finally:
+            conn.close()
+        
+        return histograms
+    
+    def load_counters(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Read persisted counters as (name, labels, value), sorted by name and labels."""
+        if not self.db_path.exists():
+            return []
+        
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT name, labels, value FROM metric_counters ORDER BY name, labels").fetchall()
+        finally:
+            conn.close()
+        return [(name, json.loads(labels), value) for name, labels, value in rows]
+    
+    def report(self, hook: Optional[str] = None, budget_ms: float = 100.0) -> List[Dict[str, Any]]:
+        """
+        Summarize stored histograms per hook and phase.
+        
+        Args:
+            hook: Limit the report to one hook
+            budget_ms: Latency budget used for the over-budget fraction
+        
+        Returns:
+            One summary dictionary per (hook, phase), sorted by hook then phase
+        """
+        rows = []
+        for (name, phase), histogram in sorted(self.load(hook).items()):
+            summary = histogram.summary()
+            summary.update({
+                "hook": name,
+                "phase": phase,
+                "over_budget_pct": histogram.fraction_above(budget_ms) * 100,
+            })
+            rows.append(summary)
+        return rows
+    
+    def reset(self) -> None:
+        """Delete all stored histograms."""
+        with self.lock:
+            self.pending.clear()
+            self.pending_counters.clear()
+        if self.db_path.exists():
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM latency_buckets")
+                    conn.execute("DELETE FROM latency_totals")
+                    conn.execute("DELETE FROM metric_counters")
+            finally:
+                conn.close()
+
+
+def is_latency_store_enabled() -> bool:
+    """Persistent histograms are on unless CHRONICLE_PERF_STORE disables them."""
+    return os.getenv("CHRONICLE_PERF_STORE", "1").lower() not in ("0", "false", "off", "no")
+
+
+# Global latency store, created on first use
+_latency_store: Optional[LatencyStore] = None
+
+
+def get_latency_store() -> LatencyStore:
+    """Get the global latency store instance."""
+    global _latency_store
+    if _latency_store is None:
+        _latency_store = LatencyStore()
+    return _latency_store
+
+
+def get_cpu_times_ms() -> Optional[Tuple[float, float]]:
+    """
+    User and system CPU time consumed by this process, in milliseconds.
+    
+    Uses a single getrusage() call; returns None where it is unavailable.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime * 1000, usage.ru_stime * 1000
+
+
+def record_latency(hook: str, phase: str, duration_ms: float) -> None:
+    """
+    Record a hook phase timing in the persistent histogram store.
+    
+    Cheap enough for the hook hot path: it only updates an in-memory
+    histogram; the disk write happens once at process exit. A "total"
+    timing marks the hook boundary, where the process CPU time is also
+    recorded as the cpu_user and cpu_system phases.
+    """
+    if not is_latency_store_enabled():
+        return
+    try:
+        store = get_latency_store()
+        store.record(hook, phase, duration_ms)
+        if phase == "total":
+            cpu_times = get_cpu_times_ms()
+            if cpu_times:
+                store.record(hook, "cpu_user", cpu_times[0])
+                store.record(hook, "cpu_system", cpu_times[1])
+    except Exception as e:
+        logger.debug(f"Failed to record latency for {hook}.{phase}: {e}")
+
+
+def record_counter(name: str, amount: float = 1.0, **labels) -> None:
+    """
+    Increment a persistent labelled counter, e.g.
+    record_counter("event_writes", backend="sqlite", result="success").
+    
+    Like record_latency, this only touches memory until process exit.
+    """
+    if not is_latency_store_enabled():
+        return
+    try:
+        get_latency_store().increment(name, {key: str(value) for key, value in labels.items()}, amount)
+    except Exception as e:
+        logger.debug(f"Failed to record counter {name}: {e}")
@@ -0,0 +1,216 @@
+"""
+Lazy view over a hook's JSON stdin payload.
+
+Hooks used to decode the whole payload before doing anything, although
+most decisions need only a few top-level fields, and PostToolUse payloads
+can carry multi-megabyte tool_response bodies. read_hook_input() reads
+stdin as bytes in one buffer and indexes the top-level keys with a scan
+that skips over nested values without decoding them. Values are decoded
+on first access; large fields can be measured, hashed or previewed
+straight from their raw byte slice without ever becoming Python objects.
+
+The scan relies on UTF-8 never using ASCII bytes inside multi-byte
+sequences, so quotes and brackets can be found at the byte level.
+"""
+
+import hashlib
+import json
+import re
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+try:
+    from .json_codec import loads as json_loads
+except ImportError:
+    from json_codec import loads as json_loads
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+# Complete JSON string starting at a quote (unrolled to stay linear)
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Characters that matter while skipping a nested object or array
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+_SCALAR_END = re.compile(rb'[ \t\n\r,}\]]')
+
+_QUOTE, _OPEN_BRACE, _CLOSE_BRACE = ord('"'), ord('{'), ord('}')
+_OPEN_BRACKET, _COMMA, _COLON = ord('['), ord(','), ord(':')
+
+
+def _error(message: str, buffer: bytes, pos: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, buffer[:pos + 1].decode('utf-8', 'replace'), pos)
+
+
+def _skip_whitespace(buffer: bytes, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
+
+
+def _string_end(buffer: bytes, pos: int) -> int:
+    match = _STRING.match(buffer, pos)
+    if match is None:
+        raise _error("Unterminated string", buffer, pos)
+    return match.end()
+
+
+def _value_end(buffer: bytes, pos: int) -> int:
+    """Offset just past the JSON value starting at pos, without decoding it."""
+    if pos >= len(buffer):
+        raise _error("Expecting value", buffer, pos)
+    first = buffer[pos]
+    
+    if first == _QUOTE:
+        return _string_end(buffer, pos)
+    
+    if first in (_OPEN_BRACE, _OPEN_BRACKET):
+        depth = 0
+        i = pos
+        while True:
+            match = _STRUCTURE.search(buffer, i)
+            if match is None:
+                raise _error("Unterminated object or array", buffer, pos)
+            char = buffer[match.start()]
+            if char == _QUOTE:
+                i = _string_end(buffer, match.start())
+                continue
+            depth += 1 if char in (_OPEN_BRACE, _OPEN_BRACKET) else -1
+            i = match.end()
+            if depth == 0:
+                return i
+    
+    match = _SCALAR_END.search(buffer, pos)
+    end = match.start() if match else len(buffer)
+    if end == pos:
+        raise _error("Expecting value", buffer, pos)
+    return end
+
+
+def index_object(buffer: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Map each top-level key of a JSON object to the byte span of its value.
+    
+    Raises:
+        json.JSONDecodeError: If the buffer is not a JSON object
+    """
+    pos = _skip_whitespace(buffer, 0)
+    if pos >= len(buffer) or buffer[pos] != _OPEN_BRACE:
+        raise _error("Expecting object", buffer, pos)
+    
+    index = {}
+    pos = _skip_whitespace(buffer, pos + 1)
+    if pos < len(buffer) and buffer[pos] == _CLOSE_BRACE:
+        pos += 1
+    else:
+        while True:
+            if pos >= len(buffer) or buffer[pos] != _QUOTE:
+                raise _error("Expecting property name enclosed in double quotes", buffer, pos)
+            key_end = _string_end(buffer, pos)
+            key = json.loads(buffer[pos:key_end])
+            
+            pos = _skip_whitespace(buffer, key_end)
+            if pos >= len(buffer) or buffer[pos] != _COLON:
+                raise _error("Expecting ':' delimiter", buffer, pos)
+            
+            value_start = _skip_whitespace(buffer, pos + 1)
+            value_end = _value_end(buffer, value_start)
+            index[key] = (value_start, value_end)  # later duplicates win, as in json.loads
+            
+            pos = _skip_whitespace(buffer, value_end)
+            if pos < len(buffer) and buffer[pos] == _COMMA:
+                pos = _skip_whitespace(buffer, pos + 1)
+                continue
+            if pos < len(buffer) and buffer[pos] == _CLOSE_BRACE:
+                pos += 1
+                break
+            raise _error("Expecting ',' delimiter", buffer, pos)
+    
+    if _skip_whitespace(buffer, pos) != len(buffer):
+        raise _error("Extra data", buffer, pos)
+    return index
+
+
+class LazyJSONObject(Mapping):
+    """
+    Read-only mapping over a JSON object whose values decode on first access.
+    
+    Works wherever hook code treats input as a mapping (get, [], in, keys,
+    items). Use to_dict() where a real dict is required.
+    
+    Args:
+        buffer: UTF-8 encoded JSON object
+    """
+    
+    def __init__(self, buffer: bytes):
+        self.buffer = buffer
+        self._index = index_object(buffer)
+        self._values: Dict[str, Any] = {}
+        self._text: Optional[str] = None
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        start, end = self._index[key]
+        value = self._values[key] = json_loads(self.buffer[start:end])
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+    
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+    
+    @property
+    def text(self) -> str:
+        """The whole payload as JSON text, decoded once."""
+        if self._text is None:
+            self._text = self.buffer.decode('utf-8')
+        return self._text
+    
+    def raw(self, key: str) -> memoryview:
+        """Raw JSON bytes of a value, without copying or decoding."""
+        start, end = self._index[key]
+        return memoryview(self.buffer)[start:end]
+    
+    def raw_size(self, key: str) -> int:
+        """Encoded size of a value in bytes, or 0 if the key is missing."""
+        span = self._index.get(key)
+        return span[1] - span[0] if span else 0
+    
+    def digest(self, key: str) -> str:
+        """BLAKE2b hex digest of a value's raw JSON bytes."""
+        return hashlib.blake2b(self.raw(key), digest_size=16).hexdigest()
+    
+    def preview(self, key: str, max_bytes: int = 1024) -> str:
+        """The first max_bytes of a value's raw JSON text."""
+        return bytes(self.raw(key)[:max_bytes]).decode('utf-8', 'ignore')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the full payload into a dict."""
+        if not self._values:
+            # One C-level decode beats decoding each value separately
+            return json_loads(self.buffer)
+        return {key: self[key] for key in self._index}
+
+
+def read_hook_input(stream: Optional[TextIO] = None) -> LazyJSONObject:
+    """
+    Read a hook payload from stdin into a lazy view.
+    
+    Args:
+        stream: Stream to read instead of sys.stdin
+    
+    Raises:
+        json.JSONDecodeError: If the input is empty or not a JSON object
+    """
+    stream = stream if stream is not None else sys.stdin
+    binary = getattr(stream, 'buffer', None)
+    data = binary.read() if binary is not None else stream.read()
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return LazyJSONObject(data)
@@ -0,0 +1,245 @@
+"""
+OpenMetrics exporter for Chronicle hook and storage metrics.
+
+Hook processes persist latency histograms and labelled counters into the
+shared latency store (see latency_store.py) at exit: PerformanceCollector
+timings, event writes per backend, Supabase-to-SQLite fallbacks,
+SecurityMetrics findings and ErrorHandler error counts. This module
+renders that cross-process aggregate, plus database file sizes, as
+OpenMetrics (or Prometheus) text for scraping:
+
+- write_textfile() for node_exporter's textfile collector
+- serve_metrics() for a small local HTTP /metrics endpoint
+"""
+
+import logging
+import os
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .latency_store import LatencyHistogram, LatencyStore, bucket_upper_bound, get_latency_store
+except ImportError:
+    from latency_store import LatencyHistogram, LatencyStore, bucket_upper_bound, get_latency_store
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket bounds in seconds; each is an exact latency store bucket edge
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Counter name in the latency store -> (metric name, help text)
+COUNTER_METRICS = {
+    "event_writes": ("chronicle_event_writes", "Event writes by backend and result"),
+    "supabase_fallbacks": ("chronicle_supabase_fallbacks", "Events saved to SQLite only after a Supabase failure"),
+    "security_events": ("chronicle_security_events", "Blocked security violations by kind"),
+    "sensitive_data_detections": ("chronicle_sensitive_data_detections", "Sanitizer findings by data type"),
+    "errors": ("chronicle_errors", "Errors handled by ErrorHandler by code and type"),
+    "scan_cache_lookups": ("chronicle_scan_cache_lookups", "Sensitive-data scan cache lookups by scanner and result"),
+}
+
+
+class MetricFamily:
+    """One metric with its type, help text and samples."""
+    
+    def __init__(self, name: str, metric_type: str, help_text: str, unit: str = ""):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.unit = unit
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+    
+    def add(self, suffix: str, labels: Dict[str, str], value: float) -> None:
+        self.samples.append((suffix, labels, value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsExporter:
+    """
+    Builds metric families from the latency store and in-process sources.
+    
+    Args:
+        store: Latency store to read; defaults to the global store
+        collector: In-process PerformanceCollector whose timings are not
+            persisted (collectors created with persist=True are already
+            in the store and are skipped to avoid double counting)
+        database_paths: Mapping of database name to SQLite file for size gauges
+    """
+    
+    def __init__(self, store: Optional[LatencyStore] = None, collector: Any = None,
+                 database_paths: Optional[Dict[str, str]] = None):
+        self.store = store or get_latency_store()
+        self.collector = collector
+        self.database_paths = database_paths if database_paths is not None else self._default_database_paths()
+    
+    def _default_database_paths(self) -> Dict[str, str]:
+        paths = {"perf": str(self.store.db_path)}
+        try:
+            try:
+                from .database import get_database_config
+            except ImportError:
+                from database import get_database_config
+            paths["events"] = get_database_config()["sqlite_path"]
+        except Exception as e:
+            logger.debug(f"Could not resolve events database path: {e}")
+        return paths
+    
+    def _histograms(self) -> Dict[Tuple[str, str], LatencyHistogram]:
+        # Make this process's own buffered observations visible first
+        self.store.flush()
+        histograms = self.store.load()
+        
+        if self.collector is not None and not getattr(self.collector, "persist", False):
+            for name, data in self.collector.export_histograms().items():
+                hook, _, phase = name.partition('.')
+                key = (hook, phase or "total")
+                histogram = histograms.setdefault(key, LatencyHistogram())
+                histogram.merge(LatencyHistogram.from_dict(data))
+        return histograms
+    
+    def collect(self) -> List[MetricFamily]:
+        """Gather all metric families."""
+        families = []
+        
+        duration = MetricFamily(
+            "chronicle_hook_duration_seconds", "histogram",
+            "Hook and phase execution time", unit="seconds"
+        )
+        cpu = MetricFamily(
+            "chronicle_hook_cpu_seconds", "counter",
+            "CPU time consumed by hook processes", unit="seconds"
+        )
+        for (hook, phase), histogram in sorted(self._histograms().items()):
+            if phase in ("cpu_user", "cpu_system"):
+                cpu.add("_total", {"hook": hook, "mode": phase[4:]}, histogram.sum_ms / 1000)
+                continue
+            
+            labels = {"hook": hook, "phase": phase}
+            for le in DURATION_BUCKETS:
+                count = sum(
+                    n for index, n in histogram.buckets.items()
+                    if bucket_upper_bound(index) / 1000 <= le * (1 + 1e-9)
+                )
+                duration.add("_bucket", dict(labels, le=_format_value(le)), count)
+            duration.add("_bucket", dict(labels, le="+Inf"), histogram.count)
+            duration.add("_count", labels, histogram.count)
+            duration.add("_sum", labels, histogram.sum_ms / 1000)
+        families.extend([duration, cpu])
+        
+        counters = {name: MetricFamily(metric, "counter", help_text) for name, (metric, help_text) in COUNTER_METRICS.items()}
+        for name, labels, value in self.store.load_counters():
+            family = counters.get(name)
+            if family is None:
+                family = counters[name] = MetricFamily(f"chronicle_{name}", "counter", f"Chronicle counter {name}")
+            family.add("_total", labels, value)
+        families.extend(counters.values())
+        
+        size = MetricFamily("chronicle_database_size_bytes", "gauge", "SQLite database size including WAL", unit="bytes")
+        for name, path in sorted(self.database_paths.items()):
+            total = 0
+            for suffix in ("", "-wal"):
+                try:
+                    total += os.path.getsize(f"{path}{suffix}")
+                except OSError:
+                    pass
+            size.add("", {"database": name}, total)
+        families.append(size)
+        
+        return families
+    
+    def render(self, openmetrics: bool = True) -> str:
+        """
+        Render the exposition text.
+        
+        Args:
+            openmetrics: OpenMetrics 1.0 format; False renders the Prometheus
+                0.0.4 text format read by node_exporter's textfile collector
+        """
+        lines = []
+        for family in self.collect():
+            # OpenMetrics names counter families without _total; Prometheus text does not
+            name = family.name
+            if family.type == "counter" and not openmetrics:
+                name += "_total"
+            lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} {family.type}")
+            if family.unit and openmetrics:
+                lines.append(f"# UNIT {name} {family.unit}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def write_textfile(self, path: str) -> Path:
+        """
+        Atomically write Prometheus text for node_exporter's textfile collector.
+        
+        Returns:
+            The written path (should end in .prom)
+        """
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(target.parent), prefix=".chronicle-metrics-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render(openmetrics=False))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return target
+
+
+def serve_metrics(exporter: MetricsExporter, host: str = "127.0.0.1", port: int = 9464) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server exposing GET /metrics; call serve_forever() on it.
+    
+    Responds with OpenMetrics when the scraper accepts it, otherwise with
+    the Prometheus text format.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            try:
+                body = exporter.render(openmetrics=openmetrics).encode("utf-8")
+            except Exception as e:
+                logger.error(f"Failed to render metrics: {e}")
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+    
+    return ThreadingHTTPServer((host, port), MetricsHandler)
@@ -5,7 +5,9 @@ This module provides comprehensive performance measurement, profiling, and
 optimization tools to ensure all hooks complete within the 100ms requirement.
 """
 
+import os
 import time
+import random
 import asyncio
 import functools
 import threading
@@ -19,8 +21,45 @@ import uuid
 import json
 from collections import defaultdict, deque
 
+from .cache import LRUCache, SQLiteCacheStore
+from .latency_store import LatencyHistogram, record_latency
+from .utils import estimate_payload_size
+
 logger = logging.getLogger(__name__)
 
+# Cached handle: psutil.Process() costs a syscall and an allocation per call
+_process: Optional[psutil.Process] = None
+
+
+def get_process() -> psutil.Process:
+    """Get a cached psutil handle for the current process."""
+    global _process
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+    return _process
+
+
+def should_track_memory(track_memory: Optional[bool] = None) -> bool:
+    """
+    Decide whether a timer samples memory and CPU.
+    
+    Timing is lean by default. Memory sampling is enabled per call with
+    track_memory=True, or globally with CHRONICLE_PERF_MEMORY: "1" samples
+    every operation and a fraction such as "0.05" samples that share of them.
+    """
+    if track_memory is not None:
+        return track_memory
+    
+    setting = os.getenv("CHRONICLE_PERF_MEMORY", "").strip().lower()
+    if setting in ("", "0", "false", "off", "no"):
+        return False
+    if setting in ("1", "true", "on", "yes"):
+        return True
+    try:
+        return random.random() < float(setting)
+    except ValueError:
+        return False
+
 
 @dataclass
 class PerformanceMetrics:
@@ -40,7 +79,7 @@ class PerformanceMetrics:
     def __post_init__(self):
         """Initialize computed fields."""
         self.thread_id = threading.get_ident()
-        self.process_id = psutil.Process().pid
+        self.process_id = os.getpid()
     
     def complete(self, end_time: Optional[float] = None) -> None:
         """Mark the operation as complete and calculate duration."""
@@ -69,15 +108,16 @@ class PerformanceMetrics:
 
 
 class PerformanceTimer:
-    """High-precision timer with memory monitoring."""
+    """High-precision timer with optional memory monitoring."""
     
-    def __init__(self, operation_name: str, track_memory: bool = True):
+    def __init__(self, operation_name: str, track_memory: Optional[bool] = None):
+        self.start_ns = time.perf_counter_ns()
         self.metrics = PerformanceMetrics(
             operation_name=operation_name,
-            start_time=time.perf_counter()
+            start_time=self.start_ns / 1e9
         )
-        self.track_memory = track_memory
-        self.process = psutil.Process() if track_memory else None
+        self.track_memory = should_track_memory(track_memory)
+        self.process = get_process() if self.track_memory else None
         
         if self.track_memory:
             self.metrics.memory_start_mb = self.process.memory_info().rss / 1024 / 1024
@@ -91,8 +131,9 @@ class PerformanceTimer:
     
     def complete(self) -> PerformanceMetrics:
         """Complete timing and return metrics."""
-        end_time = time.perf_counter()
-        self.metrics.complete(end_time)
+        end_ns = time.perf_counter_ns()
+        self.metrics.end_time = end_ns / 1e9
+        self.metrics.duration_ms = (end_ns - self.start_ns) / 1e6
         
         if self.track_memory and self.process:
             self.metrics.memory_end_mb = self.process.memory_info().rss / 1024 / 1024
@@ -104,13 +145,14 @@ class PerformanceTimer:
 class AsyncPerformanceTimer:
     """Async version of performance timer."""
     
-    def __init__(self, operation_name: str, track_memory: bool = True):
+    def __init__(self, operation_name: str, track_memory: Optional[bool] = None):
+        self.start_ns = time.perf_counter_ns()
         self.metrics = PerformanceMetrics(
             operation_name=operation_name,
-            start_time=time.perf_counter()
+            start_time=self.start_ns / 1e9
         )
-        self.track_memory = track_memory
-        self.process = psutil.Process() if track_memory else None
+        self.track_memory = should_track_memory(track_memory)
+        self.process = get_process() if self.track_memory else None
         
         if self.track_memory:
             self.metrics.memory_start_mb = self.process.memory_info().rss / 1024 / 1024
@@ -123,8 +165,9 @@ class AsyncPerformanceTimer:
     
     async def complete(self) -> PerformanceMetrics:
         """Complete timing and return metrics."""
-        end_time = time.perf_counter()
-        self.metrics.complete(end_time)
+        end_ns = time.perf_counter_ns()
+        self.metrics.end_time = end_ns / 1e9
+        self.metrics.duration_ms = (end_ns - self.start_ns) / 1e6
         
         if self.track_memory and self.process:
             self.metrics.memory_end_mb = self.process.memory_info().rss / 1024 / 1024
@@ -135,11 +178,15 @@ class AsyncPerformanceTimer:
 class PerformanceCollector:
     """Centralized performance metrics collector."""
     
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, max_history: int = 1000, persist: bool = False, max_violations: int = 100):
         self.max_history = max_history
+        # Also record durations in the cross-process latency store
+        self.persist = persist
         self.metrics_history: deque = deque(maxlen=max_history)
-        self.operation_stats: Dict[str, List[float]] = defaultdict(list)
-        self.threshold_violations: List[Dict[str, Any]] = []
+        # Fixed-bucket histograms keep memory constant however many samples arrive
+        self.operation_stats: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.threshold_violations: deque = deque(maxlen=max_violations)
+        self.violation_count = 0
         self.lock = threading.Lock()
         
         # Performance thresholds
@@ -155,7 +202,10 @@ class PerformanceCollector:
         with self.lock:
             self.metrics_history.append(metrics)
             if metrics.duration_ms is not None:
-                self.operation_stats[metrics.operation_name].append(metrics.duration_ms)
+                self.operation_stats[metrics.operation_name].record(metrics.duration_ms)
+                if self.persist:
+                    hook_name, _, phase = metrics.operation_name.partition('.')
+                    record_latency(hook_name, phase or "total", metrics.duration_ms)
                 
                 # Check for threshold violations
                 self._check_thresholds(metrics)
@@ -185,57 +235,62 @@ class PerformanceCollector:
         
         for violation in violations:
             self.threshold_violations.append(violation)
+            self.violation_count += 1
             logger.warning(f"Performance threshold violation: {violation}")
     
     def get_statistics(self, operation_name: Optional[str] = None) -> Dict[str, Any]:
         """Get performance statistics."""
         with self.lock:
             if operation_name and operation_name in self.operation_stats:
-                durations = self.operation_stats[operation_name]
-                stats = {
-                    "operation": operation_name,
-                    "count": len(durations),
-                    "avg_ms": sum(durations) / len(durations) if durations else 0,
-                    "min_ms": min(durations) if durations else 0,
-                    "max_ms": max(durations) if durations else 0,
-                    "p95_ms": self._percentile(durations, 95) if durations else 0,
-                    "p99_ms": self._percentile(durations, 99) if durations else 0
-                }
+                histogram = self.operation_stats[operation_name]
+                stats = {"operation": operation_name}
+                stats.update(histogram.summary())
             else:
-                all_durations = []
-                for durations in self.operation_stats.values():
-                    all_durations.extend(durations)
+                combined = LatencyHistogram()
+                for histogram in self.operation_stats.values():
+                    combined.merge(histogram)
                 
                 stats = {
-                    "total_operations": len(all_durations),
-                    "avg_ms": sum(all_durations) / len(all_durations) if all_durations else 0,
+                    "total_operations": combined.count,
+                    "avg_ms": combined.sum_ms / combined.count if combined.count else 0,
+                    "p95_ms": combined.quantile(0.95),
                     "operations": {
                         name: {
-                            "count": len(durations),
-                            "avg_ms": sum(durations) / len(durations) if durations else 0,
-                            "max_ms": max(durations) if durations else 0
+                            "count": histogram.count,
+                            "avg_ms": histogram.sum_ms / histogram.count if histogram.count else 0,
+                            "max_ms": histogram.max_ms,
+                            "p95_ms": histogram.quantile(0.95)
                         }
-                        for name, durations in self.operation_stats.items()
+                        for name, histogram in self.operation_stats.items()
                     },
-                    "violations": len(self.threshold_violations),
-                    "recent_violations": self.threshold_violations[-5:] if self.threshold_violations else []
+                    "violations": self.violation_count,
+                    "recent_violations": list(self.threshold_violations)[-5:]
                 }
             
             return stats
     
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """Calculate percentile of data."""
-        if not data:
-            return 0.0
-        sorted_data = sorted(data)
-        index = int((percentile / 100.0) * len(sorted_data))
-        return sorted_data[min(index, len(sorted_data) - 1)]
+    def export_histograms(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Serialize per-operation histograms for aggregation in another process.
+        
+        Returns:
+            Mapping of operation name to LatencyHistogram.to_dict() output
+        """
+        with self.lock:
+            return {name: histogram.to_dict() for name, histogram in self.operation_stats.items()}
+    
+    def merge_histograms(self, exported: Dict[str, Dict[str, Any]]) -> None:
+        """Merge histograms produced by export_histograms() into this collector."""
+        with self.lock:
+            for name, data in exported.items():
+                self.operation_stats[name].merge(LatencyHistogram.from_dict(data))
     
     def reset_stats(self) -> None:
         """Reset collected statistics."""
         with self.lock:
             self.operation_stats.clear()
             self.threshold_violations.clear()
+            self.violation_count = 0
             self.metrics_history.clear()
 
 
@@ -249,7 +304,7 @@ def get_performance_collector() -> PerformanceCollector:
 
 
 @contextmanager
-def measure_performance(operation_name: str, track_memory: bool = True) -> Generator[PerformanceMetrics, None, None]:
+def measure_performance(operation_name: str, track_memory: Optional[bool] = None) -> Generator[PerformanceMetrics, None, None]:
     """Context manager for measuring operation performance."""
     timer = PerformanceTimer(operation_name, track_memory)
     try:
@@ -260,7 +315,7 @@ def measure_performance(operation_name: str, track_memory: bool = True) -> Gener
 
 
 @asynccontextmanager
-async def measure_async_performance(operation_name: str, track_memory: bool = True) -> AsyncGenerator[PerformanceMetrics, None]:
+async def measure_async_performance(operation_name: str, track_memory: Optional[bool] = None) -> AsyncGenerator[PerformanceMetrics, None]:
     """Async context manager for measuring operation performance."""
     timer = AsyncPerformanceTimer(operation_name, track_memory)
     try:
@@ -270,7 +325,7 @@ async def measure_async_performance(operation_name: str, track_memory: bool = Tr
         _performance_collector.record_metrics(metrics)
 
 
-def performance_monitor(operation_name: Optional[str] = None, track_memory: bool = True):
+def performance_monitor(operation_name: Optional[str] = None, track_memory: Optional[bool] = None):
     """Decorator for monitoring function performance."""
     def decorator(func):
         actual_operation_name = operation_name or f"{func.__module__}.{func.__name__}"
@@ -296,76 +351,8 @@ def performance_monitor(operation_name: Optional[str] = None, track_memory: bool
     return decorator
 
 
-class CacheManager:
-    """Simple caching manager for frequently accessed data."""
-    
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 300):
-        self.max_size = max_size
-        self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.access_times: Dict[str, float] = {}
-        self.lock = threading.Lock()
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get cached value if not expired."""
-        with self.lock:
-            if key not in self.cache:
-                return None
-            
-            # Check TTL
-            if time.time() - self.access_times[key] > self.ttl_seconds:
-                self._evict(key)
-                return None
-            
-            self.access_times[key] = time.time()  # Update access time
-            return self.cache[key]['value']
-    
-    def set(self, key: str, value: Any) -> None:
-        """Set cached value with automatic eviction."""
-        with self.lock:
-            # Evict expired entries
-            self._cleanup_expired()
-            
-            # Evict LRU if at capacity
-            if len(self.cache) >= self.max_size and key not in self.cache:
-                lru_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-                self._evict(lru_key)
-            
-            self.cache[key] = {'value': value, 'created_at': time.time()}
-            self.access_times[key] = time.time()
-    
-    def _evict(self, key: str) -> None:
-        """Evict a key from cache."""
-        if key in self.cache:
-            del self.cache[key]
-        if key in self.access_times:
-            del self.access_times[key]
-    
-    def _cleanup_expired(self) -> None:
-        """Remove expired entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, access_time in self.access_times.items()
-            if current_time - access_time > self.ttl_seconds
-        ]
-        for key in expired_keys:
-            self._evict(key)
-    
-    def clear(self) -> None:
-        """Clear all cached data."""
-        with self.lock:
-            self.cache.clear()
-            self.access_times.clear()
-    
-    def stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
-        with self.lock:
-            return {
-                "size": len(self.cache),
-                "max_size": self.max_size,
-                "ttl_seconds": self.ttl_seconds,
-                "hit_ratio": 0.0  # Would need hit/miss counters for accurate calculation
-            }
+# Backwards-compatible name for the hook cache class
+CacheManager = LRUCache
 
 
 class EarlyReturnValidator:
@@ -405,20 +392,35 @@ class EarlyReturnValidator:
     def is_reasonable_data_size(data: Any, max_size_mb: float = 10.0) -> bool:
         """Quick check for reasonable data size."""
         try:
-            data_str = json.dumps(data) if not isinstance(data, str) else data
-            size_mb = len(data_str.encode('utf-8')) / 1024 / 1024
-            return size_mb <= max_size_mb
+            max_bytes = int(max_size_mb * 1024 * 1024)
+            return estimate_payload_size(data, limit=max_bytes) <= max_bytes
         except (TypeError, ValueError):
             # If we can't serialize it, it might be too complex
             return False
 
 
-# Global cache instance for hook operations
-_hook_cache = CacheManager(max_size=200, ttl_seconds=300)
-
-
-def get_hook_cache() -> CacheManager:
-    """Get the global hook cache instance."""
+# Global cache instance for hook operations, created on first use
+_hook_cache: Optional[LRUCache] = None
+
+
+def get_hook_cache() -> LRUCache:
+    """
+    Get the global hook cache instance.
+    
+    Set CHRONICLE_HOOK_CACHE_DB to a SQLite path to share cached entries
+    across hook processes.
+    """
+    global _hook_cache
+    if _hook_cache is None:
+        backing_store = None
+        store_path = os.getenv("CHRONICLE_HOOK_CACHE_DB")
+        if store_path:
+            try:
+                backing_store = SQLiteCacheStore(store_path)
+            except Exception as e:
+                logger.warning(f"Hook cache store unavailable at {store_path}: {e}")
+        _hook_cache = LRUCache(max_size=200, ttl_seconds=300, max_bytes=4 * 1024 * 1024,
+                               backing_store=backing_store)
     return _hook_cache
 
 
@@ -448,7 +450,7 @@ class PerformanceOptimizer:
                     # Cache check for repeated operations
                     cache_key = self._generate_cache_key(hook_func.__name__, input_data)
                     cached_result = self.cache.get(cache_key)
-                    if cached_result:
+                    if cached_result is not None:
                         metrics.add_metadata(cache_hit=True)
                         return cached_result
                 
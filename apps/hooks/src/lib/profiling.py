@@ -0,0 +1,417 @@
+"""
+Opt-in profiling of hook invocations for Chronicle hooks.
+
+When a hook runs slow, the log only says that it exceeded its budget.
+Setting CHRONICLE_PROFILE records why, for a sample of hook processes:
+
+- cpu: a sampling profiler reads the stack of every thread each
+  CHRONICLE_PROFILE_INTERVAL_MS and writes <name>.collapsed, one
+  "frame;frame;frame count" line per distinct stack, which flamegraph.pl,
+  inferno and speedscope read directly
+- mem: tracemalloc snapshots around each hook phase (the trace_span phases:
+  stdin parse, sanitize, session resolve, database writes, ...) written to
+  <name>.mem.json with the top allocating lines per phase
+
+Modes combine ("cpu,mem"). CHRONICLE_PROFILE_SAMPLE=N profiles one hook
+process in N, and CHRONICLE_PROFILE_MIN_MS keeps only invocations at least
+that slow. Profiles go to CHRONICLE_PROFILE_DIR, keeping the newest
+CHRONICLE_PROFILE_KEEP files; scripts/profile_aggregate.py merges them into
+one flamegraph-ready file.
+
+Profiling starts with the first phase and stops at process exit, so one
+profile covers one hook invocation. Phases only take snapshots; comparing
+them runs at exit, after the hook's own timings, but tracemalloc still
+slows every allocation, so profile cpu and mem separately when the cpu
+profile needs to be faithful.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from .utils import get_chronicle_data_dir
+except ImportError:
+    from utils import get_chronicle_data_dir
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "mem")
+COLLAPSED_SUFFIX = ".collapsed"
+MEMORY_SUFFIX = ".mem.json"
+
+# Frames kept per allocation; enough to place it in the hook's call path
+MEMORY_TRACEBACK_FRAMES = 16
+
+
+def _short_path(filename: str) -> str:
+    """Last two components of a source path, e.g. lib/database.py."""
+    parts = Path(filename).parts
+    return "/".join(parts[-2:]) if parts else filename
+
+
+def _frame_label(code) -> str:
+    """Collapsed-stack frame name for a code object; ';' separates frames."""
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """Samples the stacks of all other threads on a background thread."""
+    
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+    
+    def start(self) -> None:
+        # A busy main thread only releases the GIL every switch interval
+        sys.setswitchinterval(min(self._switch_interval, self.interval_s))
+        self._thread = threading.Thread(target=self._run, name="chronicle-profiler", daemon=True)
+        self._thread.start()
+    
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            self.sample(skip_thread_id=own_id)
+    
+    def sample(self, skip_thread_id: Optional[int] = None) -> None:
+        """Record the current stack of every thread but skip_thread_id."""
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread_id:
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = _frame_label(code)
+                labels.append(label)
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+    
+    def stop(self) -> Counter:
+        """Stop sampling; return sample counts per collapsed stack."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return self.stacks
+
+
+def _allocation(stat, top_frames: bool = False) -> Dict[str, Any]:
+    """JSON form of a tracemalloc StatisticDiff."""
+    # Tracebacks run from the oldest frame to the allocating one
+    frame = stat.traceback[-1]
+    entry = {
+        "location": f"{_short_path(frame.filename)}:{frame.lineno}",
+        "size_diff": stat.size_diff,
+        "count_diff": stat.count_diff,
+    }
+    if top_frames:
+        entry["stack"] = [f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+class MemoryPhaseTracker:
+    """
+    Takes tracemalloc snapshots around phases on the profiled thread.
+    
+    Taking a snapshot is cheap but comparing two is not, so phases only
+    take snapshots and analyze() compares them once the hook is done.
+    """
+    
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.thread_id = threading.get_ident()
+        self._open: List[Any] = []
+        self._closed: List[Any] = []
+        self._baseline = None
+        self._final = None
+        self._peak_bytes = 0
+        self._started_tracemalloc = False
+    
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACEBACK_FRAMES)
+            self._started_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+    
+    def enter(self, name: str) -> None:
+        if threading.get_ident() == self.thread_id:
+            self._open.append((name, time.perf_counter(), tracemalloc.take_snapshot()))
+    
+    def exit(self, name: str) -> None:
+        if threading.get_ident() != self.thread_id or not self._open:
+            return
+        path = ";".join(phase[0] for phase in self._open)
+        name, started, before = self._open.pop()
+        self._closed.append((name, path, (time.perf_counter() - started) * 1000, before, tracemalloc.take_snapshot()))
+    
+    def stop(self) -> None:
+        """Take the final snapshot and stop tracing."""
+        self._final = tracemalloc.take_snapshot()
+        self._peak_bytes = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+    
+    @staticmethod
+    def _growth(after, before, key_type: str) -> List[Any]:
+        """Allocation changes, leaving out those made by tracemalloc and this module."""
+        return [
+            stat for stat in after.compare_to(before, key_type)
+            if stat.size_diff and stat.traceback[-1].filename not in (tracemalloc.__file__, __file__)
+        ]
+    
+    def analyze(self) -> Dict[str, Any]:
+        """The phases' and the whole invocation's top allocations, after stop()."""
+        phases = []
+        for name, path, duration_ms, before, after in self._closed:
+            stats = self._growth(after, before, "lineno")
+            phases.append({
+                "phase": name,
+                "path": path,
+                "duration_ms": duration_ms,
+                "size_diff": sum(stat.size_diff for stat in stats),
+                "count_diff": sum(stat.count_diff for stat in stats),
+                "top": [_allocation(stat) for stat in stats[:self.top_n]],
+            })
+        
+        stats = self._growth(self._final, self._baseline, "traceback")
+        return {
+            "peak_bytes": self._peak_bytes,
+            "size_diff": sum(stat.size_diff for stat in stats),
+            "top": [_allocation(stat, top_frames=True) for stat in stats[:self.top_n]],
+            "phases": phases,
+        }
+
+
+class _ProfiledPhase:
+    """Wraps a span so entering it also marks a profiling phase."""
+    
+    def __init__(self, profiler: "HookProfiler", name: str, span):
+        self.profiler = profiler
+        self.name = name
+        self.span = span
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+    
+    def __enter__(self):
+        if self.profiler.memory:
+            self.profiler.memory.enter(self.name)
+        return self.span.__enter__()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.span.__exit__(exc_type, exc_val, exc_tb)
+        if self.profiler.memory:
+            self.profiler.memory.exit(self.name)
+
+
+class HookProfiler:
+    """
+    Profiles one hook process and writes its profiles on stop().
+    
+    Only the newest `keep` profile files are kept in profile_dir.
+    """
+    
+    def __init__(self, modes: Iterable[str], profile_dir: Optional[str] = None,
+                 hook_name: Optional[str] = None, interval_ms: Optional[float] = None,
+                 min_ms: Optional[float] = None, keep: Optional[int] = None, top_n: int = 10):
+        self.modes = set(modes)
+        self.profile_dir = Path(
+            profile_dir or os.getenv("CHRONICLE_PROFILE_DIR") or get_chronicle_data_dir() / "profiles"
+        ).expanduser()
+        self.hook_name = hook_name or Path(sys.argv[0] or "python").stem or "python"
+        self.interval_ms = interval_ms or float(os.getenv("CHRONICLE_PROFILE_INTERVAL_MS", "1"))
+        self.min_ms = min_ms if min_ms is not None else float(os.getenv("CHRONICLE_PROFILE_MIN_MS", "0"))
+        self.keep = keep or int(os.getenv("CHRONICLE_PROFILE_KEEP", "500"))
+        self.sampler = StackSampler(self.interval_ms / 1000) if "cpu" in self.modes else None
+        self.memory = MemoryPhaseTracker(top_n) if "mem" in self.modes else None
+        self.started_at = 0.0
+        self._start_perf = 0.0
+        self._stopped = False
+    
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._start_perf = time.perf_counter()
+        if self.memory:
+            self.memory.start()
+        if self.sampler:
+            self.sampler.start()
+    
+    def phase(self, name: str, span) -> _ProfiledPhase:
+        """Wrap a span so its duration is a profiling phase."""
+        return _ProfiledPhase(self, name, span)
+    
+    def _file_stem(self) -> str:
+        # Sorts oldest first by name
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self.started_at))
+        millis = int(self.started_at % 1 * 1000)
+        return f"{stamp}.{millis:03d}Z-{os.getpid()}-{self.hook_name}"
+    
+    def stop(self) -> List[Path]:
+        """
+        Stop profiling and write the profiles.
+        
+        Returns:
+            Paths written; none if the invocation was faster than min_ms
+            or writing failed (never raises)
+        """
+        if self._stopped:
+            return []
+        self._stopped = True
+        duration_ms = (time.perf_counter() - self._start_perf) * 1000
+        stacks = self.sampler.stop() if self.sampler else None
+        if self.memory:
+            self.memory.stop()
+        if duration_ms < self.min_ms:
+            return []
+        memory = self.memory.analyze() if self.memory else None
+        
+        written = []
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            stem = self._file_stem()
+            
+            if stacks is not None:
+                path = self.profile_dir / f"{stem}{COLLAPSED_SUFFIX}"
+                path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+                written.append(path)
+            
+            if memory is not None:
+                path = self.profile_dir / f"{stem}{MEMORY_SUFFIX}"
+                path.write_text(json.dumps(dict(
+                    hook=self.hook_name, pid=os.getpid(), started_at=self.started_at,
+                    duration_ms=duration_ms, **memory
+                ), indent=2))
+                written.append(path)
+            
+            self._rotate()
+        except Exception as e:
+            logger.debug(f"Failed to write profile to {self.profile_dir}: {e}")
+            return []
+        
+        logger.debug(f"Profile of {duration_ms:.1f}ms written to {', '.join(str(p) for p in written)}")
+        return written
+    
+    def _rotate(self) -> None:
+        """Delete the oldest profiles beyond keep."""
+        profiles = list_profiles(self.profile_dir)
+        for path in profiles[:max(len(profiles) - self.keep, 0)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # Another hook process rotated it first
+
+
+def list_profiles(profile_dir: Path, suffix: Optional[str] = None) -> List[Path]:
+    """Profile files in profile_dir, oldest first."""
+    suffixes = (suffix,) if suffix else (COLLAPSED_SUFFIX, MEMORY_SUFFIX)
+    return sorted(path for path in Path(profile_dir).iterdir() if path.name.endswith(suffixes))
+
+
+def profile_hook_name(path: Path) -> str:
+    """Hook name from a profile file name (<timestamp>-<pid>-<hook><suffix>)."""
+    stem = path.name
+    for suffix in (COLLAPSED_SUFFIX, MEMORY_SUFFIX):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+    parts = stem.split("-", 2)
+    return parts[2] if len(parts) == 3 else stem
+
+
+def merge_collapsed(paths: Iterable[Path], by_hook: bool = False) -> Counter:
+    """
+    Sum collapsed-stack files into one stack -> count Counter.
+    
+    Args:
+        paths: .collapsed files to merge
+        by_hook: Root each stack at its hook's name so hooks can be told apart
+    """
+    merged: Counter = Counter()
+    for path in paths:
+        prefix = f"{profile_hook_name(path)};" if by_hook else ""
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    merged[prefix + stack] += int(count)
+    return merged
+
+
+def merge_memory(paths: Iterable[Path], by_hook: bool = False) -> Counter:
+    """
+    Sum the top allocations of .mem.json profiles as stack -> bytes.
+    
+    Only growth is counted, so the result is a flamegraph of memory
+    retained by each call path.
+    """
+    merged: Counter = Counter()
+    for path in paths:
+        with open(path) as f:
+            profile = json.load(f)
+        prefix = [profile.get("hook", profile_hook_name(path))] if by_hook else []
+        for allocation in profile.get("top", []):
+            if allocation["size_diff"] > 0:
+                merged[";".join(prefix + allocation.get("stack", [allocation["location"]]))] += allocation["size_diff"]
+    return merged
+
+
+def get_profile_modes() -> Set[str]:
+    """Modes requested by CHRONICLE_PROFILE ("cpu", "mem", "cpu,mem" or "all")."""
+    setting = os.getenv("CHRONICLE_PROFILE", "").strip().lower()
+    if not setting or setting in ("0", "false", "off", "no"):
+        return set()
+    if setting == "all":
+        return set(PROFILE_MODES)
+    return {mode.strip() for mode in setting.split(",")} & set(PROFILE_MODES)
+
+
+# Profiler for this process, once started; None when sampled out or disabled
+_profiler: Optional[HookProfiler] = None
+_sampled_out = False
+_profiler_lock = threading.Lock()
+
+
+def get_active_profiler() -> Optional[HookProfiler]:
+    """
+    Get this process's profiler, starting it on first use.
+    
+    Returns None unless CHRONICLE_PROFILE is set and this process was
+    picked by CHRONICLE_PROFILE_SAMPLE.
+    """
+    global _profiler, _sampled_out
+    if _profiler is not None:
+        return _profiler
+    if _sampled_out:
+        return None
+    modes = get_profile_modes()
+    if not modes:
+        return None
+    
+    with _profiler_lock:
+        if _profiler is None and not _sampled_out:
+            sample = max(1, int(os.getenv("CHRONICLE_PROFILE_SAMPLE", "1")))
+            if random.randrange(sample) != 0:
+                _sampled_out = True
+                return None
+            profiler = HookProfiler(modes)
+            profiler.start()
+            atexit.register(profiler.stop)
+            _profiler = profiler
+    return _profiler
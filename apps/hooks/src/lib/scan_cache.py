@@ -0,0 +1,160 @@
+"""
+Content-hash memoization of sensitive-data scans for Chronicle hooks.
+
+Agents re-read the same files and re-run the same commands, so hooks see
+identical payloads again and again, and each time every sanitizer regex
+runs over the whole content. This module caches scan results keyed by a
+BLAKE2b hash of the serialized content, so a repeated payload costs one
+hash and one lookup instead of a full scan.
+
+An entry holds per-category finding counts and the redacted text (None
+when redaction left the content unchanged). Matched values themselves are
+never cached, so no secret is written to disk. Entries are bounded by
+serialized size and persisted in a local SQLite file shared by all hook
+processes. Content seen for the first time only leaves a small marker, so
+one-off payloads don't write their redacted text on the hook's critical
+path. Lookups are counted in the scan_cache_lookups metric.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Set
+
+try:
+    from .cache import LRUCache, SQLiteCacheStore
+    from .latency_store import record_counter
+    from .utils import get_chronicle_data_dir
+except ImportError:
+    from cache import LRUCache, SQLiteCacheStore
+    from latency_store import record_counter
+    from utils import get_chronicle_data_dir
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# Below this size the regexes are cheaper than a cache lookup
+DEFAULT_MIN_CONTENT_BYTES = 1024
+# Above this size an entry would crowd out the rest of the cache
+DEFAULT_MAX_CONTENT_BYTES = 256 * 1024
+
+
+def content_hash(text: str) -> str:
+    """128-bit BLAKE2b hex digest of a string."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def patterns_fingerprint(patterns: Any) -> str:
+    """
+    Short hash of a scanner's pattern set.
+    
+    Included in cache keys so that changing the patterns invalidates
+    results cached by an older version.
+    """
+    return content_hash(json.dumps(patterns, sort_keys=True))[:12]
+
+
+class ScanResultCache:
+    """
+    Scan results keyed by scanner, pattern fingerprint and content hash.
+    
+    Args:
+        cache: Underlying LRU cache, usually byte-bounded and persisted
+        min_content_bytes: Content shorter than this is not cached
+        max_content_bytes: Content longer than this is not cached
+    """
+    
+    def __init__(self, cache: LRUCache, min_content_bytes: int = DEFAULT_MIN_CONTENT_BYTES,
+                 max_content_bytes: int = DEFAULT_MAX_CONTENT_BYTES):
+        self.cache = cache
+        self.min_content_bytes = min_content_bytes
+        self.max_content_bytes = max_content_bytes
+        # Keys that already had an entry when looked up
+        self._seen: Set[str] = set()
+    
+    def key_for(self, scanner: str, text: str, fingerprint: str = "") -> Optional[str]:
+        """
+        Build the cache key for scanning text, or None if its size is not cached.
+        
+        Args:
+            scanner: Scanner name, also used as the metric label
+            text: Serialized content being scanned
+            fingerprint: patterns_fingerprint() of the scanner's patterns
+        """
+        if not self.min_content_bytes <= len(text) <= self.max_content_bytes:
+            return None
+        return f"{scanner}/{fingerprint}:{content_hash(text)}"
+    
+    def lookup(self, key: str, field: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry for key.
+        
+        The lookup counts as a hit only if the entry holds field; the entry
+        is returned either way so callers can add to it.
+        """
+        entry = self.cache.get(key)
+        if isinstance(entry, dict):
+            self._seen.add(key)
+        hit = isinstance(entry, dict) and field in entry
+        record_counter("scan_cache_lookups", scanner=key.split("/", 1)[0], result="hit" if hit else "miss")
+        return entry if isinstance(entry, dict) else None
+    
+    def store(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Cache an entry; it must not contain matched sensitive values.
+        
+        For content that had no entry yet, only the small fields are
+        written; the redacted text follows when the content is scanned
+        again.
+        """
+        if key not in self._seen:
+            entry = {field: value for field, value in entry.items() if field != "redacted" or value is None}
+        self.cache.set(key, entry)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get underlying cache statistics."""
+        return self.cache.stats()
+
+
+def is_scan_cache_enabled() -> bool:
+    """Scan memoization is on unless CHRONICLE_SCAN_CACHE disables it."""
+    return os.getenv("CHRONICLE_SCAN_CACHE", "1").lower() not in ("0", "false", "off", "no")
+
+
+# Global scan cache, created on first use
+_scan_cache: Optional[ScanResultCache] = None
+_scan_cache_lock = threading.Lock()
+
+
+def get_scan_cache() -> Optional[ScanResultCache]:
+    """
+    Get the global scan result cache, or None if it is disabled.
+    
+    Bounded by CHRONICLE_SCAN_CACHE_MAX_BYTES and persisted to
+    CHRONICLE_SCAN_CACHE_DB (default: scan_cache.db in the Chronicle data
+    directory). If the file cannot be opened the cache is memory-only.
+    """
+    global _scan_cache
+    if not is_scan_cache_enabled():
+        return None
+    if _scan_cache is None:
+        with _scan_cache_lock:
+            if _scan_cache is None:
+                max_bytes = int(os.getenv("CHRONICLE_SCAN_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+                store = None
+                try:
+                    db_path = os.getenv("CHRONICLE_SCAN_CACHE_DB") or str(get_chronicle_data_dir() / "scan_cache.db")
+                    store = SQLiteCacheStore(db_path, max_bytes=max_bytes)
+                except Exception as e:
+                    logger.debug(f"Scan cache will not be persisted: {e}")
+                _scan_cache = ScanResultCache(LRUCache(
+                    max_size=10000,
+                    ttl_seconds=DEFAULT_TTL_SECONDS,
+                    max_bytes=max_bytes,
+                    backing_store=store,
+                ))
+    return _scan_cache
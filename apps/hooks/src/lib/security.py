@@ -8,7 +8,18 @@ import shlex
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
-from collections import defaultdict
+from collections import defaultdict, deque
+
+try:
+    from .json_codec import dumps as json_dumps, loads as json_loads
+    from .latency_store import LatencyHistogram, record_counter
+    from .scan_cache import get_scan_cache, patterns_fingerprint
+    from .utils import estimate_payload_size
+except ImportError:
+    from json_codec import dumps as json_dumps, loads as json_loads
+    from latency_store import LatencyHistogram, record_counter
+    from scan_cache import get_scan_cache, patterns_fingerprint
+    from utils import estimate_payload_size
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -45,40 +56,49 @@ class SecurityMetrics:
         self.sensitive_data_detections = 0
         self.blocked_operations = 0
         self.total_validations = 0
-        self.validation_times = []
+        # Recent samples in a fixed-size ring; the histogram covers all samples
+        self.validation_times = deque(maxlen=1000)
+        self.validation_histogram = LatencyHistogram()
     
     def record_path_traversal_attempt(self, path: str):
         """Record a path traversal attempt."""
         self.path_traversal_attempts += 1
+        record_counter("security_events", kind="path_traversal")
         logger.warning(f"Path traversal attempt detected: {path}")
     
     def record_oversized_input(self, size_mb: float):
         """Record an oversized input attempt."""
         self.oversized_input_attempts += 1
+        record_counter("security_events", kind="oversized_input")
         logger.warning(f"Oversized input detected: {size_mb:.2f}MB")
     
     def record_command_injection_attempt(self, command: str):
         """Record a command injection attempt."""
         self.command_injection_attempts += 1
+        record_counter("security_events", kind="command_injection")
         logger.warning(f"Command injection attempt detected: {command}")
     
     def record_sensitive_data_detection(self, data_type: str):
         """Record sensitive data detection."""
         self.sensitive_data_detections += 1
+        record_counter("sensitive_data_detections", data_type=data_type)
         logger.info(f"Sensitive data detected and sanitized: {data_type}")
     
     def record_validation_time(self, duration_ms: float):
         """Record validation execution time."""
         self.validation_times.append(duration_ms)
-        if len(self.validation_times) > 1000:  # Keep only last 1000 measurements
-            self.validation_times = self.validation_times[-1000:]
+        self.validation_histogram.record(duration_ms)
     
     def get_average_validation_time(self) -> float:
-        """Get average validation time in milliseconds."""
+        """Get average validation time in milliseconds over the recent window."""
         if not self.validation_times:
             return 0.0
         return sum(self.validation_times) / len(self.validation_times)
     
+    def get_validation_percentile(self, percentile: float) -> float:
+        """Get a validation time percentile (0-100) in milliseconds."""
+        return self.validation_histogram.quantile(percentile / 100.0)
+    
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get summary of security metrics."""
         return {
@@ -162,18 +182,46 @@ class EnhancedSensitiveDataDetector:
             self.compiled_patterns[category] = [
                 re.compile(pattern, re.IGNORECASE) for pattern in pattern_list
             ]
+        self.fingerprint = patterns_fingerprint(self.patterns)
+    
+    def _scan_cache_key(self, data_str: str) -> Tuple[Any, Optional[str]]:
+        scan_cache = get_scan_cache()
+        if scan_cache is None:
+            return None, None
+        return scan_cache, scan_cache.key_for("sensitive_data_detector", data_str, self.fingerprint)
     
     def detect_sensitive_data(self, data: Any) -> Dict[str, List[str]]:
-        """Detect sensitive data in input and return findings by category."""
+        """
+        Detect sensitive data in input and return findings by category.
+        
+        Results for repeated content come from the scan cache. Only match
+        counts are cached, so content known to be clean returns at once
+        and content with findings is rescanned in the matching categories.
+        """
         findings = defaultdict(list)
-        data_str = json.dumps(data, default=str) if not isinstance(data, str) else data
+        data_str = json_dumps(data) if not isinstance(data, str) else data
         
-        for category, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
+        scan_cache, key = self._scan_cache_key(data_str)
+        entry = scan_cache.lookup(key, "counts") if key else None
+        if entry is not None and "counts" in entry:
+            categories = [category for category, count in entry["counts"].items() if count]
+        else:
+            categories = list(self.compiled_patterns)
+        
+        for category in categories:
+            for pattern in self.compiled_patterns.get(category, []):
                 matches = pattern.findall(data_str)
                 if matches:
                     findings[category].extend(matches)
         
+        if key and (entry is None or "counts" not in entry):
+            entry = dict(entry or {})
+            entry["counts"] = {category: len(matches) for category, matches in findings.items()}
+            if not findings:
+                # Nothing matched, so redaction would leave the content unchanged
+                entry["redacted"] = None
+            scan_cache.store(key, entry)
+        
         return dict(findings)
     
     def is_sensitive_data(self, data: Any) -> bool:
@@ -186,26 +234,39 @@ class EnhancedSensitiveDataDetector:
         if data is None:
             return None
         
-        data_str = json.dumps(data, default=str) if not isinstance(data, str) else data
-        sanitized_str = data_str
+        data_str = json_dumps(data) if not isinstance(data, str) else data
         
-        # Replace sensitive patterns
-        for category, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                sanitized_str = pattern.sub(mask, sanitized_str)
+        # Redactions are cached for the default mask only
+        scan_cache, key = self._scan_cache_key(data_str) if mask == "[REDACTED]" else (None, None)
+        entry = scan_cache.lookup(key, "redacted") if key else None
         
-        # Special handling for user paths - replace with generic path
-        for pattern in self.compiled_patterns["user_paths"]:
-            sanitized_str = pattern.sub('/Users/[USER]', sanitized_str)
+        if entry is not None and "redacted" in entry:
+            sanitized_str = data_str if entry["redacted"] is None else entry["redacted"]
+        else:
+            sanitized_str = data_str
+            
+            # Replace sensitive patterns
+            for category, patterns in self.compiled_patterns.items():
+                for pattern in patterns:
+                    sanitized_str = pattern.sub(mask, sanitized_str)
+            
+            # Special handling for user paths - replace with generic path
+            for pattern in self.compiled_patterns["user_paths"]:
+                sanitized_str = pattern.sub('/Users/[USER]', sanitized_str)
+            
+            if key:
+                entry = dict(entry or {})
+                entry["redacted"] = None if sanitized_str == data_str else sanitized_str
+                scan_cache.store(key, entry)
         
         # Try to convert back to original structure
         try:
             if isinstance(data, dict):
-                return json.loads(sanitized_str)
+                return json_loads(sanitized_str)
             elif isinstance(data, str):
                 return sanitized_str
             else:
-                return json.loads(sanitized_str)
+                return json_loads(sanitized_str)
         except json.JSONDecodeError:
             # If we can't parse it back, return the sanitized string
             return sanitized_str
@@ -499,14 +560,13 @@ class SecurityValidator:
         start_time = time.time()
         
         try:
-            # Convert to JSON to measure size
-            json_str = json.dumps(data, default=str)
-            size_bytes = len(json_str.encode('utf-8'))
+            # Stops measuring as soon as the limit is passed
+            size_bytes = estimate_payload_size(data, limit=self.max_input_size_bytes)
             
             if size_bytes > self.max_input_size_bytes:
                 size_mb = size_bytes / (1024 * 1024)
                 self.metrics.record_oversized_input(size_mb)
-                raise InputSizeError(f"Input size {size_mb:.2f}MB exceeds limit of {self.max_input_size_bytes/(1024*1024):.2f}MB")
+                raise InputSizeError(f"Input size of at least {size_mb:.2f}MB exceeds limit of {self.max_input_size_bytes/(1024*1024):.2f}MB")
             
             return True
             
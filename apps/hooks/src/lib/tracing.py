@@ -0,0 +1,312 @@
+"""
+Span tracing of hook phases for Chronicle hooks.
+
+Each hook process is one trace. Phases (stdin parse, sanitize, permission
+decision, session resolve, database writes) open nested spans carrying
+attributes such as payload bytes, tool name and backend. At process exit
+the spans are appended to rolling trace files in two formats:
+
+- Chrome trace-event JSON (chronicle-trace.json), which opens directly in
+  chrome://tracing or https://ui.perfetto.dev
+- OTLP/JSON export requests, one per line (chronicle-trace.otlp.jsonl),
+  for any OpenTelemetry-compatible collector or viewer
+
+Tracing is off unless CHRONICLE_TRACE is set; disabled spans are a shared
+no-op object so instrumented code pays almost nothing. Spans also delimit
+the phases profiled when CHRONICLE_PROFILE is set (see profiling.py).
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .profiling import get_active_profiler
+    from .utils import get_chronicle_data_dir
+except ImportError:
+    from profiling import get_active_profiler
+    from utils import get_chronicle_data_dir
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+CHROME_TRACE_FILE = "chronicle-trace.json"
+OTLP_TRACE_FILE = "chronicle-trace.otlp.jsonl"
+
+# OTLP span status codes
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+# The innermost open span in the current thread or task
+_current_span: contextvars.ContextVar = contextvars.ContextVar("chronicle_current_span", default=None)
+
+
+class Span:
+    """A timed, attributed phase of hook execution."""
+    
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id: Optional[str] = None
+        self.start_time_ns = 0
+        self.duration_ns = 0
+        self.thread_id = threading.get_ident()
+        self.status_code = STATUS_CODE_UNSET
+        self.status_message = ""
+        self._start_perf_ns = 0
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+    
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        if parent is not None:
+            self.parent_span_id = parent.span_id
+        self._token = _current_span.set(self)
+        self.start_time_ns = time.time_ns()
+        self._start_perf_ns = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._start_perf_ns
+        if exc_type is not None:
+            self.status_code = STATUS_CODE_ERROR
+            self.status_message = f"{exc_type.__name__}: {exc_val}"
+        _current_span.reset(self._token)
+        self.tracer.finish(self)
+    
+    @property
+    def end_time_ns(self) -> int:
+        return self.start_time_ns + self.duration_ns
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled."""
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode a Python value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Tracer:
+    """
+    Collects finished spans for one process and exports them at exit.
+    
+    Files roll over once they pass max_bytes; up to `backups` older files
+    are kept as <name>.1, <name>.2, ...
+    """
+    
+    def __init__(self, trace_dir: Optional[str] = None, formats: Optional[List[str]] = None,
+                 max_bytes: Optional[int] = None, backups: int = 3,
+                 service_name: str = "chronicle-hooks"):
+        self.trace_dir = Path(
+            trace_dir or os.getenv("CHRONICLE_TRACE_DIR") or get_chronicle_data_dir() / "traces"
+        ).expanduser()
+        self.formats = formats or [
+            fmt.strip() for fmt in os.getenv("CHRONICLE_TRACE_FORMAT", "chrome,otlp").split(",") if fmt.strip()
+        ]
+        self.max_bytes = max_bytes or int(float(os.getenv("CHRONICLE_TRACE_MAX_MB", "10")) * 1024 * 1024)
+        self.backups = backups
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.finished: List[Span] = []
+        self.lock = threading.Lock()
+        self._exit_hook_registered = False
+    
+    def span(self, name: str, **attributes) -> Span:
+        """Create a span; use it as a context manager."""
+        return Span(self, name, attributes)
+    
+    def finish(self, span: Span) -> None:
+        """Buffer a finished span until flush()."""
+        with self.lock:
+            self.finished.append(span)
+            if not self._exit_hook_registered:
+                atexit.register(self.flush)
+                self._exit_hook_registered = True
+    
+    def to_chrome_events(self, spans: List[Span]) -> List[Dict[str, Any]]:
+        """Convert spans to Chrome trace-event complete ("X") events."""
+        pid = os.getpid()
+        events = []
+        for span in spans:
+            args = dict(span.attributes)
+            if span.status_code == STATUS_CODE_ERROR:
+                args["error"] = span.status_message
+            events.append({
+                "name": span.name,
+                "cat": "chronicle",
+                "ph": "X",
+                "ts": span.start_time_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return events
+    
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        """Convert spans to an OTLP/JSON ExportTraceServiceRequest."""
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_time_ns),
+                "endTimeUnixNano": str(span.end_time_ns),
+                "attributes": _otlp_attributes(span.attributes),
+                "status": {"code": span.status_code},
+            }
+            if span.parent_span_id:
+                otlp_span["parentSpanId"] = span.parent_span_id
+            if span.status_message:
+                otlp_span["status"]["message"] = span.status_message
+            otlp_spans.append(otlp_span)
+        
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "chronicle.hooks"},
+                    "spans": otlp_spans,
+                }],
+            }]
+        }
+    
+    def _rotate(self, path: Path, incoming: int) -> None:
+        """Roll the file over if appending would pass max_bytes."""
+        try:
+            if path.stat().st_size + incoming <= self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        
+        for index in range(self.backups - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{index}")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink()
+    
+    def _append(self, path: Path, data: bytes, header: bytes = b"") -> None:
+        """Append in a single write so concurrent hook processes do not interleave."""
+        self._rotate(path, len(data))
+        if header:
+            try:
+                fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                try:
+                    os.write(fd, header)
+                finally:
+                    os.close(fd)
+            except FileExistsError:
+                pass
+        
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+    
+    def flush(self) -> int:
+        """
+        Append buffered spans to the trace files.
+        
+        Returns:
+            Number of spans written (0 on failure; never raises)
+        """
+        with self.lock:
+            spans, self.finished = self.finished, []
+        if not spans:
+            return 0
+        
+        try:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            
+            if "chrome" in self.formats:
+                # JSON array format; viewers accept the missing closing bracket
+                lines = "".join(json.dumps(event) + ",\n" for event in self.to_chrome_events(spans))
+                self._append(self.trace_dir / CHROME_TRACE_FILE, lines.encode("utf-8"), header=b"[\n")
+            
+            if "otlp" in self.formats:
+                line = json.dumps(self.to_otlp(spans)) + "\n"
+                self._append(self.trace_dir / OTLP_TRACE_FILE, line.encode("utf-8"))
+        except Exception as e:
+            logger.debug(f"Failed to write trace to {self.trace_dir}: {e}")
+            return 0
+        
+        return len(spans)
+
+
+def is_tracing_enabled() -> bool:
+    """Tracing is opt-in via CHRONICLE_TRACE."""
+    return os.getenv("CHRONICLE_TRACE", "").lower() in ("1", "true", "on", "yes")
+
+
+# Global tracer, created on first use
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer instance."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def trace_span(name: str, **attributes):
+    """
+    Open a span for a hook phase.
+    
+    Usage:
+        with trace_span("sqlite_write", backend="sqlite") as span:
+            ...
+            span.set_attribute("payload_bytes", len(payload))
+    
+    Returns a no-op span when tracing is disabled. When profiling is on,
+    the span is wrapped to mark a profiling phase.
+    """
+    span = get_tracer().span(name, **attributes) if is_tracing_enabled() else _NOOP_SPAN
+    profiler = get_active_profiler()
+    return profiler.phase(name, span) if profiler else span
@@ -9,6 +9,7 @@ import json
 import os
 import re
 from datetime import datetime
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -25,6 +26,13 @@ try:
 except ImportError:
     import json as json_impl
 
+try:
+    from . import json_codec
+    from .lazy_json import LazyJSONObject
+except ImportError:
+    import json_codec
+    from lazy_json import LazyJSONObject
+
 # Enhanced patterns for sensitive data detection (simplified for performance)
 SENSITIVE_PATTERNS = {
     "api_keys": [
@@ -118,6 +126,31 @@ def get_database_config() -> Dict[str, Any]:
     return config
 
 
+_SANITIZE_FINGERPRINT: Optional[str] = None
+
+
+def _get_scan_cache():
+    # Imported lazily: scan_cache imports this module
+    try:
+        from .scan_cache import get_scan_cache
+    except ImportError:
+        from scan_cache import get_scan_cache
+    return get_scan_cache()
+
+
+def _sanitize_fingerprint() -> str:
+    global _SANITIZE_FINGERPRINT
+    if _SANITIZE_FINGERPRINT is None:
+        try:
+            from .scan_cache import patterns_fingerprint
+        except ImportError:
+            from scan_cache import patterns_fingerprint
+        _SANITIZE_FINGERPRINT = patterns_fingerprint(
+            [SENSITIVE_PATTERNS["api_keys"], SENSITIVE_PATTERNS["user_paths"]]
+        )
+    return _SANITIZE_FINGERPRINT
+
+
 def sanitize_data(data: Any) -> Any:
     """
     Fast sanitization for sensitive data.
@@ -131,19 +164,39 @@ def sanitize_data(data: Any) -> Any:
     if data is None:
         return None
     
-    data_str = json_impl.dumps(data) if not isinstance(data, str) else data
-    sanitized_str = data_str
+    if isinstance(data, LazyJSONObject) and b"\\" not in data.buffer:
+        # Without escapes the stdin text is what the patterns would see in a
+        # re-encoding, so scan it as received instead of decoding it first
+        data_str = data.text
+    elif isinstance(data, LazyJSONObject):
+        # Escapes (\/, \uXXXX) could hide a match; scan the canonical encoding
+        data_str = json_codec.dumps(data.to_dict())
+    else:
+        data_str = json_codec.dumps(data) if not isinstance(data, str) else data
     
-    # Only sanitize most critical patterns for performance
-    for pattern in SENSITIVE_PATTERNS["api_keys"]:
-        sanitized_str = re.sub(pattern, '[REDACTED]', sanitized_str)
+    # Identical payloads recur constantly; reuse an earlier redaction
+    scan_cache = _get_scan_cache()
+    key = scan_cache.key_for("sanitize_data", data_str, _sanitize_fingerprint()) if scan_cache else None
+    entry = scan_cache.lookup(key, "redacted") if key else None
     
-    for pattern in SENSITIVE_PATTERNS["user_paths"]:
-        sanitized_str = re.sub(pattern, '/Users/[USER]', sanitized_str)
+    if entry is not None and "redacted" in entry:
+        sanitized_str = data_str if entry["redacted"] is None else entry["redacted"]
+    else:
+        sanitized_str = data_str
+        
+        # Only sanitize most critical patterns for performance
+        for pattern in SENSITIVE_PATTERNS["api_keys"]:
+            sanitized_str = re.sub(pattern, '[REDACTED]', sanitized_str)
+        
+        for pattern in SENSITIVE_PATTERNS["user_paths"]:
+            sanitized_str = re.sub(pattern, '/Users/[USER]', sanitized_str)
+        
+        if key:
+            scan_cache.store(key, {"redacted": None if sanitized_str == data_str else sanitized_str})
     
     try:
-        if isinstance(data, dict):
-            return json_impl.loads(sanitized_str)
+        if isinstance(data, (dict, LazyJSONObject)):
+            return json_codec.loads(sanitized_str)
         return sanitized_str
     except:
         return sanitized_str
@@ -334,6 +387,82 @@ def extract_session_id(input_data: Optional[Dict[str, Any]] = None) -> Optional[
     return os.getenv("CLAUDE_SESSION_ID")
 
 
+class _SizeLimitExceeded(Exception):
+    pass
+
+
+class _SizeWalk:
+    """Running JSON-size total over a payload, aborting once past a limit."""
+    
+    __slots__ = ("total", "limit", "active")
+    
+    def __init__(self, limit: Optional[int]):
+        self.total = 0
+        self.limit = limit
+        self.active = set()  # containers on the current path, for cycle detection
+    
+    def add(self, size: int) -> None:
+        self.total += size
+        if self.limit is not None and self.total > self.limit:
+            raise _SizeLimitExceeded()
+    
+    def walk(self, value: Any) -> None:
+        if isinstance(value, str):
+            self.add(len(encode_basestring_ascii(value)))
+        elif isinstance(value, (dict, list, tuple)):
+            marker = id(value)
+            if marker in self.active:
+                raise ValueError("Circular reference detected")
+            self.active.add(marker)
+            # Brackets plus ", " separators, as json.dumps writes them
+            self.add(2 + 2 * max(len(value) - 1, 0))
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    # json.dumps writes non-string keys as their JSON text; plus quotes and ": "
+                    key_text = key if isinstance(key, str) else json.dumps(key).strip('"')
+                    self.add(len(encode_basestring_ascii(key_text)) + 2)
+                    self.walk(item)
+            else:
+                for item in value:
+                    self.walk(item)
+            self.active.discard(marker)
+        elif value is None or isinstance(value, (bool, int, float)):
+            self.add(len(json.dumps(value)))
+        else:
+            # Serialized with default=str
+            self.add(len(encode_basestring_ascii(str(value))))
+
+
+def estimate_payload_size(data: Any, limit: Optional[int] = None) -> int:
+    """
+    Size in bytes of a payload without serializing it.
+    
+    Strings are measured as their UTF-8 encoding. Other values are measured
+    as json.dumps(data, default=str) would write them, by adding up the
+    encoded lengths of the leaves.
+    
+    Args:
+        data: Payload to measure
+        limit: Optional limit; the walk stops as soon as the running total
+            exceeds it and that partial total (greater than limit) is returned
+        
+    Returns:
+        Size in bytes, or a lower bound above limit if the walk was cut short
+        
+    Raises:
+        ValueError: If the payload contains a circular reference
+    """
+    if isinstance(data, str):
+        return len(data) if data.isascii() else len(data.encode('utf-8', 'surrogatepass'))
+    
+    walk = _SizeWalk(limit)
+    try:
+        walk.walk(data)
+    except _SizeLimitExceeded:
+        pass
+    return walk.total
+
+
 # Constants for tool response parsing
 LARGE_RESULT_THRESHOLD = 100000  # 100KB threshold for large results
 
@@ -350,9 +479,8 @@ def parse_tool_response(response_data: Any) -> Dict[str, Any]:
     
     # Calculate response size
     try:
-        response_str = json_impl.dumps(response_data) if not isinstance(response_data, str) else response_data
-        result_size = len(response_str.encode('utf-8'))
-    except (TypeError, UnicodeEncodeError):
+        result_size = estimate_payload_size(response_data)
+    except (TypeError, ValueError, UnicodeEncodeError):
         result_size = 0
     
     # Extract success/failure status
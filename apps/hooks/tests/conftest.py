@@ -0,0 +1,28 @@
+"""Shared pytest configuration for Chronicle hooks tests."""
+
+import importlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Hook entry points called in-process would otherwise flush latency
+# histograms into the working tree's data/perf.db at interpreter exit
+os.environ.setdefault("CHRONICLE_PERF_STORE", "0")
+
+# Hooks and DatabaseManager() default to the tracked data/chronicle.db, whose
+# schema they would migrate and rows they would add; use a scratch database
+os.environ.setdefault("CLAUDE_HOOKS_DB_PATH", str(Path(tempfile.mkdtemp(prefix="chronicle-tests-")) / "chronicle.db"))
+
+# Likewise keep sanitizer results out of data/scan_cache.db. Tests that
+# clear os.environ re-enable the scan cache, so the global instance is
+# created up front without a backing file, under both import paths used by
+# the tests (src.lib.* and, for hook scripts, lib.*). Scan cache tests
+# install their own instance.
+os.environ.setdefault("CHRONICLE_SCAN_CACHE", "0")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+for module_name in ("src.lib", "lib"):
+    scan_cache = importlib.import_module(f"{module_name}.scan_cache")
+    cache_module = importlib.import_module(f"{module_name}.cache")
+    scan_cache._scan_cache = scan_cache.ScanResultCache(cache_module.LRUCache(max_size=1000))
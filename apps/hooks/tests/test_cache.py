@@ -0,0 +1,124 @@
+"""
+Tests for the LRU+TTL hook cache.
+
+Tests cover:
+- LRU ordering and eviction
+- Lazy TTL expiry
+- Byte-size limits
+- Hit, miss, eviction and expiration counters
+- Sharing entries across processes through the SQLite backing store
+"""
+
+import time
+
+from src.lib.cache import LRUCache, SQLiteCacheStore
+from src.lib.performance import CacheManager
+
+
+class TestLRUCache:
+    """Test in-memory cache behaviour."""
+    
+    def test_least_recently_used_is_evicted(self):
+        """Test that reading a key protects it from eviction."""
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        
+        cache.set("c", 3)
+        
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+    
+    def test_entries_expire_lazily(self):
+        """Test that expired entries are dropped when read."""
+        cache = LRUCache(ttl_seconds=60)
+        cache.set("short", "value", ttl_seconds=0.01)
+        cache.set("long", "value")
+        time.sleep(0.02)
+        
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["size"] == 1
+    
+    def test_byte_limit(self):
+        """Test eviction by serialized size and rejection of oversized values."""
+        cache = LRUCache(max_size=100, max_bytes=100)
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 30)
+        
+        assert cache.stats()["bytes"] <= 100
+        assert "k0" not in cache
+        assert "k4" in cache
+        
+        cache.set("huge", "x" * 500)
+        assert "huge" not in cache
+    
+    def test_hit_ratio(self):
+        """Test hit and miss accounting."""
+        cache = LRUCache()
+        cache.set("a", {"continue": True})
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+        
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_ratio"] == 2 / 3
+    
+    def test_falsy_values_are_cached(self):
+        """Test that cached empty values are distinguishable from misses."""
+        cache = LRUCache()
+        cache.set("empty", {})
+        assert cache.get("empty", "default") == {}
+        assert cache.get("absent", "default") == "default"
+    
+    def test_cache_manager_alias(self):
+        """Test the backwards-compatible CacheManager name."""
+        cache = CacheManager(max_size=10, ttl_seconds=300)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+
+class TestBackingStore:
+    """Test the cross-process SQLite store."""
+    
+    def test_entries_survive_a_new_cache(self, tmp_path):
+        """Test that a second cache on the same store sees earlier entries."""
+        db_path = str(tmp_path / "cache.db")
+        LRUCache(backing_store=SQLiteCacheStore(db_path)).set("hook:key", {"continue": True})
+        
+        cache = LRUCache(backing_store=SQLiteCacheStore(db_path))
+        assert cache.get("hook:key") == {"continue": True}
+        assert cache.stats()["store_hits"] == 1
+        
+        # Promoted into memory, so the next read does not touch the store
+        assert cache.get("hook:key") == {"continue": True}
+        assert cache.stats()["store_hits"] == 1
+    
+    def test_expired_rows_are_pruned(self, tmp_path):
+        """Test that expired and excess rows are removed when a store opens."""
+        db_path = str(tmp_path / "cache.db")
+        store = SQLiteCacheStore(db_path, max_entries=3)
+        store.set("expired", '"old"', time.time() - 1)
+        for i in range(5):
+            store.set(f"k{i}", '"value"', time.time() + 60)
+        
+        reopened = SQLiteCacheStore(db_path, max_entries=3, prune_probability=1.0)
+        assert reopened.get("expired") is None
+        assert reopened.get("k4") is not None
+        assert reopened.conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] == 3
+    
+    def test_opening_rarely_prunes(self, tmp_path):
+        """Test that a store opened without pruning leaves rows for a later prune."""
+        db_path = str(tmp_path / "cache.db")
+        SQLiteCacheStore(db_path).set("expired", '"old"', time.time() - 1)
+        
+        reopened = SQLiteCacheStore(db_path, prune_probability=0.0)
+        assert reopened.get("expired") is not None
+        assert LRUCache(backing_store=reopened).get("expired") is None
+        assert reopened.prune() == 1
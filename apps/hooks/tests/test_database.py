@@ -262,6 +262,90 @@ class TestDatabaseManager:
             assert row is not None
             assert row[0] == 'invalid_type'  # SQLite allows any event type
     
+    def test_save_event_stores_epoch_micros(self, mock_config_no_supabase, sample_event_data):
+        """Test that events get a time-ordered ID and integer timestamp."""
+        from src.lib.database import DatabaseManager
+        
+        db_manager = DatabaseManager(mock_config_no_supabase)
+        sample_event_data["timestamp"] = "2024-01-01T00:00:00.000001Z"
+        assert db_manager.save_event(sample_event_data) is True
+        
+        with sqlite3.connect(str(db_manager.sqlite_path)) as conn:
+            event_id, timestamp_us = conn.execute(
+                "SELECT id, timestamp_us FROM events WHERE session_id = ?",
+                (sample_event_data['session_id'],)
+            ).fetchone()
+        
+        assert uuid.UUID(event_id).version == 7
+        assert timestamp_us == 1704067200000001
+    
+    def test_save_event_honors_caller_event_id(self, mock_config_no_supabase, sample_event_data):
+        """Test that re-saving an event with the same ID does not duplicate it."""
+        from src.lib.database import DatabaseManager
+        
+        db_manager = DatabaseManager(mock_config_no_supabase)
+        event_id = str(uuid.uuid4())
+        sample_event_data["event_id"] = event_id
+        
+        assert db_manager.save_event(dict(sample_event_data)) is True
+        assert db_manager.save_event(dict(sample_event_data)) is True
+        
+        with sqlite3.connect(str(db_manager.sqlite_path)) as conn:
+            rows = conn.execute("SELECT id FROM events").fetchall()
+        
+        assert rows == [(event_id,)]
+    
+    def test_save_events_batch_is_retry_safe(self, mock_config_no_supabase, sample_event_data):
+        """Test that a batch can be re-sent after a partial save without duplicates."""
+        from src.lib.database import DatabaseManager
+        
+        db_manager = DatabaseManager(mock_config_no_supabase)
+        batch = [dict(sample_event_data, data={"index": i}) for i in range(5)]
+        
+        # First attempt only got part of the batch through
+        assert db_manager.save_events(batch[:2]) is True
+        assert db_manager.save_events(batch) is True
+        
+        with sqlite3.connect(str(db_manager.sqlite_path)) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        
+        assert count == 5
+        assert len({event["event_id"] for event in batch}) == 5
+    
+    def test_sqlite_migration_backfills_timestamp_us(self, mock_config_no_supabase):
+        """Test that pre-existing events tables gain a populated timestamp_us column."""
+        from src.lib.database import DatabaseManager
+        
+        # Events table as created before timestamp_us existed
+        with sqlite3.connect(mock_config_no_supabase['sqlite_path']) as conn:
+            conn.execute("""
+                CREATE TABLE events (
+                    id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    data TEXT NOT NULL DEFAULT '{}',
+                    tool_name TEXT,
+                    duration_ms INTEGER,
+                    created_at TEXT
+                )
+            """)
+            conn.execute(
+                "INSERT INTO events (id, session_id, event_type, timestamp) VALUES (?, ?, ?, ?)",
+                ("old-event", str(uuid.uuid4()), "stop", "2024-01-01T00:00:01Z")
+            )
+        
+        db_manager = DatabaseManager(mock_config_no_supabase)
+        
+        with sqlite3.connect(str(db_manager.sqlite_path)) as conn:
+            row = conn.execute("SELECT timestamp_us FROM events WHERE id = 'old-event'").fetchone()
+            index = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND name='idx_events_timestamp_us'"
+            ).fetchone()
+        
+        assert row[0] == 1704067201000000
+        assert index is not None
+    
     def test_get_session_success(self, mock_config_no_supabase, sample_session_data):
         """Test successful session retrieval."""
         from src.lib.database import DatabaseManager, validate_and_fix_session_id
@@ -459,4 +543,31 @@ class TestUtilityFunctions:
         
         # None - should generate new UUID
         none_uuid = ensure_valid_uuid(None)
-        assert len(none_uuid) == 36
\ No newline at end of file
+        assert len(none_uuid) == 36
+    
+    def test_generate_time_ordered_id(self):
+        """Test UUIDv7 generation is valid and monotonic."""
+        from src.lib.database import generate_time_ordered_id
+        
+        ids = [generate_time_ordered_id() for _ in range(1000)]
+        
+        assert all(uuid.UUID(value).version == 7 for value in ids)
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+    
+    def test_to_epoch_micros(self):
+        """Test timestamp conversion across the stored formats."""
+        from src.lib.database import to_epoch_micros
+        
+        assert to_epoch_micros("1970-01-01T00:00:00Z") == 0
+        assert to_epoch_micros("2024-01-01T00:00:00.5+00:00") == 1704067200500000
+        # PostgreSQL trims trailing zeros; Python < 3.11 only parses 3 or 6 digits
+        assert to_epoch_micros("2024-01-01T00:00:00.12345+00:00") == 1704067200123450
+        assert to_epoch_micros("2024-01-01 00:00:00.123456789Z") == 1704067200123456
+        
+        # Naive timestamps are local time, as written by datetime.now()
+        now = datetime.now()
+        assert to_epoch_micros(now.isoformat()) == int(round(now.timestamp() * 1_000_000))
+        
+        assert to_epoch_micros(None) is None
+        assert to_epoch_micros("not-a-timestamp") is None
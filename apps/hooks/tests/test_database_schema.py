@@ -18,7 +18,10 @@ from datetime import datetime, timezone
 from typing import Dict, Any, List
 
 # Import our database implementation
-from config.database import DatabaseManager, DatabaseError
+from config.database import (
+    DatabaseManager, DatabaseError, SQLiteClient, build_sqlite_where,
+    get_active_sessions, get_session_events
+)
 from config.models import Session, Event
 
 
@@ -539,6 +542,231 @@ class TestDataIntegrity:
         assert len(events[0]['data']['large_field']) == 10000
 
 
+class TestFilteredQueries:
+    """Test server-side filter predicates and ordering in select()."""
+    
+    @pytest_asyncio.fixture
+    async def db_manager(self):
+        """Setup test database manager."""
+        manager = DatabaseManager(
+            supabase_config=None,
+            sqlite_path=":memory:"
+        )
+        await manager.initialize()
+        yield manager
+        await manager.close()
+    
+    def test_build_sqlite_where_predicates(self):
+        """Test translation of filter shorthands and operators to SQL."""
+        clause, params = build_sqlite_where({
+            'end_time': None,
+            'event_type': ['tool_use', 'prompt'],
+            'timestamp': {'gte': '2025-01-01', 'lt': '2025-02-01'},
+            'tool_name': {'is_null': False},
+            'session_id': 'abc',
+        })
+        
+        assert clause == (
+            " WHERE end_time IS NULL AND event_type IN (?,?)"
+            " AND timestamp >= ? AND timestamp < ?"
+            " AND tool_name IS NOT NULL AND session_id = ?"
+        )
+        assert params == ['tool_use', 'prompt', '2025-01-01', '2025-02-01', 'abc']
+    
+    def test_build_sqlite_where_rejects_unknown_operator(self):
+        """Test that unknown operators are rejected rather than ignored."""
+        with pytest.raises(DatabaseError):
+            build_sqlite_where({'timestamp': {'between': ('a', 'b')}})
+    
+    @pytest.mark.asyncio
+    async def test_get_active_sessions_filters_in_sql(self, db_manager):
+        """Test that only sessions without end_time are returned, newest first."""
+        for i in range(4):
+            session_id = await db_manager.insert('sessions', {
+                'claude_session_id': f'active-test-{i}',
+                'project_path': '/test',
+                'start_time': f'2025-01-0{i + 1}T00:00:00+00:00',
+            })
+            if i % 2:
+                await db_manager.update('sessions', session_id, {
+                    'end_time': '2025-01-10T00:00:00+00:00'
+                })
+        
+        active = await get_active_sessions(db_manager)
+        
+        assert [s['claude_session_id'] for s in active] == ['active-test-2', 'active-test-0']
+    
+    @pytest.mark.asyncio
+    async def test_active_sessions_use_partial_index(self, db_manager):
+        """Test that the active-session query is served by the partial index."""
+        cursor = await db_manager.current_client.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM sessions WHERE end_time IS NULL "
+            "ORDER BY start_time DESC"
+        )
+        plan = await cursor.fetchall()
+        
+        assert any('idx_sessions_active' in row[-1] for row in plan)
+    
+    @pytest.mark.asyncio
+    async def test_get_session_events_filters_event_types(self, db_manager):
+        """Test that event_types is applied as an IN predicate."""
+        session_id = await db_manager.insert('sessions', {
+            'claude_session_id': 'event-filter-session',
+            'project_path': '/test',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        })
+        for i, event_type in enumerate(['tool_use', 'prompt', 'notification', 'tool_use']):
+            await db_manager.insert('events', {
+                'session_id': session_id,
+                'event_type': event_type,
+                'timestamp': f'2025-01-01T00:00:0{i}+00:00',
+                'data': {'index': i},
+            })
+        
+        events = await get_session_events(
+            session_id, db_manager, event_types=['tool_use', 'prompt']
+        )
+        
+        assert [e['data']['index'] for e in events] == [3, 1, 0]
+
+
+class TestSQLiteWriter:
+    """Test the batched SQLite writer task and read pool."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_inserts_are_batched(self, tmp_path):
+        """Test that concurrent producers share commits and all rows land."""
+        client = SQLiteClient(str(tmp_path / "writer.db"), batch_size=50, batch_interval_ms=20)
+        assert await client.connect()
+        
+        session_id = await client.insert('sessions', {
+            'claude_session_id': 'writer-session',
+            'project_path': '/test',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        })
+        
+        async def produce(worker):
+            for i in range(10):
+                await client.insert('events', {
+                    'session_id': session_id,
+                    'event_type': 'test',
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'data': {'worker': worker, 'index': i},
+                })
+        
+        await asyncio.gather(*(produce(w) for w in range(8)))
+        
+        # Reads come from the read-only pool and must see committed writes
+        events = await client.select('events', {'session_id': session_id})
+        assert len(events) == 80
+        assert client.write_stats['batches'] < client.write_stats['operations']
+        
+        await client.disconnect()
+    
+    @pytest.mark.asyncio
+    async def test_failed_write_does_not_poison_batch(self, tmp_path):
+        """Test that a failing statement only fails its own caller."""
+        client = SQLiteClient(str(tmp_path / "writer.db"), batch_interval_ms=20)
+        assert await client.connect()
+        
+        session = {
+            'claude_session_id': 'dup-session',
+            'project_path': '/test',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        }
+        results = await asyncio.gather(
+            client.insert('sessions', dict(session, id='a')),
+            client.insert('sessions', dict(session, id='b')),
+            return_exceptions=True,
+        )
+        
+        # Unique constraint on claude_session_id rejects exactly one of them
+        assert sum(isinstance(r, DatabaseError) for r in results) == 1
+        assert len(await client.select('sessions')) == 1
+        
+        await client.disconnect()
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_flushes_pending_writes(self, tmp_path):
+        """Test that queued writes are committed before disconnect returns."""
+        db_path = str(tmp_path / "writer.db")
+        client = SQLiteClient(db_path, batch_interval_ms=50)
+        assert await client.connect()
+        
+        pending = asyncio.ensure_future(client.insert('sessions', {
+            'claude_session_id': 'flush-session',
+            'project_path': '/test',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        }))
+        await asyncio.sleep(0)
+        await client.disconnect()
+        assert await pending
+        
+        reopened = SQLiteClient(db_path)
+        assert await reopened.connect()
+        assert len(await reopened.select('sessions')) == 1
+        await reopened.disconnect()
+    
+    @pytest.mark.asyncio
+    async def test_failed_bulk_insert_leaves_no_rows(self, tmp_path):
+        """Test that an executemany failing part-way keeps none of its rows."""
+        client = SQLiteClient(str(tmp_path / "writer.db"), batch_interval_ms=20)
+        assert await client.connect()
+        
+        session_id = await client.insert('sessions', {
+            'claude_session_id': 'bulk-session',
+            'project_path': '/test',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        })
+        events = [
+            {'session_id': session_id, 'event_type': 'test', 'timestamp': '2025-01-01T00:00:00+00:00', 'data': {}},
+            {'session_id': 'missing-session', 'event_type': 'test', 'timestamp': '2025-01-01T00:00:01+00:00', 'data': {}},
+        ]
+        results = await asyncio.gather(
+            client.bulk_insert('events', events),
+            client.insert('events', dict(events[0], id='kept')),
+            return_exceptions=True,
+        )
+        
+        # The foreign key rejects the second row; the first is rolled back with it
+        assert isinstance(results[0], DatabaseError)
+        assert [e['id'] for e in await client.select('events')] == ['kept']
+        
+        await client.disconnect()
+    
+    @pytest.mark.asyncio
+    async def test_batch_error_fails_writers_and_keeps_writer_running(self, tmp_path, monkeypatch):
+        """Test that an error escaping a batch fails its writers instead of stranding them."""
+        client = SQLiteClient(str(tmp_path / "writer.db"))
+        assert await client.connect()
+        
+        commit_batch = client._commit_batch
+        async def failing_commit_batch(batch):
+            monkeypatch.setattr(client, '_commit_batch', commit_batch)
+            raise RuntimeError("disk I/O error")
+        monkeypatch.setattr(client, '_commit_batch', failing_commit_batch)
+        
+        with pytest.raises(DatabaseError):
+            await asyncio.wait_for(client.delete('sessions', 'a'), 1)
+        assert await asyncio.wait_for(client.delete('sessions', 'b'), 1) is False
+        
+        await client.disconnect()
+    
+    @pytest.mark.asyncio
+    async def test_stopped_writer_fails_queued_writes(self, tmp_path):
+        """Test that writes queued behind a stopped writer fail and disconnect returns."""
+        client = SQLiteClient(str(tmp_path / "writer.db"), max_queue_size=1)
+        assert await client.connect()
+        
+        pending = [asyncio.ensure_future(client.delete('sessions', str(i))) for i in range(3)]
+        await asyncio.sleep(0)
+        client._writer_task.cancel()
+        
+        results = await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), 1)
+        assert all(isinstance(r, DatabaseError) for r in results)
+        await asyncio.wait_for(client.disconnect(), 1)
+
+
 if __name__ == "__main__":
     # Run tests
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+"""
+Tests for replaying snapshot sessions through the real hooks.
+
+Tests cover:
+- Mapping snapshot events back to hook stdin payloads
+- Scaling recorded gaps by the acceleration factor
+- End-to-end replay into a temporary SQLite database
+"""
+
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add the snapshot scripts directory to the Python path for importing the replay driver
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "snapshot"))
+
+from hook_replay import HookReplayDriver, build_schedules, event_to_payloads
+
+
+def make_snapshot():
+    """Two overlapping sessions, one second between events."""
+    sessions = [
+        {"id": "s1", "claude_session_id": "claude-s1", "project_path": "/work/one"},
+        {"id": "s2", "claude_session_id": "claude-s2", "project_path": "/work/two"},
+    ]
+    events = []
+    for n, session_id in enumerate(["s1", "s2"]):
+        for i, (event_type, data) in enumerate([
+            ("session_start", {"source": "startup"}),
+            ("user_prompt_submit", {"prompt_text": "List the files"}),
+            ("pre_tool_use", {"tool_name": "LS", "tool_input": {"path": "/work"}}),
+            ("post_tool_use", {"tool_name": "LS", "result_size": 128}),
+            ("stop", {}),
+        ]):
+            events.append({
+                "id": f"{session_id}-{i}",
+                "session_id": session_id,
+                "event_type": event_type,
+                "timestamp": f"2025-08-01T10:00:{i + n:02d}Z",
+                "data": data,
+            })
+    return {"metadata": {"captured_at": "2025-08-01T11:00:00Z"}, "sessions": sessions, "events": events}
+
+
+class TestPayloads:
+    """Test snapshot events become hook payloads."""
+    
+    def test_post_tool_use_synthesizes_response_of_recorded_size(self):
+        """Test a response of result_size bytes stands in for the unstored output."""
+        payloads = event_to_payloads({"event_type": "post_tool_use", "data": {"tool_name": "Read", "result_size": 64}})
+        assert payloads == [("PostToolUse", {"tool_name": "Read", "tool_input": {}, "tool_response": {"content": "x" * 64}})]
+    
+    def test_legacy_tool_use_becomes_pre_and_post(self):
+        """Test legacy tool_use events replay as both tool hooks."""
+        payloads = event_to_payloads({
+            "event_type": "tool_use",
+            "data": {"tool_name": "Bash", "tool_input": {"command": "ls"}, "tool_output": {"stdout": "a"}},
+        })
+        assert [hook for hook, _ in payloads] == ["PreToolUse", "PostToolUse"]
+        assert payloads[1][1]["tool_response"] == {"stdout": "a"}
+    
+    def test_schedule_carries_session_fields(self):
+        """Test payloads use the Claude session ID and project path."""
+        schedules = build_schedules(make_snapshot())
+        offset, hook, payload = schedules[1][0]
+        
+        assert (offset, hook) == (1.0, "SessionStart")
+        assert json.loads(payload)["session_id"] == "claude-s2"
+        assert json.loads(payload)["cwd"] == "/work/two"
+    
+    def test_copies_use_new_session_ids(self):
+        """Test cloned sessions do not collide with the originals."""
+        schedules = build_schedules(make_snapshot(), copies=2)
+        session_ids = {json.loads(schedule[0][2])["session_id"] for schedule in schedules}
+        assert session_ids == {"claude-s1", "claude-s2", "claude-s1-replay1", "claude-s2-replay1"}
+
+
+class TestReplay:
+    """Test the concurrent replay driver."""
+    
+    def test_gaps_are_scaled_by_acceleration(self):
+        """Test four recorded seconds replay in about 0.2s at 20x."""
+        calls = []
+        driver = HookReplayDriver(
+            build_schedules(make_snapshot()), time_acceleration=20.0,
+            invoke=lambda hook, payload: calls.append(hook) or True,
+        )
+        start = time.monotonic()
+        results = asyncio.run(driver.run())
+        elapsed = time.monotonic() - start
+        
+        assert len(calls) == 10
+        assert 0.2 <= elapsed < 1.0
+        assert results["replay_summary"]["failures"] == 0
+        assert results["latency"]["PreToolUse"]["count"] == 2
+    
+    def test_max_gap_skips_idle_time(self):
+        """Test long recorded pauses are capped."""
+        snapshot = make_snapshot()
+        snapshot["events"][-1]["timestamp"] = "2025-08-01T12:00:00Z"
+        driver = HookReplayDriver(
+            build_schedules(snapshot), time_acceleration=20.0, max_gap_seconds=1.0,
+            invoke=lambda hook, payload: True,
+        )
+        start = time.monotonic()
+        asyncio.run(driver.run())
+        assert time.monotonic() - start < 1.0
+    
+    def test_concurrent_calls_are_all_counted(self):
+        """Test counters and histograms from many pool threads add up exactly."""
+        driver = HookReplayDriver(
+            build_schedules(make_snapshot(), copies=50), time_acceleration=0, workers=16,
+            invoke=lambda hook, payload: hook != "PreToolUse",
+        )
+        results = asyncio.run(driver.run())
+        
+        assert results["replay_summary"]["hook_calls"] == 500
+        assert sum(summary["count"] for summary in results["latency"].values()) == 500
+        assert results["failures"] == {"PreToolUse": 100}
+    
+    def test_replay_through_hooks_writes_events(self, tmp_path, monkeypatch):
+        """Test the real hooks store one row per replayed call."""
+        db_path = tmp_path / "replay.db"
+        monkeypatch.setenv("CLAUDE_HOOKS_DB_PATH", str(db_path))
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+        monkeypatch.delenv("SUPABASE_ANON_KEY", raising=False)
+        
+        driver = HookReplayDriver(build_schedules(make_snapshot()), time_acceleration=0, workers=4)
+        results = asyncio.run(driver.run())
+        
+        assert results["replay_summary"]["hook_calls"] == 10
+        with sqlite3.connect(db_path) as conn:
+            counts = dict(conn.execute("SELECT event_type, COUNT(*) FROM events GROUP BY event_type"))
+        assert counts["pre_tool_use"] == 2
+        assert counts["post_tool_use"] == 2
+        assert counts["user_prompt_submit"] == 2
@@ -0,0 +1,92 @@
+"""
+Tests for the JSON serialization facade.
+
+Tests cover:
+- Identical results from the orjson, ujson and stdlib backends
+- Fallback to the standard library for values fast backends reject
+- Standard decode errors
+- Event data stored as TEXT from bytes
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.lib import json_codec
+from src.lib.database import DatabaseManager
+
+PAYLOAD = {
+    "tool_name": "Edit",
+    "tool_input": {"file_path": "/tmp/café.py", "old_string": "a\n\"b\"", "replace_all": False},
+    "numbers": [0, -1, 2.5, 10 ** 12],
+    "nested": {"empty": {}, "none": None},
+}
+
+
+@pytest.fixture(params=["orjson", "ujson", "json"])
+def backend(request, monkeypatch):
+    """Run a test against each available backend."""
+    if request.param == "orjson" and json_codec.orjson is None:
+        pytest.skip("orjson not installed")
+    if request.param == "ujson" and json_codec.ujson is None:
+        pytest.skip("ujson not installed")
+    if request.param != "orjson":
+        monkeypatch.setattr(json_codec, "orjson", None)
+    if request.param == "json":
+        monkeypatch.setattr(json_codec, "ujson", None)
+    return request.param
+
+
+class TestRoundTrip:
+    """Test serialization behaviour per backend."""
+    
+    def test_bytes_and_text_agree(self, backend):
+        """Test dumps_bytes is the UTF-8 encoding of a round-trippable dumps."""
+        encoded = json_codec.dumps_bytes(PAYLOAD)
+        
+        assert isinstance(encoded, bytes)
+        assert json_codec.loads(encoded) == PAYLOAD
+        assert json_codec.loads(json_codec.dumps(PAYLOAD)) == PAYLOAD
+        assert json_codec.loads(memoryview(encoded)) == PAYLOAD
+    
+    def test_rejected_values_fall_back(self, backend):
+        """Test big integers, lone surrogates and unknown types still serialize."""
+        value = {"big": 2 ** 70, "surrogate": "\ud800", "when": datetime(2026, 1, 1), 1: "int key"}
+        decoded = json_codec.loads(json_codec.dumps_bytes(value))
+        
+        assert decoded["big"] == 2 ** 70
+        assert decoded["surrogate"] == "\ud800"
+        assert decoded["when"].startswith("2026-01-01")
+        assert decoded["1"] == "int key"
+    
+    def test_decode_errors_are_standard(self, backend):
+        """Test invalid input raises json.JSONDecodeError on every backend."""
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(b"{not json")
+    
+    def test_nan_round_trips_through_stdlib_fallback(self, backend):
+        """Test documents written by the stdlib fallback can be read back."""
+        assert json_codec.loads("[NaN]")[0] != json_codec.loads("[NaN]")[0]
+
+
+class TestEventStorage:
+    """Test the bytes path into SQLite."""
+    
+    def test_event_data_is_stored_as_text(self, tmp_path):
+        """Test events.data is TEXT, not a BLOB, and decodes to the event data."""
+        manager = DatabaseManager({"sqlite_path": str(tmp_path / "events.db")})
+        success, session_id = manager.save_session({"claude_session_id": "codec-session"})
+        assert success
+        assert manager.save_event({
+            "session_id": session_id,
+            "event_type": "pre_tool_use",
+            "timestamp": "2026-01-01T00:00:00+00:00",
+            "data": {"tool_name": "Edit", "note": "naïve"},
+        })
+        
+        with sqlite3.connect(str(tmp_path / "events.db")) as conn:
+            kind, data = conn.execute("SELECT typeof(data), data FROM events").fetchone()
+        assert kind == "text"
+        assert json.loads(data)["note"] == "naïve"
@@ -0,0 +1,183 @@
+"""
+Tests for the persistent cross-process latency histogram store.
+
+Tests cover:
+- Log-linear bucket boundaries
+- Histogram merge and quantile accuracy
+- Flushing from several writers into one SQLite store
+- Percentile reports per hook and phase
+- Serialization and bounded-memory collector statistics
+"""
+
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.lib.latency_store import (
+    LatencyHistogram, LatencyStore, bucket_index, bucket_upper_bound, BUCKET_COUNT
+)
+from src.lib.performance import PerformanceCollector, PerformanceMetrics
+
+
+class TestLatencyHistogram:
+    """Test histogram bucketing and quantiles."""
+    
+    def test_bucket_boundaries_are_monotonic(self):
+        """Test that larger durations never map to smaller buckets."""
+        values = [10 ** (e / 50) for e in range(-200, 300)]
+        indexes = [bucket_index(v) for v in values]
+        
+        assert indexes == sorted(indexes)
+        assert bucket_index(0.0) == 0
+        assert bucket_index(1e9) == BUCKET_COUNT - 1
+        
+        # Each value falls below its bucket's upper bound
+        for value, index in zip(values, indexes):
+            assert value < bucket_upper_bound(index) * 1.0000001
+    
+    def test_quantile_relative_error(self):
+        """Test that quantiles stay within the bucket resolution."""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(3, 1) for _ in range(10000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * len(ordered)) - 1]
+            estimate = histogram.quantile(q)
+            assert exact <= estimate * 1.0000001
+            assert estimate <= exact * 1.11
+    
+    def test_merge_equals_combined_recording(self):
+        """Test that merging two histograms matches recording into one."""
+        left, right, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(1, 500):
+            (left if i % 2 else right).record(i * 0.37)
+            combined.record(i * 0.37)
+        
+        merged = left.merge(right)
+        
+        assert merged.buckets == combined.buckets
+        assert merged.count == combined.count
+        assert merged.quantile(0.95) == combined.quantile(0.95)
+    
+    def test_serialization_round_trip(self):
+        """Test that to_dict/from_dict preserve the histogram through JSON."""
+        histogram = LatencyHistogram()
+        for i in range(1, 200):
+            histogram.record(i * 1.3)
+        
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+        
+        assert restored.buckets == histogram.buckets
+        assert restored.summary() == histogram.summary()
+        assert LatencyHistogram.from_dict(LatencyHistogram().to_dict()).summary()["min_ms"] == 0.0
+
+
+class TestPerformanceCollectorSketches:
+    """Test that the collector keeps constant memory per operation."""
+    
+    @staticmethod
+    def record(collector, name, duration_ms):
+        metrics = PerformanceMetrics(operation_name=name, start_time=0.0)
+        metrics.duration_ms = duration_ms
+        collector.record_metrics(metrics)
+    
+    def test_memory_stays_bounded(self):
+        """Test that buckets and violations do not grow with sample count."""
+        collector = PerformanceCollector(max_violations=10)
+        for i in range(20000):
+            self.record(collector, "hook", 50.0 + (i % 100))
+        
+        histogram = collector.operation_stats["hook"]
+        assert histogram.count == 20000
+        assert len(histogram.buckets) <= 100
+        assert len(collector.threshold_violations) == 10
+        
+        stats = collector.get_statistics()
+        assert stats["violations"] == 9800
+        assert len(stats["recent_violations"]) == 5
+        assert 140.0 <= collector.get_statistics("hook")["p95_ms"] <= 149.0
+    
+    def test_export_and_merge(self):
+        """Test that exported histograms merge into another collector."""
+        worker, parent = PerformanceCollector(), PerformanceCollector()
+        for i in range(100):
+            self.record(worker, "db.insert", float(i))
+            self.record(parent, "db.insert", float(i))
+        
+        parent.merge_histograms(json.loads(json.dumps(worker.export_histograms())))
+        
+        stats = parent.get_statistics("db.insert")
+        assert stats["count"] == 200
+        assert stats["max_ms"] == 99.0
+
+
+class TestLatencyStore:
+    """Test persistence and aggregation across writers."""
+    
+    def test_flush_accumulates_across_writers(self, tmp_path):
+        """Test that separate stores on one file add up."""
+        db_path = tmp_path / "perf.db"
+        
+        for writer in range(3):
+            store = LatencyStore(str(db_path))
+            for i in range(100):
+                store.record("pre_tool_use", "total", 1.0 + i)
+            assert store.flush() == 100
+        
+        histograms = LatencyStore(str(db_path)).load()
+        histogram = histograms[("pre_tool_use", "total")]
+        
+        assert histogram.count == 300
+        assert histogram.max_ms == 100.0
+        assert 90 <= histogram.quantile(0.95) <= 100
+    
+    def test_report_per_hook_and_phase(self, tmp_path):
+        """Test report rows and over-budget fraction."""
+        store = LatencyStore(str(tmp_path / "perf.db"))
+        for _ in range(9):
+            store.record("session_start", "total", 50.0)
+        store.record("session_start", "total", 250.0)
+        store.record("session_start", "project_context", 5.0)
+        store.flush()
+        
+        rows = store.report(budget_ms=100.0)
+        
+        assert [(row["hook"], row["phase"]) for row in rows] == [
+            ("session_start", "project_context"),
+            ("session_start", "total"),
+        ]
+        total = rows[1]
+        assert total["count"] == 10
+        assert total["over_budget_pct"] == pytest.approx(10.0)
+        assert total["p99_ms"] == 250.0
+    
+    def test_flushes_at_process_exit(self, tmp_path):
+        """Test that observations recorded in a child process survive its exit."""
+        db_path = tmp_path / "perf.db"
+        src_dir = Path(__file__).parent.parent / "src"
+        code = (
+            "import sys\n"
+            "from lib.latency_store import record_latency\n"
+            "record_latency('stop', 'total', 12.5)\n"
+            "sys.exit(0)\n"
+        )
+        
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(src_dir),
+            env={"CHRONICLE_PERF_DB": str(db_path), "PATH": ""},
+            check=True,
+            timeout=30,
+        )
+        
+        histogram = LatencyStore(str(db_path)).load()[("stop", "total")]
+        assert histogram.count == 1
+        assert histogram.max_ms == 12.5
@@ -0,0 +1,120 @@
+"""
+Tests for the lazy hook stdin view.
+
+Tests cover:
+- Top-level key indexing over nested, escaped and unicode content
+- On-demand decoding
+- Raw slices, sizes, digests and previews
+- Errors for malformed input
+- Sanitizing a lazy payload, re-encoding it only when it holds escapes
+"""
+
+import hashlib
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.lib.base_hook import BaseHook
+from src.lib.lazy_json import LazyJSONObject, index_object, read_hook_input
+from src.lib.utils import sanitize_data
+
+PAYLOAD = {
+    "session_id": "session-123",
+    "tool_name": "Read",
+    "tool_input": {"file_path": "/tmp/a \"quoted\" {name}.txt", "limit": 10},
+    "tool_response": {"content": "line with ] and } and \\\\ and é\n" * 50, "items": [1, [2, {"x": None}]]},
+    "flag": True,
+    "count": -1.5e3,
+}
+
+
+def lazy(payload=PAYLOAD, **dump_kwargs):
+    return LazyJSONObject(json.dumps(payload, **dump_kwargs).encode("utf-8"))
+
+
+class TestIndexing:
+    """Test the top-level scan."""
+    
+    @pytest.mark.parametrize("dump_kwargs", [{}, {"indent": 2}, {"ensure_ascii": False}, {"separators": (",", ":")}])
+    def test_values_match_full_decode(self, dump_kwargs):
+        """Test every value equals json.loads of the whole payload."""
+        view = lazy(**dump_kwargs)
+        assert list(view) == list(PAYLOAD)
+        for key, value in PAYLOAD.items():
+            assert view[key] == value
+        assert view.to_dict() == PAYLOAD
+    
+    def test_values_decode_on_demand(self):
+        """Test only accessed values are decoded."""
+        view = lazy()
+        assert view.get("tool_name") == "Read"
+        assert "tool_response" in view
+        assert list(view._values) == ["tool_name"]
+    
+    def test_empty_and_duplicate_keys(self):
+        """Test empty objects and last-wins duplicate keys."""
+        assert len(LazyJSONObject(b" {} ")) == 0
+        assert LazyJSONObject(b'{"a": 1, "a": 2}')["a"] == 2
+    
+    @pytest.mark.parametrize("text", [b"", b"[1, 2]", b'{"a": 1', b'{"a" 1}', b'{"a": "open}', b'{"a": 1} extra', b'{"a": }'])
+    def test_malformed_input(self, text):
+        """Test malformed payloads raise JSONDecodeError like json.load."""
+        with pytest.raises(json.JSONDecodeError):
+            index_object(text)
+
+
+class TestRawAccess:
+    """Test access to undecoded values."""
+    
+    def test_raw_size_digest_and_preview(self):
+        """Test raw slices match the encoded value."""
+        view = lazy()
+        encoded = json.dumps(PAYLOAD["tool_response"]).encode("utf-8")
+        
+        assert bytes(view.raw("tool_response")) == encoded
+        assert view.raw_size("tool_response") == len(encoded)
+        assert view.raw_size("missing") == 0
+        assert view.digest("tool_response") == hashlib.blake2b(encoded, digest_size=16).hexdigest()
+        assert view.preview("tool_response", 12) == encoded[:12].decode()
+        assert "tool_response" not in view._values
+    
+    def test_read_hook_input_from_text_stream(self):
+        """Test reading from a text-only stream such as a patched stdin."""
+        view = read_hook_input(io.StringIO(json.dumps(PAYLOAD)))
+        assert view["tool_input"] == PAYLOAD["tool_input"]
+    
+    def test_read_hook_input_from_binary_buffer(self):
+        """Test reading stdin's underlying byte buffer."""
+        stream = io.TextIOWrapper(io.BytesIO(json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8")), encoding="utf-8")
+        assert read_hook_input(stream)["tool_response"] == PAYLOAD["tool_response"]
+
+
+class TestHookIntegration:
+    """Test lazy payloads through the shared hook path."""
+    
+    def test_sanitize_lazy_payload(self):
+        """Test sanitization scans the raw text and returns a dict."""
+        payload = {"session_id": "s", "tool_input": {"path": "/Users/jane/notes.txt"}}
+        result = sanitize_data(lazy(payload))
+        
+        assert isinstance(result, dict)
+        assert result["tool_input"]["path"] == "/Users/[USER]/notes.txt"
+        assert result == sanitize_data(payload)
+    
+    def test_sanitize_escaped_payload(self):
+        """Test JSON escapes in the stdin text don't hide sensitive values."""
+        text = b'{"p":"\\/home\\/bob\\/x","k":"sk-\\u0061bcdefghijklmnopqrstuvwxyz"}'
+        result = sanitize_data(LazyJSONObject(text))
+        
+        assert result == {"p": "/Users/[USER]/x", "k": "[REDACTED]"}
+        assert result == sanitize_data(json.loads(text))
+    
+    def test_process_hook_data_accepts_lazy_payload(self):
+        """Test BaseHook treats the view as valid mapping input."""
+        with patch('src.lib.base_hook.DatabaseManager'):
+            processed = BaseHook().process_hook_data(lazy(), "PostToolUse")
+        
+        assert processed["claude_session_id"] == "session-123"
+        assert processed["raw_input"]["tool_name"] == "Read"
@@ -0,0 +1,155 @@
+"""
+Tests for the OpenMetrics exporter.
+
+Tests cover:
+- Persisted counters fed by DatabaseManager, SecurityMetrics and ErrorHandler
+- Hook duration histograms in OpenMetrics and Prometheus text
+- Atomic textfile writes
+- The HTTP /metrics endpoint
+"""
+
+import threading
+import urllib.request
+
+import pytest
+
+from src.lib import latency_store
+from src.lib.database import DatabaseManager
+from src.lib.errors import ErrorHandler, DatabaseError
+from src.lib.latency_store import LatencyStore
+from src.lib.metrics_exporter import MetricsExporter, serve_metrics
+from src.lib.performance import PerformanceCollector, PerformanceMetrics
+from src.lib.security import SecurityMetrics
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Enabled global store in a temporary directory."""
+    store = LatencyStore(str(tmp_path / "perf.db"))
+    monkeypatch.setenv("CHRONICLE_PERF_STORE", "1")
+    monkeypatch.setattr(latency_store, "_latency_store", store)
+    yield store
+    store.pending.clear()
+    store.pending_counters.clear()
+
+
+def sample_lines(text):
+    return [line for line in text.splitlines() if line and not line.startswith("#")]
+
+
+class TestMetricSources:
+    """Test that existing components feed persisted counters."""
+    
+    def test_database_write_counters(self, store, tmp_path):
+        """Test per-backend write counters from save_event."""
+        manager = DatabaseManager({"sqlite_path": str(tmp_path / "events.db")})
+        success, session_id = manager.save_session({"claude_session_id": "metrics-session"})
+        assert success
+        assert manager.save_event({
+            "session_id": session_id,
+            "event_type": "notification",
+            "timestamp": "2026-01-01T00:00:00+00:00",
+        })
+        store.flush()
+        
+        counters = {(name, tuple(sorted(labels.items()))): value for name, labels, value in store.load_counters()}
+        assert counters[("event_writes", (("backend", "sqlite"), ("result", "success")))] == 1
+    
+    def test_security_and_error_counters(self, store):
+        """Test that SecurityMetrics and ErrorHandler increments are persisted."""
+        metrics = SecurityMetrics()
+        metrics.record_path_traversal_attempt("../../etc/passwd")
+        metrics.record_sensitive_data_detection("api_keys")
+        metrics.record_sensitive_data_detection("api_keys")
+        ErrorHandler().handle_error(DatabaseError("connection lost"), operation="save_event")
+        store.flush()
+        
+        counters = {(name, tuple(sorted(labels.items()))): value for name, labels, value in store.load_counters()}
+        assert counters[("security_events", (("kind", "path_traversal"),))] == 1
+        assert counters[("sensitive_data_detections", (("data_type", "api_keys"),))] == 2
+        assert [name for name, _ in counters].count("errors") == 1
+
+
+class TestRendering:
+    """Test exposition formats."""
+    
+    def test_openmetrics_histogram_and_counters(self, store, tmp_path):
+        """Test cumulative buckets, counters and size gauges."""
+        for duration_ms in (0.5, 3.0, 40.0, 120.0):
+            store.record("pre_tool_use", "total", duration_ms)
+        store.record("pre_tool_use", "cpu_user", 30.0)
+        store.increment("event_writes", {"backend": "supabase", "result": "failure"}, 2)
+        store.increment("supabase_fallbacks", {}, 2)
+        
+        exporter = MetricsExporter(store=store, database_paths={"perf": str(store.db_path)})
+        text = exporter.render()
+        lines = sample_lines(text)
+        
+        assert 'chronicle_hook_duration_seconds_bucket{hook="pre_tool_use",phase="total",le="0.005"} 2' in lines
+        assert 'chronicle_hook_duration_seconds_bucket{hook="pre_tool_use",phase="total",le="0.1"} 3' in lines
+        assert 'chronicle_hook_duration_seconds_bucket{hook="pre_tool_use",phase="total",le="+Inf"} 4' in lines
+        assert 'chronicle_hook_duration_seconds_count{hook="pre_tool_use",phase="total"} 4' in lines
+        assert 'chronicle_hook_cpu_seconds_total{hook="pre_tool_use",mode="user"} 0.03' in lines
+        assert 'chronicle_event_writes_total{backend="supabase",result="failure"} 2' in lines
+        assert "chronicle_supabase_fallbacks_total 2" in lines
+        assert "# TYPE chronicle_event_writes counter" in text
+        assert text.endswith("# EOF\n")
+        assert any(line.startswith('chronicle_database_size_bytes{database="perf"} ') for line in lines)
+    
+    def test_prometheus_text_names_counter_families_with_total(self, store):
+        """Test the textfile-collector format."""
+        store.increment("errors", {"code": "DB_ERR", "type": "DatabaseError"})
+        text = MetricsExporter(store=store, database_paths={}).render(openmetrics=False)
+        
+        assert "# TYPE chronicle_errors_total counter" in text
+        assert "# EOF" not in text
+        assert "# UNIT" not in text
+    
+    def test_unpersisted_collector_is_included(self, store):
+        """Test that an in-process collector adds its histograms once."""
+        collector = PerformanceCollector()
+        metrics = PerformanceMetrics(operation_name="stop.database", start_time=0.0)
+        metrics.duration_ms = 7.0
+        collector.record_metrics(metrics)
+        
+        text = MetricsExporter(store=store, collector=collector, database_paths={}).render()
+        assert 'chronicle_hook_duration_seconds_count{hook="stop",phase="database"} 1' in text
+    
+    def test_label_values_are_escaped(self, store):
+        """Test quotes, backslashes and newlines in label values."""
+        store.increment("errors", {"code": 'a"b\\c\nd', "type": "X"})
+        text = MetricsExporter(store=store, database_paths={}).render()
+        assert 'code="a\\"b\\\\c\\nd"' in text
+
+
+class TestOutputs:
+    """Test textfile and HTTP outputs."""
+    
+    def test_write_textfile(self, store, tmp_path):
+        """Test that the textfile is written atomically with no temp files left."""
+        store.increment("event_writes", {"backend": "sqlite", "result": "success"})
+        target = tmp_path / "collector" / "chronicle.prom"
+        
+        MetricsExporter(store=store, database_paths={}).write_textfile(str(target))
+        
+        assert 'chronicle_event_writes_total{backend="sqlite",result="success"} 1' in target.read_text()
+        assert [path.name for path in target.parent.iterdir()] == ["chronicle.prom"]
+    
+    def test_http_endpoint_negotiates_format(self, store):
+        """Test /metrics serves OpenMetrics when requested."""
+        store.increment("event_writes", {"backend": "sqlite", "result": "success"})
+        server = serve_metrics(MetricsExporter(store=store, database_paths={}), port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            request = urllib.request.Request(url, headers={"Accept": "application/openmetrics-text"})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+                assert response.read().decode().endswith("# EOF\n")
+            
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,98 @@
+"""
+Tests for the lean timing mode of the performance utilities.
+
+Tests cover:
+- Timing without psutil calls by default
+- Opt-in and sampled memory tracking
+- CPU time captured at the hook boundary
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.lib import latency_store
+from src.lib.latency_store import LatencyStore
+from src.lib.performance import (
+    measure_performance, performance_monitor, get_process, should_track_memory
+)
+
+
+class TestLeanTiming:
+    """Test the default, psutil-free timing path."""
+    
+    def test_lean_mode_skips_psutil(self, monkeypatch):
+        """Test that measuring does not construct or query a process handle."""
+        monkeypatch.delenv("CHRONICLE_PERF_MEMORY", raising=False)
+        
+        with patch("src.lib.performance.psutil.Process") as process:
+            with measure_performance("lean.operation") as metrics:
+                pass
+        
+        process.assert_not_called()
+        assert metrics.duration_ms is not None and metrics.duration_ms >= 0
+        assert metrics.memory_start_mb is None
+        assert metrics.process_id is not None
+    
+    def test_decorator_records_duration(self, monkeypatch):
+        """Test that performance_monitor passes results through in lean mode."""
+        monkeypatch.delenv("CHRONICLE_PERF_MEMORY", raising=False)
+        
+        @performance_monitor("lean.decorated")
+        def work():
+            return [1, 2, 3]
+        
+        assert work() == [1, 2, 3]
+    
+    def test_memory_tracking_is_opt_in(self):
+        """Test that explicit memory tracking fills memory fields."""
+        with measure_performance("memory.operation", track_memory=True) as metrics:
+            pass
+        
+        assert metrics.memory_start_mb > 0
+        assert metrics.memory_end_mb > 0
+    
+    def test_process_handle_is_cached(self):
+        """Test that the psutil handle is created once per process."""
+        assert get_process() is get_process()
+
+
+class TestMemorySampling:
+    """Test CHRONICLE_PERF_MEMORY resolution."""
+    
+    @pytest.mark.parametrize("setting,expected", [
+        ("", False), ("0", False), ("off", False), ("1", True), ("true", True), ("bogus", False)
+    ])
+    def test_env_setting(self, monkeypatch, setting, expected):
+        """Test on/off values of the environment switch."""
+        monkeypatch.setenv("CHRONICLE_PERF_MEMORY", setting)
+        assert should_track_memory() is expected
+    
+    def test_sample_rate(self, monkeypatch):
+        """Test that a fractional value samples roughly that share of calls."""
+        monkeypatch.setenv("CHRONICLE_PERF_MEMORY", "0.25")
+        sampled = sum(should_track_memory() for _ in range(4000))
+        assert 700 < sampled < 1300
+    
+    def test_explicit_argument_wins(self, monkeypatch):
+        """Test that track_memory overrides the environment."""
+        monkeypatch.setenv("CHRONICLE_PERF_MEMORY", "1")
+        assert should_track_memory(False) is False
+
+
+class TestHookBoundaryUsage:
+    """Test CPU time recorded alongside a hook's total latency."""
+    
+    def test_total_records_cpu_phases(self, tmp_path, monkeypatch):
+        """Test that a total timing also stores cpu_user and cpu_system."""
+        store = LatencyStore(str(tmp_path / "perf.db"))
+        monkeypatch.setenv("CHRONICLE_PERF_STORE", "1")
+        monkeypatch.setattr(latency_store, "_latency_store", store)
+        
+        latency_store.record_latency("stop", "database", 3.0)
+        latency_store.record_latency("stop", "total", 12.0)
+        
+        phases = {phase for _, phase in store.pending}
+        assert phases == {"database", "total", "cpu_user", "cpu_system"}
+        assert store.pending[("stop", "cpu_user")].max_ms > 0
+        store.pending.clear()
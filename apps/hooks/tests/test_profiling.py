@@ -0,0 +1,153 @@
+"""
+Tests for opt-in per-invocation profiling.
+
+Tests cover:
+- CHRONICLE_PROFILE mode parsing and sampling
+- Collapsed stacks from the sampling profiler
+- Memory snapshots around trace_span phases
+- Minimum-duration filtering and rotation of profile files
+- Merging profiles into one collapsed-stack file
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.lib import profiling
+from src.lib.profiling import (
+    HookProfiler, StackSampler, get_active_profiler, get_profile_modes,
+    list_profiles, merge_collapsed, merge_memory, profile_hook_name,
+)
+from src.lib.tracing import trace_span
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    """Started cpu and mem profiler installed as this process's profiler."""
+    profiler = HookProfiler({"cpu", "mem"}, profile_dir=str(tmp_path), hook_name="pre_tool_use")
+    monkeypatch.setenv("CHRONICLE_TRACE", "0")
+    monkeypatch.setattr(profiling, "_profiler", profiler)
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+def busy_phase(duration_s):
+    """Allocate and spin long enough to be sampled."""
+    retained = []
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        retained.append(bytearray(100))
+    return retained
+
+
+class TestSettings:
+    """Test environment settings."""
+    
+    @pytest.mark.parametrize("setting, modes", [
+        ("", set()),
+        ("off", set()),
+        ("cpu", {"cpu"}),
+        ("CPU, mem", {"cpu", "mem"}),
+        ("all", {"cpu", "mem"}),
+        ("cpu,disk", {"cpu"}),
+    ])
+    def test_profile_modes(self, monkeypatch, setting, modes):
+        """Test CHRONICLE_PROFILE values and unknown modes being ignored."""
+        monkeypatch.setenv("CHRONICLE_PROFILE", setting)
+        assert get_profile_modes() == modes
+    
+    def test_sampled_out_process_is_not_profiled(self, monkeypatch):
+        """Test a process not picked by CHRONICLE_PROFILE_SAMPLE gets no profiler, once and for all."""
+        monkeypatch.setenv("CHRONICLE_PROFILE", "cpu")
+        monkeypatch.setenv("CHRONICLE_PROFILE_SAMPLE", "10")
+        monkeypatch.setattr(profiling, "_profiler", None)
+        monkeypatch.setattr(profiling, "_sampled_out", False)
+        monkeypatch.setattr(profiling.random, "randrange", lambda n: 3)
+        
+        assert get_active_profiler() is None
+        assert profiling._sampled_out is True
+
+
+class TestProfiles:
+    """Test the profiles written for one invocation."""
+    
+    def test_sampler_collapses_stacks(self):
+        """Test stacks are recorded root first with the sampling thread left out."""
+        sampler = StackSampler(0.001)
+        sampler.sample(skip_thread_id=threading.get_ident() + 1)
+        
+        own_stack = next(stack for stack in sampler.stacks if "test_sampler_collapses_stacks" in stack)
+        assert own_stack.rsplit(";", 1)[-1].startswith("sample (lib/profiling.py:")
+        assert own_stack.index("test_sampler_collapses_stacks") < own_stack.index("sample (")
+        assert sampler.samples == 1
+    
+    def test_phases_write_cpu_and_memory_profiles(self, profiler, tmp_path):
+        """Test trace_span phases are profiled and written at stop."""
+        with trace_span("pre_tool_use"):
+            with trace_span("sanitize"):
+                retained = busy_phase(0.05)
+        
+        paths = profiler.stop()
+        
+        assert sorted(path.name.rsplit(".", 1)[-1] for path in paths) == ["collapsed", "json"]
+        assert all(profile_hook_name(path) == "pre_tool_use" for path in paths)
+        stacks = merge_collapsed([p for p in paths if p.name.endswith(".collapsed")])
+        assert any("busy_phase" in stack for stack in stacks)
+        
+        memory = json.loads(next(p for p in paths if p.name.endswith(".mem.json")).read_text())
+        assert [phase["path"] for phase in memory["phases"]] == ["pre_tool_use;sanitize", "pre_tool_use"]
+        sanitize = memory["phases"][0]
+        assert sanitize["size_diff"] >= len(retained) * 100
+        assert sanitize["top"][0]["location"].startswith("tests/test_profiling.py:")
+        assert memory["peak_bytes"] >= sanitize["size_diff"]
+        assert not any("lib/profiling.py" in allocation["location"] for allocation in memory["top"])
+    
+    def test_fast_invocations_are_not_written(self, tmp_path):
+        """Test invocations faster than min_ms leave no profile."""
+        profiler = HookProfiler({"cpu", "mem"}, profile_dir=str(tmp_path), min_ms=10_000)
+        profiler.start()
+        
+        assert profiler.stop() == []
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_rotation_keeps_newest(self, tmp_path):
+        """Test only the newest keep files remain."""
+        for second in range(5):
+            (tmp_path / f"20250801T10000{second}.000Z-1-stop.collapsed").write_text("main 1\n")
+        profiler = HookProfiler({"cpu"}, profile_dir=str(tmp_path), hook_name="stop", keep=3)
+        profiler.start()
+        written = profiler.stop()
+        
+        remaining = list_profiles(tmp_path)
+        assert len(remaining) == 3
+        assert remaining[-1] == written[0]
+        assert remaining[0].name.startswith("20250801T100003")
+
+
+class TestAggregation:
+    """Test merging profiles from many invocations."""
+    
+    def test_merge_collapsed_by_hook(self, tmp_path):
+        """Test counts are summed per stack and optionally rooted at the hook."""
+        first = tmp_path / "20250801T100000.000Z-1-pre_tool_use.collapsed"
+        second = tmp_path / "20250801T100001.000Z-2-post_tool_use.collapsed"
+        first.write_text("main;save 3\nmain;parse 1\n")
+        second.write_text("main;save 2\n")
+        
+        assert merge_collapsed([first, second]) == {"main;save": 5, "main;parse": 1}
+        assert merge_collapsed([first, second], by_hook=True) == {
+            "pre_tool_use;main;save": 3, "pre_tool_use;main;parse": 1, "post_tool_use;main;save": 2,
+        }
+    
+    def test_merge_memory_counts_growth(self, tmp_path):
+        """Test retained bytes are summed per allocation stack, ignoring freed memory."""
+        path = tmp_path / "20250801T100000.000Z-1-stop.mem.json"
+        path.write_text(json.dumps({"hook": "stop", "top": [
+            {"location": "lib/db.py:9", "size_diff": 400, "stack": ["hooks/stop.py:5", "lib/db.py:9"]},
+            {"location": "lib/utils.py:3", "size_diff": -100},
+        ]}))
+        
+        assert merge_memory([path, path], by_hook=True) == {"stop;hooks/stop.py:5;lib/db.py:9": 800}
@@ -0,0 +1,172 @@
+"""
+Test suite for the deadline-aware database retry policy.
+
+Tests cover:
+- Retrying idempotent operations with jittered backoff
+- Never retrying non-idempotent operations
+- Giving up when the deadline cannot fit another attempt or the failover check
+- Hedged requests for slow idempotent operations
+- Retry metrics surfaced through DatabaseManager
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from config.database import DatabaseManager, DatabaseError
+from config.retry import RetryPolicy, DeadlineExceeded
+from src.lib.errors import RetryConfig
+
+
+def make_policy(**kwargs):
+    """Policy with fast, deterministic backoff for tests."""
+    config = RetryConfig(max_attempts=3, base_delay=0.01, max_delay=0.05, jitter=False)
+    return RetryPolicy(retry_config=config, **kwargs)
+
+
+class FlakyOperation:
+    """Coroutine factory that fails a fixed number of times."""
+    
+    def __init__(self, failures, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+    
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("transient failure")
+        return "ok"
+
+
+class TestRetryPolicy:
+    """Test retry decisions made by RetryPolicy."""
+    
+    @pytest.mark.asyncio
+    async def test_idempotent_operation_is_retried(self):
+        """Test that transient failures on idempotent operations are retried."""
+        policy = make_policy()
+        operation = FlakyOperation(failures=2)
+        
+        assert await policy.run(operation, idempotent=True) == "ok"
+        assert operation.calls == 3
+        assert policy.metrics["retries"] == 2
+        assert policy.metrics["successes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_non_idempotent_operation_is_not_retried(self):
+        """Test that non-idempotent operations fail on the first error."""
+        policy = make_policy()
+        operation = FlakyOperation(failures=1)
+        
+        with pytest.raises(ConnectionError):
+            await policy.run(operation, idempotent=False)
+        
+        assert operation.calls == 1
+        assert policy.metrics["not_retried_non_idempotent"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_retry_skipped_when_deadline_too_close(self):
+        """Test that backoff never sleeps past the caller's deadline."""
+        config = RetryConfig(max_attempts=3, base_delay=1.0, jitter=False)
+        policy = RetryPolicy(retry_config=config)
+        operation = FlakyOperation(failures=5)
+        
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            await policy.run(operation, timeout=0.2)
+        
+        assert time.monotonic() - start < 0.5
+        assert operation.calls == 1
+        assert policy.metrics["not_retried_deadline"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_slow_attempt_times_out_at_deadline(self):
+        """Test that a hanging attempt is cut off at the deadline."""
+        policy = make_policy()
+        operation = FlakyOperation(failures=0, delay=1.0)
+        
+        with pytest.raises(DeadlineExceeded):
+            await policy.run(operation, timeout=0.05)
+        
+        assert policy.metrics["attempt_timeouts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_failure_callback_is_bounded_by_deadline(self):
+        """Test that a slow on_failure (e.g. a health check) cannot overrun the budget."""
+        policy = make_policy()
+        operation = FlakyOperation(failures=1)
+        
+        async def slow_health_check(error):
+            await asyncio.sleep(1.0)
+        
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            await policy.run(operation, timeout=0.1, on_failure=slow_health_check)
+        
+        assert time.monotonic() - start < 0.2
+        assert operation.calls == 1
+        assert policy.metrics["not_retried_deadline"] == 1
+        assert policy.metrics["retries"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedge_sent_for_slow_request(self):
+        """Test that a request slower than the latency quantile is hedged."""
+        policy = make_policy(hedge=True, hedge_min_samples=5)
+        policy.latencies.extend([0.01] * 10)
+        
+        calls = []
+        
+        async def operation():
+            calls.append(None)
+            # First call stalls, the hedge returns immediately
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0)
+            return len(calls)
+        
+        assert await policy.run(operation, timeout=0.5) == 2
+        assert policy.metrics["hedges_sent"] == 1
+        assert policy.metrics["hedges_won"] == 1
+
+
+class TestDatabaseManagerRetry:
+    """Test retry integration in DatabaseManager."""
+    
+    @pytest.mark.asyncio
+    async def test_retry_metrics_in_client_info(self):
+        """Test that retry decisions are reported with client info."""
+        manager = DatabaseManager(
+            supabase_config=None,
+            sqlite_path=":memory:",
+            retry_policy=make_policy()
+        )
+        await manager.initialize()
+        
+        operation = FlakyOperation(failures=1)
+        result = await manager.execute_with_retry(lambda client: operation())
+        assert result == "ok"
+        
+        info = await manager.get_client_info()
+        assert info["retry_metrics"]["retries"] == 1
+        
+        await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_insert_failure_is_not_retried(self):
+        """Test that failed inserts surface immediately as DatabaseError."""
+        manager = DatabaseManager(
+            supabase_config=None,
+            sqlite_path=":memory:",
+            retry_policy=make_policy()
+        )
+        await manager.initialize()
+        
+        with pytest.raises(DatabaseError):
+            await manager.insert('no_such_table', {'value': 1})
+        
+        assert manager.retry_policy.metrics["retries"] == 0
+        assert manager.retry_policy.metrics["not_retried_non_idempotent"] == 1
+        
+        await manager.close()
@@ -71,7 +71,7 @@ class TestSecurityMetrics:
         assert metrics.sensitive_data_detections == 0
         assert metrics.blocked_operations == 0
         assert metrics.total_validations == 0
-        assert metrics.validation_times == []
+        assert list(metrics.validation_times) == []
     
     @patch('src.lib.security.logger')
     def test_record_path_traversal_attempt(self, mock_logger):
@@ -131,7 +131,7 @@ class TestSecurityMetrics:
             metrics.record_validation_time(time_ms)
         
         assert len(metrics.validation_times) == 5
-        assert metrics.validation_times == times
+        assert list(metrics.validation_times) == times
     
     def test_validation_time_limit(self):
         """Test validation time list is limited to 1000 entries."""
@@ -146,6 +146,17 @@ class TestSecurityMetrics:
         assert metrics.validation_times[0] == 100.0  # First 100 should be dropped
         assert metrics.validation_times[-1] == 1099.0
     
+    def test_validation_percentiles_cover_all_samples(self):
+        """Test percentiles come from the histogram, the average from the recent window."""
+        metrics = SecurityMetrics()
+        
+        for i in range(1, 2001):
+            metrics.record_validation_time(float(i))
+        
+        assert metrics.validation_histogram.count == 2000
+        assert metrics.get_average_validation_time() == pytest.approx(1500.5)
+        assert 1900.0 <= metrics.get_validation_percentile(95) <= 2000.0
+    
     def test_get_average_validation_time(self):
         """Test average validation time calculation."""
         metrics = SecurityMetrics()
@@ -440,7 +451,7 @@ class TestEnhancedSensitiveDataDetector:
         complex_data = {"key": "sk-1234567890123456789012345678901234567890"}
         
         # Mock json.loads to raise JSONDecodeError
-        with patch('json.loads', side_effect=json.JSONDecodeError("test", "test", 0)):
+        with patch('src.lib.security.json_loads', side_effect=json.JSONDecodeError("test", "test", 0)):
             result = detector.sanitize_sensitive_data(complex_data)
             # Should return sanitized string instead of parsed object
             assert isinstance(result, str)
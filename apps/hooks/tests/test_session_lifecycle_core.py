@@ -50,6 +50,8 @@ class TestFixtures:
             "CLAUDE_SESSION_ID": "test-session-123",
             "CLAUDE_PROJECT_DIR": "/test/project",
             "USER": "testuser",
+            # Keep hooks on conftest's scratch database
+            "CLAUDE_HOOKS_DB_PATH": os.environ["CLAUDE_HOOKS_DB_PATH"],
         }
         with patch.dict(os.environ, env_vars, clear=True):
             yield env_vars
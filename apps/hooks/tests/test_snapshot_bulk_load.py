@@ -0,0 +1,111 @@
+"""
+Tests for bulk SQLite ingestion of snapshots.
+
+Tests cover:
+- Streaming snapshot records without loading the whole file
+- Bulk loading sessions and events with deferred indexes
+- Row-by-row fallback when a batch contains a rejected row
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the snapshot scripts directory to the Python path for importing playback
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "snapshot"))
+
+from snapshot_playback import SnapshotBulkLoader, iter_snapshot_records
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    snapshot = {
+        "metadata": {"captured_at": "2025-08-01T10:00:00Z", "source": "test"},
+        "sessions": [
+            {"id": f"s{i}", "claude_session_id": f"claude-{i}", "project_path": "/work", "start_time": "2025-08-01T10:00:00Z"}
+            for i in range(3)
+        ],
+        "events": [
+            {
+                "id": f"e{i}",
+                "session_id": f"s{i % 3}",
+                "event_type": "pre_tool_use",
+                "timestamp": f"2025-08-01T10:00:{i:02d}Z",
+                "tool_name": "Read",
+                "data": {"tool_name": "Read", "tool_input": {"file_path": f"/work/{i}.py"}},
+            }
+            for i in range(25)
+        ],
+    }
+    path = tmp_path / "snapshot.json"
+    path.write_text(json.dumps(snapshot, indent=2))
+    return path
+
+
+class TestStreaming:
+    """Test incremental snapshot reading."""
+    
+    def test_small_chunks_yield_every_record(self, snapshot_file):
+        """Test records split across chunk boundaries decode intact."""
+        records = list(iter_snapshot_records(str(snapshot_file), chunk_size=7))
+        
+        assert records[0] == ("metadata", {"captured_at": "2025-08-01T10:00:00Z", "source": "test"})
+        assert [key for key, _ in records].count("sessions") == 3
+        events = [record for key, record in records if key == "events"]
+        assert [event["id"] for event in events] == [f"e{i}" for i in range(25)]
+    
+    def test_empty_arrays(self, tmp_path):
+        """Test empty sections produce no records."""
+        path = tmp_path / "empty.json"
+        path.write_text('{"metadata": {"captured_at": "x"}, "sessions": [], "events": [ ]}')
+        assert list(iter_snapshot_records(str(path))) == [("metadata", {"captured_at": "x"})]
+
+
+class TestBulkLoad:
+    """Test bulk loading into SQLite."""
+    
+    def test_loads_rows_and_builds_indexes(self, snapshot_file, tmp_path):
+        """Test every row lands and indexes exist after the load."""
+        db_path = tmp_path / "bulk.db"
+        loader = SnapshotBulkLoader(str(snapshot_file), str(db_path), batch_size=10, synchronous_off=True)
+        results = loader.load()
+        loader.cleanup()
+        
+        assert results["sessions_loaded"] == 3
+        assert results["events_loaded"] == 25
+        assert results["rows_failed"] == 0
+        assert results["orphaned_events"] == 0
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 25
+            assert json.loads(conn.execute("SELECT data FROM events WHERE id = 'e4'").fetchone()[0])["tool_name"] == "Read"
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_events_session_timestamp" in indexes
+    
+    def test_rejected_row_does_not_drop_batch(self, snapshot_file):
+        """Test a duplicate id fails alone and the rest of its batch is kept."""
+        snapshot = json.loads(snapshot_file.read_text())
+        snapshot["events"].append(dict(snapshot["events"][0]))
+        snapshot_file.write_text(json.dumps(snapshot))
+        
+        loader = SnapshotBulkLoader(str(snapshot_file), batch_size=100)
+        results = loader.load()
+        
+        assert results["events_loaded"] == 25
+        assert results["rows_failed"] == 1
+        assert loader.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 25
+        loader.cleanup()
+    
+    def test_reports_orphaned_events(self, snapshot_file):
+        """Test events for sessions missing from the snapshot are counted."""
+        snapshot = json.loads(snapshot_file.read_text())
+        snapshot["sessions"] = snapshot["sessions"][:1]
+        snapshot_file.write_text(json.dumps(snapshot))
+        
+        loader = SnapshotBulkLoader(str(snapshot_file))
+        results = loader.load()
+        loader.cleanup()
+        
+        assert results["orphaned_events"] == 16
@@ -0,0 +1,304 @@
+"""
+Tests for the streaming snapshot formats.
+
+Tests cover:
+- NDJSON (plain and gzip) and legacy JSON round trips through SnapshotWriter
+- Header metadata and counts read without reading the records
+- Streaming validation and sanitization from one format to another
+- Summarized change tracking and sanitization on a process pool
+- Streaming, paginated capture from a Supabase stand-in, when supabase-py is installed
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the snapshot and performance scripts directories to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "snapshot"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "scripts" / "performance"))
+
+import snapshot_format
+from snapshot_format import (
+    SnapshotWriter, iter_snapshot_records, load_snapshot, read_snapshot_header, save_snapshot
+)
+from snapshot_validator import SnapshotValidator
+
+
+def make_snapshot(events=20):
+    return {
+        "metadata": {"captured_at": "2025-08-01T10:00:00Z", "source": "test", "version": "1.0.0"},
+        "sessions": [
+            {"id": "s1", "claude_session_id": "claude-1", "project_path": "/home/alice/work/app", "start_time": "2025-08-01T10:00:00Z"},
+            {"id": "s2", "claude_session_id": "claude-2", "project_path": "/work/api", "start_time": "2025-08-01T10:05:00Z"},
+        ],
+        "events": [
+            {
+                "id": f"e{i}",
+                "session_id": "s1" if i % 2 else "s2",
+                "event_type": "tool_use",
+                "timestamp": f"2025-08-01T10:00:{i:02d}Z",
+                "tool_name": "Bash",
+                "data": {"tool_input": {"command": f"echo {i}"}, "note": "mail alice@corp.com"},
+            }
+            for i in range(events)
+        ],
+    }
+
+
+class TestRoundTrip:
+    """Test writing and reading every format."""
+    
+    @pytest.mark.parametrize("name", ["snapshot.ndjson", "snapshot.ndjson.gz", "snapshot.json"])
+    def test_round_trip(self, tmp_path, name):
+        """Test a snapshot reads back unchanged."""
+        path = tmp_path / name
+        save_snapshot(str(path), make_snapshot())
+        
+        assert load_snapshot(str(path)) == make_snapshot()
+        assert not list(tmp_path.glob("*.part"))
+    
+    def test_gzip_output_is_one_gzip_stream(self, tmp_path):
+        """Test standard gzip tools see header line then records."""
+        path = tmp_path / "snapshot.ndjson.gz"
+        save_snapshot(str(path), make_snapshot(events=3))
+        
+        lines = gzip.decompress(path.read_bytes()).splitlines()
+        assert len(lines) == 1 + 2 + 3
+        assert json.loads(lines[0])["counts"] == {"sessions": 2, "events": 3}
+        assert json.loads(lines[1])["section"] == "sessions"
+    
+    def test_header_read_without_records(self, tmp_path):
+        """Test metadata and counts come from the header line alone."""
+        path = tmp_path / "snapshot.ndjson"
+        save_snapshot(str(path), make_snapshot())
+        with open(path, "a") as f:
+            f.write("not json\n")
+        
+        header = read_snapshot_header(str(path))
+        assert header["counts"] == {"sessions": 2, "events": 20}
+        assert header["metadata"]["source"] == "test"
+        with pytest.raises(ValueError, match="line 24"):
+            list(iter_snapshot_records(str(path)))
+    
+    def test_legacy_document_streams(self, tmp_path):
+        """Test existing indented JSON snapshots stream record by record."""
+        path = tmp_path / "legacy.json"
+        path.write_text(json.dumps(make_snapshot(), indent=2))
+        
+        keys = [key for key, _ in iter_snapshot_records(str(path), chunk_size=16)]
+        assert keys == ["metadata"] + ["sessions"] * 2 + ["events"] * 20
+        assert read_snapshot_header(str(path)) == {"metadata": make_snapshot()["metadata"], "counts": None}
+    
+    def test_writer_writes_sessions_before_events(self, tmp_path):
+        """Test interleaved writes still put every session first."""
+        path = tmp_path / "snapshot.ndjson"
+        with SnapshotWriter(str(path), {"captured_at": "x"}) as writer:
+            writer.write_event({"id": "e1", "session_id": "s1"})
+            writer.write_session({"id": "s1"})
+            writer.metadata["events_captured"] = writer.counts["events"]
+        
+        assert [key for key, _ in iter_snapshot_records(str(path))] == ["metadata", "sessions", "events"]
+        assert read_snapshot_header(str(path))["metadata"]["events_captured"] == 1
+    
+    def test_failed_write_leaves_nothing(self, tmp_path):
+        """Test an exception inside the writer removes partial output."""
+        path = tmp_path / "snapshot.ndjson.gz"
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(str(path)) as writer:
+                writer.write_session({"id": "s1"})
+                raise RuntimeError("capture failed")
+        
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_failed_assembly_keeps_existing_snapshot(self, tmp_path, monkeypatch):
+        """Test a failure while assembling the output leaves the previous snapshot in place."""
+        path = tmp_path / "snapshot.ndjson"
+        save_snapshot(str(path), make_snapshot(events=2))
+        before = path.read_bytes()
+        
+        def disk_full(*args):
+            raise OSError(28, "No space left on device")
+        monkeypatch.setattr(snapshot_format.shutil, "copyfileobj", disk_full)
+        
+        with pytest.raises(OSError):
+            save_snapshot(str(path), make_snapshot(events=5))
+        
+        assert path.read_bytes() == before
+        assert [p.name for p in tmp_path.iterdir()] == ["snapshot.ndjson"]
+
+
+class TestStreamingValidation:
+    """Test record-by-record validation and sanitization."""
+    
+    def test_matches_in_memory_result(self, tmp_path):
+        """Test streaming and in-memory sanitization produce the same records."""
+        source = tmp_path / "snapshot.json"
+        source.write_text(json.dumps(make_snapshot()))
+        output = tmp_path / "sanitized.ndjson.gz"
+        
+        validator = SnapshotValidator()
+        assert validator.validate_and_sanitize_file(str(source), str(output))
+        streamed = load_snapshot(str(output))
+        
+        _, in_memory = SnapshotValidator().validate_and_sanitize(make_snapshot())
+        assert streamed["sessions"] == in_memory["sessions"]
+        assert streamed["events"] == in_memory["events"]
+        assert streamed["metadata"]["sanitization_applied"] is True
+        assert "alice@corp.com" not in output.read_bytes().decode("latin-1")
+    
+    def test_header_count_mismatch_is_an_error(self, tmp_path):
+        """Test a truncated NDJSON snapshot fails validation."""
+        path = tmp_path / "snapshot.ndjson"
+        save_snapshot(str(path), make_snapshot())
+        path.write_text("".join(path.read_text().splitlines(keepends=True)[:-5]))
+        
+        validator = SnapshotValidator()
+        assert not validator.validate_and_sanitize_file(str(path))
+        assert "Header declares 20 events, found 15" in validator.validation_errors
+    
+    def test_strict_mode_writes_nothing_when_invalid(self, tmp_path):
+        """Test strict mode discards the sanitized output of an invalid snapshot."""
+        snapshot = make_snapshot()
+        snapshot["events"][0]["session_id"] = "missing"
+        source = tmp_path / "snapshot.ndjson"
+        save_snapshot(str(source), snapshot)
+        output = tmp_path / "sanitized.ndjson"
+        
+        assert not SnapshotValidator(strict_mode=True).validate_and_sanitize_file(str(source), str(output))
+        assert not output.exists()
+
+
+class TestSanitization:
+    """Test change tracking and parallel sanitization."""
+    
+    def test_changes_summarized_per_pattern(self):
+        """Test every replacement is counted but only a few are kept as samples."""
+        validator = SnapshotValidator()
+        _, sanitized = validator.validate_and_sanitize(make_snapshot(events=40))
+        
+        report = validator.get_validation_report()["sanitization"]
+        assert report["patterns_found"]["emails"] == 40
+        assert len(report["samples"]["emails"]) == 10
+        assert report["samples"]["emails"][0] == {
+            "context": "event[0].data.note", "original": "alice@corp.com", "replacement": "user@example.com"
+        }
+        assert report["changes_count"] == sum(report["patterns_found"].values())
+        assert sanitized["events"][0]["data"]["note"] == "mail user@example.com"
+    
+    def test_pool_matches_in_process(self, tmp_path):
+        """Test sanitizing on a process pool gives the same records, order and summary."""
+        source = tmp_path / "snapshot.ndjson"
+        save_snapshot(str(source), make_snapshot(events=50))
+        
+        results = []
+        for workers in (1, 2):
+            output = tmp_path / f"sanitized_{workers}.ndjson"
+            validator = SnapshotValidator(workers=workers, chunk_size=7)
+            assert validator.validate_and_sanitize_file(str(source), str(output))
+            results.append((load_snapshot(str(output))["events"], validator.sanitization_changes))
+        
+        assert results[0] == results[1]
+        assert [event["id"] for event in results[1][0]] == [f"e{i}" for i in range(50)]
+
+
+class TestCapture:
+    """Test capturing from Supabase straight to a snapshot file."""
+    
+    def test_capture_to_file(self, tmp_path):
+        """Test sessions and events from Supabase land in an NDJSON snapshot."""
+        pytest.importorskip("supabase")
+        from supabase_standin import SupabaseStandIn
+        from snapshot_capture import SnapshotCapture
+        
+        snapshot = make_snapshot()
+        with SupabaseStandIn() as standin:
+            standin.store.insert("sessions", snapshot["sessions"])
+            standin.store.insert("events", snapshot["events"])
+            capture = SnapshotCapture(standin.url, standin.key)
+            output = tmp_path / "capture.ndjson.gz"
+            metadata = asyncio.run(capture.capture_to_file(str(output), hours=24 * 365 * 10))
+        
+        assert metadata["sessions_captured"] == 2
+        assert metadata["events_captured"] == 20
+        assert read_snapshot_header(str(output))["counts"] == {"sessions": 2, "events": 20}
+    
+    @pytest.mark.parametrize("max_sessions,events_per_session,complete", [(5, 0, True), (2, 0, False), (5, 3, False)])
+    def test_only_complete_capture_records_marks(self, tmp_path, max_sessions, events_per_session, complete):
+        """Test a capped capture leaves out high-water marks, so --since cannot chain from a sample."""
+        pytest.importorskip("supabase")
+        from supabase_standin import SupabaseStandIn
+        from snapshot_capture import SnapshotCapture
+        
+        snapshot = make_snapshot()
+        with SupabaseStandIn() as standin:
+            standin.store.insert("sessions", snapshot["sessions"])
+            standin.store.insert("events", snapshot["events"])
+            capture = SnapshotCapture(standin.url, standin.key)
+            output = tmp_path / "capture.ndjson"
+            metadata = asyncio.run(capture.capture_to_file(
+                str(output), hours=24 * 365 * 10, max_sessions=max_sessions, events_per_session=events_per_session,
+            ))
+        
+        assert metadata["complete"] is complete
+        assert ("high_water_marks" in read_snapshot_header(str(output))["metadata"]) is complete
+    
+    @pytest.mark.parametrize("events_per_session,expected", [(0, 600), (2, 240)])
+    def test_paginated_capture_batches_sessions(self, tmp_path, events_per_session, expected):
+        """Test events for many sessions come from a few paged in_ queries, not one per session."""
+        pytest.importorskip("supabase")
+        from supabase_standin import SupabaseStandIn
+        from snapshot_capture import SnapshotCapture
+        
+        sessions = [
+            {"id": f"s{i:03d}", "claude_session_id": f"claude-{i}", "project_path": "/work", "start_time": "2025-08-01T10:00:00Z"}
+            for i in range(120)
+        ]
+        events = [
+            {"id": f"e{i:04d}", "session_id": f"s{i % 120:03d}", "event_type": "tool_use",
+             "timestamp": "2025-08-01T10:00:00Z", "data": {}}
+            for i in range(600)
+        ]
+        with SupabaseStandIn() as standin:
+            standin.store.insert("sessions", sessions)
+            standin.store.insert("events", events)
+            capture = SnapshotCapture(standin.url, standin.key)
+            output = tmp_path / "capture.ndjson"
+            metadata = asyncio.run(capture.capture_to_file(
+                str(output), hours=24 * 365 * 10, max_sessions=200,
+                events_per_session=events_per_session, page_size=64, concurrency=4,
+            ))
+            requests = standin.request_counts()["GET"]
+        
+        assert metadata["events_captured"] == expected
+        assert len({event["id"] for _, event in iter_snapshot_records(str(output)) if "event_type" in event}) == expected
+        # One sessions query plus a few pages per batch of 50 sessions
+        assert requests < 20
+    
+    def test_capped_sessions_drop_out_of_later_pages(self, tmp_path):
+        """Test a short session doesn't force paging through the rest, and each keeps its earliest events."""
+        pytest.importorskip("supabase")
+        from supabase_standin import SupabaseStandIn
+        from snapshot_capture import SnapshotCapture
+        
+        # Ids run against time order, so an id-ordered capture would keep the latest events
+        events = [
+            {"id": f"e{999 - i:03d}", "session_id": "long" if i else "short", "event_type": "tool_use",
+             "timestamp": f"2025-08-01T10:{i // 60:02d}:{i % 60:02d}Z", "data": {}}
+            for i in range(500)
+        ]
+        with SupabaseStandIn() as standin:
+            standin.store.insert("events", events)
+            capture = SnapshotCapture(standin.url, standin.key)
+            captured = []
+            count = asyncio.run(capture.stream_events_for_sessions(
+                ["short", "long"], captured.append, events_per_session=3, page_size=2,
+            ))
+            requests = standin.request_counts()["GET"]
+        
+        assert count == 4
+        assert [e["id"] for e in captured if e["session_id"] == "long"] == ["e998", "e997", "e996"]
+        assert requests <= 3
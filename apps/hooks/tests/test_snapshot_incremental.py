@@ -0,0 +1,201 @@
+"""
+Tests for incremental snapshots.
+
+Tests cover:
+- High-water marks recorded by SnapshotWriter
+- Capturing the hooks' SQLite store through the online backup API, fully and incrementally
+- Merging incremental snapshots into a base snapshot
+- Keyset-paginated incremental capture from a Supabase stand-in, when supabase-py is installed
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the snapshot and performance scripts directories to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "snapshot"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "scripts" / "performance"))
+
+from snapshot_capture import SQLiteSnapshotCapture
+from snapshot_format import SnapshotWriter, iter_snapshot_records, load_snapshot, read_snapshot_header
+from snapshot_merge import merge_snapshots
+from src.lib.database import DatabaseManager
+
+
+def event(i, session_id="s1", second=None):
+    return {
+        "id": f"e{i:03d}",
+        "session_id": session_id,
+        "event_type": "tool_use",
+        "timestamp": f"2025-08-01T10:00:{i if second is None else second:02d}Z",
+        "data": {"tool_input": {"command": f"echo {i}"}},
+    }
+
+
+@pytest.fixture
+def hooks_db(tmp_path):
+    """SQLite store with the hooks' schema, two sessions and ten events."""
+    path = tmp_path / "chronicle.db"
+    DatabaseManager({"sqlite_path": str(path)})
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO sessions (id, claude_session_id, start_time, project_path, metadata) VALUES (?, ?, ?, ?, ?)",
+            [("s1", "claude-1", "2025-08-01T10:00:00Z", "/home/alice/work/app", '{"source": "startup"}'),
+             ("s2", "claude-2", "2025-08-01T10:00:30Z", "/work/api", "{}")],
+        )
+        insert_events(conn, [event(i, "s1" if i % 2 else "s2") for i in range(10)])
+    return path
+
+
+def insert_events(conn, events):
+    conn.executemany(
+        "INSERT INTO events (id, session_id, event_type, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+        [(e["id"], e["session_id"], e["event_type"], e["timestamp"], json.dumps(e["data"])) for e in events],
+    )
+
+
+def event_ids(path):
+    return [record["id"] for section, record in iter_snapshot_records(str(path)) if section == "events"]
+
+
+class TestHighWaterMarks:
+    """Test the marks SnapshotWriter records."""
+    
+    def test_latest_timestamp_then_id(self, tmp_path):
+        """Test ties on timestamp are broken by id and existing marks are kept when newer."""
+        path = tmp_path / "snapshot.ndjson"
+        existing = {"sessions": {"timestamp": "2025-08-02T00:00:00Z", "id": "s9"}}
+        with SnapshotWriter(str(path), {"high_water_marks": existing}, track_high_water_marks=True) as writer:
+            writer.write_session({"id": "s1", "start_time": "2025-08-01T10:00:00Z"})
+            for record in [event(5, second=7), event(3, second=7), event(1, second=2), {"id": "e999"}]:
+                writer.write_event(record)
+        
+        marks = read_snapshot_header(str(path))["metadata"]["high_water_marks"]
+        assert marks == {
+            "sessions": {"timestamp": "2025-08-02T00:00:00Z", "id": "s9"},
+            "events": {"timestamp": "2025-08-01T10:00:07Z", "id": "e005"},
+        }
+
+
+class TestSQLiteCapture:
+    """Test capture from the hooks' local SQLite store."""
+    
+    def test_full_capture(self, hooks_db, tmp_path):
+        """Test every row is captured in order with JSON columns parsed and paths anonymized."""
+        output = tmp_path / "full.ndjson.gz"
+        metadata = SQLiteSnapshotCapture(str(hooks_db), pages_per_step=1).capture_to_file(str(output))
+        
+        snapshot = load_snapshot(str(output))
+        assert metadata["sessions_captured"] == 2
+        assert event_ids(output) == [f"e{i:03d}" for i in range(10)]
+        assert snapshot["events"][0]["data"] == {"tool_input": {"command": "echo 0"}}
+        assert snapshot["sessions"][0]["metadata"] == {"source": "startup"}
+        assert snapshot["sessions"][0]["project_path"] == "[ANONYMIZED]/work/app"
+        assert snapshot["metadata"]["high_water_marks"]["events"] == {"timestamp": "2025-08-01T10:00:09Z", "id": "e009"}
+    
+    def test_incremental_capture(self, hooks_db, tmp_path):
+        """Test only rows after the marks are captured, including a tie on the marked timestamp."""
+        base = tmp_path / "base.ndjson"
+        since = SQLiteSnapshotCapture(str(hooks_db)).capture_to_file(str(base))["high_water_marks"]
+        with sqlite3.connect(hooks_db) as conn:
+            insert_events(conn, [event(10, second=9), event(11), event(12)])
+        
+        increment = tmp_path / "increment.ndjson"
+        metadata = SQLiteSnapshotCapture(str(hooks_db)).capture_to_file(str(increment), since)
+        
+        assert event_ids(increment) == ["e010", "e011", "e012"]
+        assert metadata["incremental"] is True
+        assert metadata["sessions_captured"] == 0
+        assert metadata["base_high_water_marks"] == since
+        # No new sessions: the session mark carries over
+        assert metadata["high_water_marks"]["sessions"] == since["sessions"]
+        assert metadata["high_water_marks"]["events"]["id"] == "e012"
+    
+    def test_capture_does_not_block_writer(self, hooks_db, tmp_path):
+        """Test capture completes while a hook holds an open write transaction."""
+        writer = sqlite3.connect(hooks_db, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        insert_events(writer, [event(50)])
+        
+        output = tmp_path / "during_write.ndjson"
+        SQLiteSnapshotCapture(str(hooks_db)).capture_to_file(str(output))
+        writer.execute("COMMIT")
+        writer.close()
+        
+        assert "e050" not in event_ids(output)
+
+
+class TestMerge:
+    """Test folding increments into a base snapshot."""
+    
+    def test_merge_base_and_increments(self, hooks_db, tmp_path):
+        """Test the merge holds every record once, later copies winning, with the latest marks."""
+        capture = SQLiteSnapshotCapture(str(hooks_db))
+        base = tmp_path / "base.ndjson.gz"
+        marks = capture.capture_to_file(str(base))["high_water_marks"]
+        
+        increments = []
+        for n in range(2):
+            with sqlite3.connect(hooks_db) as conn:
+                insert_events(conn, [event(20 + 2 * n + k, second=20 + 2 * n + k) for k in range(2)])
+            increment = tmp_path / f"increment{n}.ndjson"
+            marks = capture.capture_to_file(str(increment), marks)["high_water_marks"]
+            increments.append(str(increment))
+        # A record captured again in a later snapshot replaces the earlier copy
+        with SnapshotWriter(increments[-1] + ".fix.ndjson", {"high_water_marks": marks}) as writer:
+            writer.write_event(dict(event(3), event_type="error"))
+        increments.append(increments[-1] + ".fix.ndjson")
+        
+        output = tmp_path / "merged.ndjson"
+        summary = merge_snapshots(str(base), increments, str(output))
+        
+        merged = load_snapshot(str(output))
+        assert event_ids(output) == [f"e{i:03d}" for i in list(range(10)) + [20, 21, 22, 23]]
+        assert summary["replaced"] == 1
+        assert next(e for e in merged["events"] if e["id"] == "e003")["event_type"] == "error"
+        assert merged["metadata"]["high_water_marks"] == marks
+        assert merged["metadata"]["incremental"] is False
+        assert merged["metadata"]["events_captured"] == 14
+    
+    def test_warns_on_missing_increment(self, hooks_db, tmp_path, caplog):
+        """Test an increment starting after the merged marks is reported."""
+        base = tmp_path / "base.ndjson"
+        SQLiteSnapshotCapture(str(hooks_db)).capture_to_file(str(base))
+        later = {"events": {"timestamp": "2025-09-01T00:00:00Z", "id": "e900"}}
+        increment = tmp_path / "increment.ndjson"
+        with SnapshotWriter(str(increment), {"base_high_water_marks": later, "high_water_marks": later}):
+            pass
+        
+        with caplog.at_level(logging.WARNING):
+            merge_snapshots(str(base), [str(increment)], str(tmp_path / "merged.ndjson"))
+        assert "an increment may be missing" in caplog.text
+
+
+class TestSupabaseIncrementalCapture:
+    """Test keyset-paginated incremental capture from Supabase."""
+    
+    def test_pages_through_timestamp_ties(self, tmp_path):
+        """Test rows sharing a timestamp across page boundaries are neither skipped nor repeated."""
+        pytest.importorskip("supabase")
+        from supabase_standin import SupabaseStandIn
+        from snapshot_capture import SnapshotCapture
+        
+        since = {
+            "sessions": {"timestamp": "2025-08-01T10:00:00Z", "id": "s1"},
+            "events": {"timestamp": "2025-08-01T10:00:01Z", "id": "e002"},
+        }
+        with SupabaseStandIn() as standin:
+            standin.store.insert("sessions", [{"id": "s1", "start_time": "2025-08-01T10:00:00Z", "project_path": "/work"}])
+            standin.store.insert("events", [event(i, second=i // 4) for i in range(20)])
+            capture = SnapshotCapture(standin.url, standin.key)
+            output = tmp_path / "increment.ndjson"
+            metadata = asyncio.run(capture.capture_incremental_to_file(str(output), since, page_size=3))
+        
+        assert event_ids(output) == [f"e{i:03d}" for i in range(3, 20)]
+        assert metadata["sessions_captured"] == 0
+        assert metadata["high_water_marks"]["events"] == {"timestamp": "2025-08-01T10:00:04Z", "id": "e019"}
@@ -0,0 +1,180 @@
+"""
+Tests for the local Supabase/PostgREST stand-in used by the benchmarks.
+
+Tests cover:
+- Select with filters, or/and groups, column lists, ordering, paging and exact counts
+- Insert, upsert on a conflict column, update and delete
+- Injected latency, errors and rate limiting
+- The hooks' DatabaseManager writing through supabase-py, when installed
+"""
+
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Add the performance scripts directory to the Python path for importing the stand-in
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "scripts" / "performance"))
+
+from supabase_standin import SupabaseStandIn
+
+
+def request(standin, method, path, body=None, prefer=None):
+    """Send a PostgREST request; return (status, parsed body, headers)."""
+    headers = {"Content-Type": "application/json"}
+    if prefer:
+        headers["Prefer"] = prefer
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(f"{standin.url}/rest/v1/{path}", data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as response:
+            raw = response.read()
+            return response.status, json.loads(raw) if raw else None, response.headers
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null"), e.headers
+
+
+@pytest.fixture
+def standin():
+    with SupabaseStandIn(seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def events(standin):
+    rows = [
+        {"id": f"e{i}", "session_id": "s1" if i < 3 else "s2", "event_type": "pre_tool_use", "seq": i}
+        for i in range(5)
+    ]
+    status, _, _ = request(standin, "POST", "chronicle_events", rows)
+    assert status == 201
+    return rows
+
+
+class TestReads:
+    """Test select queries."""
+    
+    def test_filter_and_columns(self, standin, events):
+        """Test eq filters and column projection."""
+        status, rows, _ = request(standin, "GET", "chronicle_events?select=id&session_id=eq.s1&order=seq.desc")
+        assert status == 200
+        assert rows == [{"id": "e2"}, {"id": "e1"}, {"id": "e0"}]
+    
+    def test_operators(self, standin, events):
+        """Test range, in and negated filters on typed values."""
+        _, rows, _ = request(standin, "GET", "chronicle_events?select=id&seq=gte.3")
+        assert [row["id"] for row in rows] == ["e3", "e4"]
+        _, rows, _ = request(standin, "GET", "chronicle_events?select=id&id=in.(e0,e4)")
+        assert [row["id"] for row in rows] == ["e0", "e4"]
+        _, rows, _ = request(standin, "GET", "chronicle_events?select=id&session_id=neq.s1&seq=not.eq.4")
+        assert rows == [{"id": "e3"}]
+    
+    def test_exact_count_with_paging(self, standin, events):
+        """Test count=exact reports the total in Content-Range."""
+        _, rows, headers = request(
+            standin, "GET", "chronicle_events?select=id&order=seq&limit=2&offset=1", prefer="count=exact"
+        )
+        assert [row["id"] for row in rows] == ["e1", "e2"]
+        assert headers["Content-Range"] == "1-2/5"
+    
+    def test_or_and_groups(self, standin, events):
+        """Test keyset-style or filters with nested, negated and quoted groups."""
+        _, rows, _ = request(standin, "GET", 'chronicle_events?select=id&or=(seq.gt.3,and(seq.eq.3,id.gt."e2"))')
+        assert [row["id"] for row in rows] == ["e3", "e4"]
+        _, rows, _ = request(standin, "GET", "chronicle_events?select=id&not.or=(seq.lt.1,seq.gt.3)")
+        assert [row["id"] for row in rows] == ["e1", "e2", "e3"]
+
+
+class TestWrites:
+    """Test insert, upsert, update and delete."""
+    
+    def test_upsert_merges_on_conflict_column(self, standin):
+        """Test merge-duplicates keeps one row per conflict key."""
+        prefer = "return=representation,resolution=merge-duplicates"
+        request(standin, "POST", "chronicle_sessions?on_conflict=claude_session_id",
+                {"id": "a", "claude_session_id": "c1", "project_path": "/one"}, prefer)
+        status, rows, _ = request(standin, "POST", "chronicle_sessions?on_conflict=claude_session_id",
+                                  {"id": "a", "claude_session_id": "c1", "git_branch": "main"}, prefer)
+        
+        assert status == 201
+        assert rows == [{"id": "a", "claude_session_id": "c1", "project_path": "/one", "git_branch": "main"}]
+        _, rows, _ = request(standin, "GET", "chronicle_sessions?select=*")
+        assert len(rows) == 1
+    
+    def test_upsert_ignores_duplicates(self, standin, events):
+        """Test ignore-duplicates skips rows whose key already exists."""
+        prefer = "return=representation,resolution=ignore-duplicates"
+        _, rows, _ = request(standin, "POST", "chronicle_events?on_conflict=id",
+                             [{"id": "e0", "seq": 99}, {"id": "e9", "seq": 9}], prefer)
+        
+        assert rows == [{"id": "e9", "seq": 9}]
+        _, rows, _ = request(standin, "GET", "chronicle_events?select=seq&id=eq.e0")
+        assert rows == [{"seq": 0}]
+    
+    def test_update_and_delete(self, standin, events):
+        """Test PATCH and DELETE apply to filtered rows only."""
+        _, rows, _ = request(standin, "PATCH", "chronicle_events?session_id=eq.s2",
+                             {"event_type": "stop"}, "return=representation")
+        assert {row["id"] for row in rows} == {"e3", "e4"}
+        
+        request(standin, "DELETE", "chronicle_events?event_type=eq.stop")
+        _, rows, headers = request(standin, "GET", "chronicle_events?select=id", prefer="count=exact")
+        assert headers["Content-Range"] == "0-2/3"
+    
+    def test_generates_ids(self, standin):
+        """Test rows without an id get one, as with a uuid default."""
+        _, rows, _ = request(standin, "POST", "chronicle_events", {"event_type": "stop"}, "return=representation")
+        assert len(rows[0]["id"]) == 36
+
+
+class TestFaults:
+    """Test injected network conditions."""
+    
+    def test_latency(self, standin):
+        """Test every request waits at least the configured latency."""
+        standin.configure(latency_ms=50)
+        start = time.perf_counter()
+        request(standin, "GET", "chronicle_events?select=id")
+        assert time.perf_counter() - start >= 0.05
+    
+    def test_error_rate(self, standin):
+        """Test error_rate=1 fails every request with 503."""
+        standin.configure(error_rate=1.0)
+        status, body, _ = request(standin, "GET", "chronicle_events?select=id")
+        assert status == 503
+        assert body["code"] == "PGRST503"
+        assert standin.stats()["injected_errors"] == {"GET": 1}
+    
+    def test_rate_limit(self, standin):
+        """Test requests beyond the burst get 429 with Retry-After."""
+        standin.configure(rate_limit=1.0, burst=2)
+        standin.faults._tokens = 2
+        statuses = [request(standin, "GET", "chronicle_events?select=id")[0] for _ in range(3)]
+        
+        assert statuses == [200, 200, 429]
+        assert standin.stats()["rate_limited"] == {"GET": 1}
+
+
+class TestDatabaseManager:
+    """Test the hooks' storage layer against the stand-in."""
+    
+    def test_session_and_event_round_trip(self, standin, tmp_path):
+        """Test sessions and events saved through supabase-py land in the stand-in."""
+        pytest.importorskip("supabase")
+        from src.lib.database import DatabaseManager
+        
+        manager = DatabaseManager({
+            "supabase_url": standin.url,
+            "supabase_key": standin.key,
+            "sqlite_path": str(tmp_path / "chronicle.db"),
+        })
+        success, session_id = manager.save_session({"claude_session_id": "standin-session"})
+        assert success
+        assert manager.save_event({"session_id": session_id, "event_type": "stop", "data": {}})
+        
+        _, rows, _ = request(standin, "GET", f"chronicle_events?select=event_type&session_id=eq.{session_id}")
+        assert rows == [{"event_type": "stop"}]
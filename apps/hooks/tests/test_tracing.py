@@ -0,0 +1,139 @@
+"""
+Tests for span tracing of hook phases.
+
+Tests cover:
+- Nested spans and parent links
+- Chrome trace-event and OTLP/JSON export
+- Rolling trace files
+- No-op spans when tracing is disabled
+- Payload sizes on hook spans
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.lib import tracing
+from src.lib.tracing import Tracer, trace_span, CHROME_TRACE_FILE, OTLP_TRACE_FILE
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    """Enabled global tracer writing into a temporary directory."""
+    tracer = Tracer(trace_dir=str(tmp_path))
+    monkeypatch.setenv("CHRONICLE_TRACE", "1")
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    yield tracer
+    tracer.finished.clear()
+
+
+def read_chrome_events(path):
+    """Parse a Chrome trace file written without its closing bracket."""
+    text = path.read_text().rstrip().rstrip(",")
+    return json.loads(text + "]")
+
+
+class TestSpans:
+    """Test span nesting and attributes."""
+    
+    def test_nested_spans_link_to_parent(self, tracer):
+        """Test that inner spans record the enclosing span as parent."""
+        with trace_span("pre_tool_use", tool_name="Bash") as root:
+            with trace_span("sqlite_write", backend="sqlite") as child:
+                child.set_attribute("payload_bytes", 512)
+        
+        assert [span.name for span in tracer.finished] == ["sqlite_write", "pre_tool_use"]
+        assert child.parent_span_id == root.span_id
+        assert root.parent_span_id is None
+        assert child.attributes == {"backend": "sqlite", "payload_bytes": 512}
+        assert root.duration_ns >= child.duration_ns
+    
+    def test_exception_marks_span_as_error(self, tracer):
+        """Test that a failing phase is recorded with error status."""
+        with pytest.raises(ValueError):
+            with trace_span("stdin_parse"):
+                raise ValueError("bad json")
+        
+        span = tracer.finished[0]
+        assert span.status_code == tracing.STATUS_CODE_ERROR
+        assert "bad json" in span.status_message
+    
+    def test_disabled_tracing_is_noop(self, monkeypatch):
+        """Test that disabled spans record nothing."""
+        monkeypatch.delenv("CHRONICLE_TRACE", raising=False)
+        monkeypatch.setattr(tracing, "_tracer", None)
+        
+        with trace_span("sanitize") as span:
+            span.set_attribute("ignored", True)
+        
+        assert tracing._tracer is None
+
+
+class TestExport:
+    """Test trace file formats and rollover."""
+    
+    def test_flush_writes_chrome_and_otlp(self, tracer, tmp_path):
+        """Test that both files describe the same spans."""
+        with trace_span("session_start"):
+            with trace_span("session_resolve", success=True):
+                pass
+        
+        assert tracer.flush() == 2
+        
+        events = read_chrome_events(tmp_path / CHROME_TRACE_FILE)
+        assert [(e["name"], e["ph"]) for e in events] == [("session_resolve", "X"), ("session_start", "X")]
+        assert events[0]["args"] == {"success": True}
+        
+        request = json.loads((tmp_path / OTLP_TRACE_FILE).read_text().splitlines()[0])
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        child, root = spans
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["traceId"] == root["traceId"] == tracer.trace_id
+        assert child["attributes"] == [{"key": "success", "value": {"boolValue": True}}]
+        assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+    
+    def test_processes_append_to_one_chrome_file(self, tmp_path):
+        """Test that a second writer appends events rather than a second header."""
+        for _ in range(2):
+            tracer = Tracer(trace_dir=str(tmp_path), formats=["chrome"])
+            with tracer.span("stop"):
+                pass
+            tracer.flush()
+        
+        assert len(read_chrome_events(tmp_path / CHROME_TRACE_FILE)) == 2
+        assert not (tmp_path / OTLP_TRACE_FILE).exists()
+    
+    def test_trace_file_rolls_over(self, tmp_path):
+        """Test that files past max_bytes are rotated with bounded backups."""
+        for _ in range(6):
+            tracer = Tracer(trace_dir=str(tmp_path), formats=["otlp"], max_bytes=2000, backups=2)
+            with tracer.span("notification", padding="x" * 400):
+                pass
+            tracer.flush()
+        
+        names = sorted(path.name for path in tmp_path.iterdir())
+        assert names == [OTLP_TRACE_FILE, f"{OTLP_TRACE_FILE}.1", f"{OTLP_TRACE_FILE}.2"]
+        assert all(path.stat().st_size <= 2000 for path in tmp_path.iterdir())
+
+
+class TestHookSpans:
+    """Test the spans a real hook process records."""
+    
+    def test_stdin_parse_records_payload_bytes(self, tmp_path):
+        """Test that the stdin payload size lands on the stdin_parse span."""
+        payload = json.dumps({"session_id": "trace-test", "hook_event_name": "Notification", "message": "hi"})
+        env = dict(
+            os.environ, CHRONICLE_TRACE="1", CHRONICLE_TRACE_DIR=str(tmp_path), CHRONICLE_TRACE_FORMAT="chrome",
+            CLAUDE_HOOKS_DB_PATH=str(tmp_path / "chronicle.db"), SUPABASE_URL="", SUPABASE_ANON_KEY="",
+        )
+        hook = Path(__file__).parent.parent / "src" / "hooks" / "notification.py"
+        subprocess.run([sys.executable, str(hook)], input=payload.encode(), env=env, cwd=str(tmp_path),
+                       capture_output=True, timeout=60, check=True)
+        
+        spans = {event["name"]: event["args"] for event in read_chrome_events(tmp_path / CHROME_TRACE_FILE)}
+        assert spans["stdin_parse"]["payload_bytes"] == len(payload)
+        assert spans["sqlite_write"]["payload_bytes"] > 0
@@ -1009,6 +1009,61 @@ class TestToolResponseParsing:
         assert result["result_size"] == 0
 
 
+
+class TestPayloadSizeEstimation:
+    """Test size estimation without serialization."""
+    
+    def test_matches_json_dumps(self):
+        """Test that estimates equal the json.dumps(default=str) length."""
+        from utils import estimate_payload_size
+        
+        payloads = [
+            TOOL_RESPONSE_SUCCESS,
+            {"text": "caf\u00e9 \"quoted\"\n\ttab", "n": [1, -2.5, None, True, False], "empty": {}},
+            {1: "int key", None: "null key", True: []},
+            [("tuple", 1), datetime(2026, 1, 1)],
+        ]
+        for payload in payloads:
+            assert estimate_payload_size(payload) == len(json.dumps(payload, default=str))
+    
+    def test_strings_are_measured_as_utf8(self):
+        """Test raw strings report their encoded length."""
+        from utils import estimate_payload_size
+        
+        assert estimate_payload_size("plain") == 5
+        assert estimate_payload_size("caf\u00e9") == 5
+    
+    def test_stops_at_limit(self):
+        """Test early abort returns a total above the limit."""
+        from utils import estimate_payload_size
+        
+        payload = {"chunks": ["x" * 1000 for _ in range(1000)]}
+        size = estimate_payload_size(payload, limit=5000)
+        
+        assert 5000 < size < 10000
+        # A later unlimited call measures the whole payload
+        assert estimate_payload_size(payload) == len(json.dumps(payload))
+    
+    def test_nested_mutation_is_measured(self):
+        """Test that a payload grown in place is measured again, not reported at its old size."""
+        from utils import estimate_payload_size
+        
+        payload = {"tool_input": {"content": ""}}
+        estimate_payload_size(payload)
+        payload["tool_input"]["content"] = "z" * 10000
+        
+        assert estimate_payload_size(payload, limit=5000) > 5000
+        assert estimate_payload_size(payload) == len(json.dumps(payload))
+    
+    def test_circular_reference(self):
+        """Test that cycles raise ValueError like json.dumps."""
+        from utils import estimate_payload_size
+        
+        payload = {"items": []}
+        payload["items"].append(payload)
+        with pytest.raises(ValueError):
+            estimate_payload_size(payload)
+
 if __name__ == "__main__":
     # Run tests
     import pytest
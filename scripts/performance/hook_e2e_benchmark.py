@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Chronicle End-to-End Hook Benchmark
+Spawns the real hook scripts in apps/hooks/src/hooks with recorded payloads,
+the way Claude Code does, and measures wall-clock latency per hook and per
+payload-size class. Each hook writes to a temporary SQLite store and,
+optionally, to a local Supabase stand-in.
+
+Cold runs start every invocation with a fresh database and an empty
+bytecode cache; warm runs share both after one untimed priming call.
+Results are written as JSON and can be compared against an earlier run
+with a regression threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HOOKS_DIR = os.path.join(HERE, '..', '..', 'apps', 'hooks', 'src', 'hooks')
+DEFAULT_CORPUS = os.path.join(HERE, 'corpus', 'hook_payloads.jsonl')
+
+sys.path.append(HERE)
+from supabase_standin import SupabaseStandIn, add_fault_arguments, fault_settings
+
+HOOK_SCRIPTS = {
+    "SessionStart": "session_start.py",
+    "UserPromptSubmit": "user_prompt_submit.py",
+    "PreToolUse": "pre_tool_use.py",
+    "PostToolUse": "post_tool_use.py",
+    "Notification": "notification.py",
+    "Stop": "stop.py",
+    "SubagentStop": "subagent_stop.py",
+    "PreCompact": "pre_compact.py",
+}
+
+# Upper bounds in bytes of the encoded payload
+SIZE_CLASSES = (("small", 4 * 1024), ("medium", 64 * 1024), ("large", 1024 * 1024), ("xlarge", float("inf")))
+
+# Extra payload sizes generated from the corpus for hooks that carry bulk content
+SCALED_SIZES = (48 * 1024, 900 * 1024, 4 * 1024 * 1024)
+SCALED_HOOKS = ("PostToolUse", "UserPromptSubmit")
+
+
+def size_class(size_bytes):
+    """Name of the size class a payload of size_bytes falls in."""
+    for name, upper in SIZE_CLASSES:
+        if size_bytes < upper:
+            return name
+    return SIZE_CLASSES[-1][0]
+
+
+def load_corpus(path):
+    """Read recorded hook payloads, one JSON object per line."""
+    payloads = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            payload = json.loads(line)
+            if payload.get("hook_event_name") not in HOOK_SCRIPTS:
+                print(f"Warning: skipping line {line_number}: unknown hook_event_name")
+                continue
+            payloads.append(payload)
+    return payloads
+
+
+def _largest_string_path(value, path=()):
+    """Path to the longest string inside a JSON value, with its length."""
+    if isinstance(value, str):
+        return path, len(value)
+    best = ((), -1)
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, child in items:
+        candidate = _largest_string_path(child, path + (key,))
+        if candidate[1] > best[1]:
+            best = candidate
+    return best
+
+
+def scale_payload(payload, target_bytes):
+    """Copy of payload grown to about target_bytes by repeating its longest string."""
+    scaled = json.loads(json.dumps(payload))
+    path, length = _largest_string_path(scaled)
+    if not path or length <= 0:
+        return scaled
+    
+    parent = scaled
+    for key in path[:-1]:
+        parent = parent[key]
+    seed = parent[path[-1]]
+    missing = max(0, target_bytes - len(json.dumps(scaled).encode("utf-8")))
+    parent[path[-1]] = seed * (1 + missing // max(1, len(seed.encode("utf-8"))))
+    return scaled
+
+
+def expand_corpus(payloads):
+    """Add scaled copies of the first bulk-carrying payload of each hook."""
+    expanded = list(payloads)
+    seen = set()
+    for payload in payloads:
+        hook = payload["hook_event_name"]
+        if hook in SCALED_HOOKS and hook not in seen:
+            seen.add(hook)
+            expanded.extend(scale_payload(payload, size) for size in SCALED_SIZES)
+    return expanded
+
+
+def hook_environment(workdir, standin=None, pycache_prefix=None):
+    """Environment for a hook process confined to workdir."""
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("SUPABASE_", "CHRONICLE_", "CLAUDE_HOOKS_"))
+    }
+    env.update({
+        # HOME keeps ~/.claude/hooks/chronicle/.env from redirecting writes
+        "HOME": workdir,
+        "CLAUDE_HOOKS_DB_PATH": os.path.join(workdir, "chronicle.db"),
+        "CHRONICLE_PERF_DB": os.path.join(workdir, "perf.db"),
+        "CLAUDE_PROJECT_DIR": workdir,
+    })
+    if standin is not None:
+        env["SUPABASE_URL"] = standin.url
+        env["SUPABASE_ANON_KEY"] = standin.key
+    if pycache_prefix is not None:
+        # Bytecode must be writable or the prefix never warms up
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = pycache_prefix
+    return env
+
+
+def spawn_hook(python, hook, payload_bytes, env, cwd, timeout=30.0, stderr=subprocess.DEVNULL):
+    """Run one hook script with payload_bytes on stdin; return (CompletedProcess, wall_ms)."""
+    script = os.path.join(HOOKS_DIR, HOOK_SCRIPTS[hook])
+    start = time.perf_counter()
+    completed = subprocess.run(
+        python + [script], input=payload_bytes, env=env, cwd=cwd,
+        stdout=subprocess.PIPE, stderr=stderr, timeout=timeout,
+    )
+    return completed, (time.perf_counter() - start) * 1000
+
+
+def run_hook(python, hook, payload_bytes, env, cwd, timeout=30.0):
+    """
+    Invoke one hook script with payload_bytes on stdin.
+    
+    Returns:
+        (wall_ms, exit_code, in_process_ms) where in_process_ms is the
+        hook's own execution_time_ms when it reports one, else None
+    """
+    completed, wall_ms = spawn_hook(python, hook, payload_bytes, env, cwd, timeout)
+    
+    in_process_ms = None
+    try:
+        in_process_ms = json.loads(completed.stdout).get("execution_time_ms")
+    except (ValueError, AttributeError):
+        pass
+    return wall_ms, completed.returncode, in_process_ms
+
+
+def summarize(samples):
+    """Count and percentiles of a list of millisecond timings."""
+    ordered = sorted(samples)
+    if len(ordered) >= 2:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "max_ms": ordered[-1],
+    }
+
+
+def run_mode(python, payloads, iterations, mode, standin):
+    """Time every payload iterations times in cold or warm mode."""
+    samples = {}
+    errors = {}
+    encoded = [(p["hook_event_name"], json.dumps(p).encode("utf-8")) for p in payloads]
+    
+    with tempfile.TemporaryDirectory(prefix="chronicle-bench-") as root:
+        if mode == "warm":
+            workdir = os.path.join(root, "warm")
+            os.makedirs(workdir)
+            env = hook_environment(workdir, standin, os.path.join(root, "pycache"))
+            for hook in {hook for hook, _ in encoded}:
+                run_hook(python, hook, next(data for h, data in encoded if h == hook), env, workdir)
+        
+        for iteration in range(iterations):
+            for index, (hook, data) in enumerate(encoded):
+                if mode == "cold":
+                    workdir = os.path.join(root, f"cold-{iteration}-{index}")
+                    os.makedirs(workdir)
+                    env = hook_environment(workdir, standin, os.path.join(workdir, "pycache"))
+                
+                wall_ms, exit_code, in_process_ms = run_hook(python, hook, data, env, workdir)
+                key = (hook, size_class(len(data)))
+                samples.setdefault(key, {"wall": [], "in_process": []})
+                samples[key]["wall"].append(wall_ms)
+                if in_process_ms is not None:
+                    samples[key]["in_process"].append(in_process_ms)
+                if exit_code != 0:
+                    errors[key] = errors.get(key, 0) + 1
+                
+                if mode == "cold":
+                    shutil.rmtree(workdir, ignore_errors=True)
+    
+    results = {}
+    for (hook, size), timings in sorted(samples.items()):
+        summary = summarize(timings["wall"])
+        summary["errors"] = errors.get((hook, size), 0)
+        if timings["in_process"]:
+            summary["in_process_p95_ms"] = summarize(timings["in_process"])["p95_ms"]
+        results.setdefault(hook, {})[size] = summary
+    return results
+
+
+def supabase_importable(python):
+    """Whether the hook interpreter can import the supabase client."""
+    check = subprocess.run(python + ["-c", "import supabase"], capture_output=True)
+    return check.returncode == 0
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(python, payloads, iterations, modes, backends, faults=None):
+    """Run every backend and mode; return the full results document."""
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "payloads": len(payloads),
+        "results": {},
+    }
+    for backend in backends:
+        for mode in modes:
+            print(f"Running {backend}/{mode} ({len(payloads)} payloads x {iterations})...")
+            if backend == "supabase":
+                with SupabaseStandIn(**(faults or {})) as standin:
+                    hooks = run_mode(python, payloads, iterations, mode, standin)
+                results.setdefault("standin", {"faults": faults or {}})[mode] = standin.stats()
+            else:
+                hooks = run_mode(python, payloads, iterations, mode, None)
+            results["results"].setdefault(backend, {})[mode] = hooks
+    return results
+
+
+def find_regressions(results, baseline, threshold_pct, min_delta_ms):
+    """
+    Rows whose p95 grew by more than threshold_pct over the baseline.
+    
+    Increases under min_delta_ms are ignored as process-startup noise.
+    """
+    regressions = []
+    for backend, modes in results["results"].items():
+        for mode, hooks in modes.items():
+            for hook, sizes in hooks.items():
+                for size, current in sizes.items():
+                    previous = baseline.get("results", {}).get(backend, {}).get(mode, {}).get(hook, {}).get(size)
+                    if not previous:
+                        continue
+                    delta = current["p95_ms"] - previous["p95_ms"]
+                    if delta > min_delta_ms and delta > previous["p95_ms"] * threshold_pct / 100:
+                        regressions.append({
+                            "backend": backend, "mode": mode, "hook": hook, "size": size,
+                            "baseline_p95_ms": previous["p95_ms"], "p95_ms": current["p95_ms"],
+                            "change_pct": delta / previous["p95_ms"] * 100,
+                        })
+    return regressions
+
+
+def print_results(results):
+    """Pretty print percentiles per backend, mode, hook and size class."""
+    for backend, modes in results["results"].items():
+        for mode, hooks in modes.items():
+            print("\n" + "=" * 92)
+            print(f"{backend} / {mode}")
+            print("=" * 92)
+            print(f"{'hook':<18} {'size':<7} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'in-proc p95':>12} {'errors':>7}")
+            print("-" * 92)
+            for hook, sizes in hooks.items():
+                for size, row in sizes.items():
+                    in_process = row.get("in_process_p95_ms")
+                    in_process_text = f"{in_process:>10.2f}ms" if in_process is not None else f"{'-':>12}"
+                    print(
+                        f"{hook:<18} {size:<7} {row['count']:>6} {row['p50_ms']:>7.1f}ms "
+                        f"{row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {in_process_text} {row['errors']:>7}"
+                    )
+
+
+def main():
+    """Run the end-to-end benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the real hook scripts end to end")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file of recorded hook payloads")
+    parser.add_argument("--no-scaled", action="store_true", help="Only run the corpus, without scaled copies")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per payload and mode")
+    parser.add_argument("--modes", default="cold,warm", help="Comma-separated modes: cold, warm")
+    parser.add_argument("--backend", choices=("sqlite", "supabase", "both"), default="sqlite",
+                        help="Write to SQLite only, or also to the local Supabase stand-in")
+    add_fault_arguments(parser)
+    parser.add_argument("--python", default=sys.executable,
+                        help="Interpreter command for the hooks, e.g. 'uv run --script'")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions")
+    parser.add_argument("--threshold-pct", type=float, default=20.0, help="Allowed p95 increase over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore p95 increases smaller than this")
+    args = parser.parse_args()
+    
+    python = args.python.split()
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    if set(modes) - {"cold", "warm"}:
+        parser.error("--modes accepts cold and warm")
+    backends = ["sqlite", "supabase"] if args.backend == "both" else [args.backend]
+    if "supabase" in backends and not supabase_importable(python):
+        print("Warning: supabase client not installed for the hook interpreter; skipping the supabase backend")
+        backends.remove("supabase")
+    if not backends:
+        sys.exit(1)
+    
+    payloads = load_corpus(args.corpus)
+    if not args.no_scaled:
+        payloads = expand_corpus(payloads)
+    
+    results = run_benchmark(python, payloads, args.iterations, modes, backends, fault_settings(args))
+    results["corpus"] = os.path.abspath(args.corpus)
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold_pct, args.min_delta_ms)
+        for row in regressions:
+            print(
+                f"REGRESSION {row['backend']}/{row['mode']} {row['hook']} {row['size']}: "
+                f"p95 {row['baseline_p95_ms']:.1f}ms -> {row['p95_ms']:.1f}ms (+{row['change_pct']:.0f}%)"
+            )
+        if not regressions:
+            print(f"\nNo p95 regressions over {args.threshold_pct:.0f}% against {args.baseline}")
+        # Non-zero exit on regression, for use in CI checks
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
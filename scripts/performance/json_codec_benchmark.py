@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Chronicle JSON Codec Benchmark
+Compares orjson, ujson and the standard library on realistic hook payloads,
+plus the json_codec facade the hooks actually use.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+# Add the hooks app to path so the lib package is importable
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'apps', 'hooks'))
+
+try:
+    from src.lib import json_codec
+except ImportError as e:
+    print(f"Warning: Could not import src.lib.json_codec: {e}")
+    json_codec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def build_payloads():
+    """Hook payloads of the shapes Chronicle sees most often."""
+    session_id = str(uuid.uuid4())
+    source_line = "    result = process(item, options={'retries': 3, 'path': '/srv/app/é'})\n"
+    
+    pre_tool_use = {
+        "session_id": session_id,
+        "transcript_path": f"/home/dev/.claude/projects/app/{session_id}.jsonl",
+        "cwd": "/home/dev/app",
+        "hook_event_name": "PreToolUse",
+        "tool_name": "Edit",
+        "tool_input": {
+            "file_path": "/home/dev/app/src/service.py",
+            "old_string": source_line * 3,
+            "new_string": source_line * 4,
+        },
+    }
+    post_tool_use_read = {
+        "session_id": session_id,
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Read",
+        "tool_input": {"file_path": "/home/dev/app/src/service.py"},
+        "tool_response": {
+            "type": "text",
+            "file": {
+                "filePath": "/home/dev/app/src/service.py",
+                "content": source_line * (1024 * 1024 // len(source_line)),
+                "numLines": 1024 * 1024 // len(source_line),
+            },
+        },
+    }
+    event_row = {
+        "session_id": session_id,
+        "event_type": "post_tool_use",
+        "timestamp": "2026-01-01T12:00:00.000000+00:00",
+        "data": {
+            "tool_name": "Bash",
+            "tool_input": {"command": "pytest -q tests/"},
+            "tool_response": {"stdout": "." * 400 + "\n412 passed in 3.21s", "exit_code": 0},
+            "duration_ms": 3215,
+            "success": True,
+        },
+    }
+    return {"pre_tool_use": pre_tool_use, "post_tool_use_1mb": post_tool_use_read, "event_row": event_row}
+
+
+def build_codecs():
+    """(dumps, loads) pairs for every available backend."""
+    codecs = {"json": (lambda obj: json.dumps(obj).encode("utf-8"), json.loads)}
+    if ujson is not None:
+        codecs["ujson"] = (lambda obj: ujson.dumps(obj, ensure_ascii=False).encode("utf-8"), ujson.loads)
+    if orjson is not None:
+        codecs["orjson"] = (orjson.dumps, orjson.loads)
+    if json_codec is not None:
+        codecs[f"json_codec ({json_codec.BACKEND})"] = (json_codec.dumps_bytes, json_codec.loads)
+    return codecs
+
+
+def time_per_call_us(func, iterations):
+    """Run func iterations times; return mean microseconds per call."""
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def run_benchmark(iterations):
+    """Time dumps and loads of each payload with each codec."""
+    results = {"iterations": iterations, "payloads": {}}
+    
+    for payload_name, payload in build_payloads().items():
+        encoded = json.dumps(payload).encode("utf-8")
+        # The 1 MB payload would take minutes at the full iteration count
+        runs = max(1, iterations // 100) if len(encoded) > 100_000 else iterations
+        timings = {"size_bytes": len(encoded), "iterations": runs, "codecs": {}}
+        
+        for codec_name, (dumps, loads) in build_codecs().items():
+            timings["codecs"][codec_name] = {
+                "dumps_us": time_per_call_us(lambda: dumps(payload), runs),
+                "loads_us": time_per_call_us(lambda: loads(encoded), runs),
+            }
+        results["payloads"][payload_name] = timings
+    
+    return results
+
+
+def print_results(results):
+    """Pretty print timings per payload, with speedup over the stdlib."""
+    print("\n" + "=" * 72)
+    print("JSON codec timings per call")
+    print("=" * 72)
+    for payload_name, timings in results["payloads"].items():
+        print(f"\n{payload_name} ({timings['size_bytes']:,} bytes, {timings['iterations']} iterations)")
+        print(f"{'codec':<24} {'dumps':>12} {'loads':>12} {'vs json':>16}")
+        print("-" * 72)
+        baseline = timings["codecs"]["json"]
+        for codec_name, codec in timings["codecs"].items():
+            speedup = (
+                (baseline["dumps_us"] + baseline["loads_us"])
+                / max(codec["dumps_us"] + codec["loads_us"], 1e-9)
+            )
+            print(
+                f"{codec_name:<24} {codec['dumps_us']:>10.1f}us {codec['loads_us']:>10.1f}us "
+                f"{speedup:>15.1f}x"
+            )
+
+
+def main():
+    """Run the codec benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs on hook payloads")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    if orjson is None:
+        print("Note: orjson not installed; install it to compare the fast path")
+    if ujson is None:
+        print("Note: ujson not installed; skipping it")
+    
+    results = run_benchmark(args.iterations)
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
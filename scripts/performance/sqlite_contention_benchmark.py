@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Chronicle SQLite Contention Benchmark
+Runs N concurrent Claude-session streams, each firing the real hook scripts
+with a realistic tool-call cadence, against one shared chronicle.db, and
+reports how throughput and tail latency scale with N.
+
+Every hook process is traced (CHRONICLE_TRACE, one OTLP trace directory
+per stream), so each SQLite write is timed from its sqlite_write span.
+Busy-wait is estimated per write as its duration above the uncontended
+median measured at the lowest N. "database is locked" errors are counted
+from hook logs and failed spans.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from hook_e2e_benchmark import DEFAULT_CORPUS, git_revision, hook_environment, load_corpus, spawn_hook, summarize
+
+LOCKED_MESSAGE = "database is locked"
+INIT_FAILED_MESSAGE = "Failed to initialize database manager"
+
+
+class SessionStream:
+    """
+    One simulated Claude session firing hooks until a deadline.
+    
+    A turn is a UserPromptSubmit, one to six PreToolUse/PostToolUse pairs
+    separated by think time, then Stop (every fourth turn a SubagentStop).
+    """
+    
+    def __init__(self, index, corpus, python, env, workdir, think_ms, seed):
+        self.index = index
+        self.python = python
+        self.env = env
+        self.workdir = workdir
+        self.think_ms = think_ms
+        self.random = random.Random(seed)
+        self.session_id = f"contention-{seed}-{index:03d}"
+        self.payloads = {}
+        for payload in corpus:
+            self.payloads.setdefault(payload["hook_event_name"], []).append(payload)
+        self.latencies_ms = []
+        self.exit_failures = 0
+        self.locked_messages = 0
+        self.init_failures = 0
+    
+    def _think(self):
+        if self.think_ms > 0:
+            time.sleep(self.random.expovariate(1 / self.think_ms) / 1000)
+    
+    def _fire(self, hook, tool_name=None):
+        candidates = self.payloads.get(hook)
+        if not candidates:
+            return
+        if tool_name is not None:
+            candidates = [p for p in candidates if p.get("tool_name") == tool_name] or candidates
+        payload = dict(self.random.choice(candidates), session_id=self.session_id)
+        
+        completed, wall_ms = spawn_hook(
+            self.python, hook, json.dumps(payload).encode("utf-8"), self.env, self.workdir,
+            timeout=120.0, stderr=subprocess.PIPE,
+        )
+        self.latencies_ms.append(wall_ms)
+        if completed.returncode != 0:
+            self.exit_failures += 1
+        stderr = completed.stderr.decode("utf-8", "replace")
+        self.locked_messages += stderr.count(LOCKED_MESSAGE)
+        self.init_failures += stderr.count(INIT_FAILED_MESSAGE)
+    
+    def run(self, deadline):
+        # Stagger starts so streams do not fire in lockstep
+        self._think()
+        self._fire("SessionStart")
+        turn = 0
+        while time.monotonic() < deadline:
+            self._fire("UserPromptSubmit")
+            for _ in range(self.random.randint(1, 6)):
+                if time.monotonic() >= deadline:
+                    break
+                self._think()
+                tool_payload = self.random.choice(self.payloads.get("PreToolUse") or [{}])
+                self._fire("PreToolUse", tool_payload.get("tool_name"))
+                self._fire("PostToolUse", tool_payload.get("tool_name"))
+            turn += 1
+            self._fire("SubagentStop" if turn % 4 == 0 else "Stop")
+            self._think()
+        return self
+
+
+def read_write_spans(trace_dir):
+    """(duration_ms, error message or None) for every sqlite_write span in a trace directory."""
+    spans = []
+    path = os.path.join(trace_dir, "chronicle-trace.otlp.jsonl")
+    if not os.path.exists(path):
+        return spans
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            for resource in request.get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for span in scope.get("spans", []):
+                        if span.get("name") != "sqlite_write":
+                            continue
+                        duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                        status = span.get("status", {})
+                        spans.append((duration_ms, status.get("message") if status.get("code") == 2 else None))
+    return spans
+
+
+def count_events(db_path):
+    try:
+        with sqlite3.connect(db_path, timeout=60) as conn:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+
+def run_level(python, corpus, streams, duration_s, think_ms, busy_timeout, seed):
+    """Run one concurrency level against a fresh shared database."""
+    with tempfile.TemporaryDirectory(prefix="chronicle-contention-") as root:
+        shared_env = hook_environment(root, pycache_prefix=os.path.join(root, "pycache"))
+        if busy_timeout is not None:
+            shared_env["CLAUDE_HOOKS_DB_TIMEOUT"] = str(busy_timeout)
+        
+        # Create the schema and bytecode up front, as on a machine already running hooks
+        priming = next(p for p in corpus if p["hook_event_name"] == "SessionStart")
+        spawn_hook(python, "SessionStart", json.dumps(priming).encode("utf-8"), shared_env, root)
+        events_before = count_events(shared_env["CLAUDE_HOOKS_DB_PATH"])
+        
+        session_streams = []
+        for index in range(streams):
+            trace_dir = os.path.join(root, "traces", f"stream-{index:03d}")
+            os.makedirs(trace_dir)
+            env = dict(shared_env, CHRONICLE_TRACE="1", CHRONICLE_TRACE_DIR=trace_dir, CHRONICLE_TRACE_FORMAT="otlp")
+            session_streams.append(SessionStream(index, corpus, python, env, root, think_ms, seed + index))
+        
+        start = time.monotonic()
+        deadline = start + duration_s
+        with ThreadPoolExecutor(max_workers=streams) as pool:
+            list(pool.map(lambda stream: stream.run(deadline), session_streams))
+        elapsed = time.monotonic() - start
+        
+        latencies = [ms for stream in session_streams for ms in stream.latencies_ms]
+        write_spans = []
+        for index in range(streams):
+            write_spans.extend(read_write_spans(os.path.join(root, "traces", f"stream-{index:03d}")))
+        events_written = count_events(shared_env["CLAUDE_HOOKS_DB_PATH"]) - events_before
+    
+    locked_spans = sum(1 for _, error in write_spans if error and LOCKED_MESSAGE in error)
+    init_failures = sum(stream.init_failures for stream in session_streams)
+    return {
+        "streams": streams,
+        "elapsed_s": elapsed,
+        "invocations": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "events_written": events_written,
+        "events_per_s": events_written / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies) if latencies else None,
+        "write_ms": [duration for duration, _ in write_spans],
+        "locked_errors": max(locked_spans, sum(stream.locked_messages for stream in session_streams)),
+        "exit_failures": sum(stream.exit_failures for stream in session_streams),
+        "init_failures": init_failures,
+        # Hooks exit 0 even when they cannot open the store, so an empty table is the real signal
+        "failed": events_written == 0 or init_failures > 0,
+    }
+
+
+def add_busy_wait(levels):
+    """Replace raw write timings with write and busy-wait summaries per level."""
+    uncontended = next((level["write_ms"] for level in levels if level["write_ms"]), [])
+    baseline_ms = summarize(uncontended)["p50_ms"] if uncontended else 0.0
+    for level in levels:
+        write_ms = level.pop("write_ms")
+        level["sqlite_write"] = summarize(write_ms) if write_ms else None
+        busy = [max(0.0, ms - baseline_ms) for ms in write_ms]
+        level["busy_wait"] = summarize(busy) if busy else None
+        if busy:
+            level["busy_wait"]["total_ms"] = sum(busy)
+    return baseline_ms
+
+
+def find_regressions(results, baseline, threshold_pct, min_delta_ms=0.0):
+    """Levels whose p95 latency or throughput moved past threshold_pct, or with new lock errors."""
+    previous_levels = {level["streams"]: level for level in baseline.get("levels", [])}
+    regressions = []
+    for level in results["levels"]:
+        previous = previous_levels.get(level["streams"])
+        if not previous or not level["latency"] or not previous.get("latency"):
+            continue
+        reasons = []
+        p95_delta = level["latency"]["p95_ms"] - previous["latency"]["p95_ms"]
+        if p95_delta > min_delta_ms and p95_delta > previous["latency"]["p95_ms"] * threshold_pct / 100:
+            reasons.append(f"p95 {previous['latency']['p95_ms']:.0f}ms -> {level['latency']['p95_ms']:.0f}ms")
+        if level["throughput_per_s"] < previous["throughput_per_s"] * (1 - threshold_pct / 100):
+            reasons.append(f"throughput {previous['throughput_per_s']:.1f}/s -> {level['throughput_per_s']:.1f}/s")
+        if level["locked_errors"] > previous["locked_errors"]:
+            reasons.append(f"locked errors {previous['locked_errors']} -> {level['locked_errors']}")
+        if reasons:
+            regressions.append({"streams": level["streams"], "reasons": reasons})
+    return regressions
+
+
+def print_results(results):
+    """Pretty print the scaling curve."""
+    print("\n" + "=" * 104)
+    print(f"SQLite contention scaling (uncontended write p50 {results['uncontended_write_ms']:.2f}ms)")
+    print("=" * 104)
+    print(f"{'N':>4} {'calls/s':>9} {'events/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} "
+          f"{'write p95':>10} {'busy p95':>10} {'busy total':>11} {'locked':>7} {'failed':>7}")
+    print("-" * 104)
+    for level in results["levels"]:
+        latency = level["latency"] or {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        write_p95 = level["sqlite_write"]["p95_ms"] if level["sqlite_write"] else 0.0
+        busy = level["busy_wait"] or {"p95_ms": 0.0, "total_ms": 0.0}
+        print(
+            f"{level['streams']:>4} {level['throughput_per_s']:>9.1f} {level['events_per_s']:>9.1f} "
+            f"{latency['p50_ms']:>7.0f}ms {latency['p95_ms']:>7.0f}ms {latency['p99_ms']:>7.0f}ms "
+            f"{write_p95:>8.1f}ms {busy['p95_ms']:>8.1f}ms {busy['total_ms'] / 1000:>10.1f}s "
+            f"{level['locked_errors']:>7} {level['exit_failures']:>7}"
+        )
+        if level["failed"]:
+            print(f"     FAILED: {level['events_written']} events written, "
+                  f"{level['init_failures']} database init failures")
+
+
+def main():
+    """Run the contention benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent hook processes sharing one SQLite store")
+    parser.add_argument("--streams", default="1,2,4,8,16,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run each level")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Mean think time between tool calls")
+    parser.add_argument("--busy-timeout", type=int, help="Override CLAUDE_HOOKS_DB_TIMEOUT (seconds) for the hooks")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file of recorded hook payloads")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter command for the hooks")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for cadences and payload choice")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions")
+    parser.add_argument("--threshold-pct", type=float, default=25.0, help="Allowed p95 or throughput change")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore p95 increases smaller than this")
+    args = parser.parse_args()
+    
+    levels = sorted({int(n) for n in args.streams.split(",") if n.strip()})
+    corpus = load_corpus(args.corpus)
+    python = args.python.split()
+    
+    results = {
+        "git_revision": git_revision(),
+        "duration_s": args.duration,
+        "think_ms": args.think_ms,
+        "busy_timeout_s": args.busy_timeout,
+        "cpu_count": os.cpu_count(),
+        "levels": [],
+    }
+    for streams in levels:
+        print(f"Running {streams} stream(s) for {args.duration:.0f}s...")
+        results["levels"].append(
+            run_level(python, corpus, streams, args.duration, args.think_ms, args.busy_timeout, args.seed)
+        )
+    results["uncontended_write_ms"] = add_busy_wait(results["levels"])
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    failed = [level["streams"] for level in results["levels"] if level["failed"]]
+    if failed:
+        print(f"\nFAILED: hooks wrote no events or could not open the database at N={failed}")
+        sys.exit(1)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold_pct, args.min_delta_ms)
+        for row in regressions:
+            print(f"REGRESSION N={row['streams']}: {'; '.join(row['reasons'])}")
+        if not regressions:
+            print(f"\nNo regressions over {args.threshold_pct:.0f}% against {args.baseline}")
+        # Non-zero exit on regression, for use in CI checks
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
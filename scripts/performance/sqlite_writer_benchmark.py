@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Chronicle SQLite Writer Benchmark
+Measures async insert throughput through the batched SQLite writer task
+at different producer concurrency levels.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Add the hooks app to path so the config package is importable
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'apps', 'hooks'))
+
+try:
+    from config.database import SQLiteClient
+except ImportError as e:
+    print(f"Warning: Could not import config.database: {e}")
+    SQLiteClient = None
+
+
+async def run_producers(producers, total_events, batch_size, batch_interval_ms):
+    """Insert total_events split across producers; return inserts/sec."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = SQLiteClient(
+            os.path.join(tmp_dir, "bench.db"),
+            batch_size=batch_size,
+            batch_interval_ms=batch_interval_ms,
+        )
+        if not await client.connect():
+            raise RuntimeError("Could not open benchmark database")
+
+        session_id = await client.insert('sessions', {
+            'claude_session_id': str(uuid.uuid4()),
+            'project_path': '/bench',
+            'start_time': datetime.now(timezone.utc).isoformat(),
+        })
+
+        per_producer = max(1, total_events // producers)
+
+        async def producer(worker):
+            for i in range(per_producer):
+                await client.insert('events', {
+                    'session_id': session_id,
+                    'event_type': 'pre_tool_use',
+                    'timestamp': datetime.now(timezone.utc).isoformat(),
+                    'data': {'worker': worker, 'index': i},
+                })
+
+        start = time.perf_counter()
+        await asyncio.gather(*(producer(w) for w in range(producers)))
+        elapsed = time.perf_counter() - start
+
+        stats = dict(client.write_stats)
+        await client.disconnect()
+
+    inserted = per_producer * producers
+    return {
+        'producers': producers,
+        'events': inserted,
+        'seconds': round(elapsed, 4),
+        'inserts_per_sec': round(inserted / elapsed, 1) if elapsed else None,
+        'batches': stats['batches'],
+        'avg_batch_size': round(stats['operations'] / stats['batches'], 1) if stats['batches'] else 0,
+    }
+
+
+async def run_benchmark(levels, total_events, batch_size, batch_interval_ms):
+    results = []
+    for producers in levels:
+        result = await run_producers(producers, total_events, batch_size, batch_interval_ms)
+        print(f"{producers:>4} producers: {result['inserts_per_sec']:>10} inserts/sec "
+              f"({result['batches']} batches, avg {result['avg_batch_size']} ops/batch)")
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched SQLite writer")
+    parser.add_argument("--events", type=int, default=2000, help="Events per concurrency level")
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 8, 64],
+                        help="Producer counts to test")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-interval-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if SQLiteClient is None:
+        sys.exit(1)
+
+    print("🚀 SQLite writer benchmark")
+    results = asyncio.run(run_benchmark(
+        args.producers, args.events, args.batch_size, args.batch_interval_ms
+    ))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
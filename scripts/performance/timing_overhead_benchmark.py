@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Chronicle Timing Overhead Benchmark
+Measures the per-call cost of measure_performance and performance_monitor
+in lean timing mode and with memory sampling enabled.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the hooks app to path so the lib package is importable
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'apps', 'hooks'))
+
+try:
+    from src.lib.performance import (
+        measure_performance, performance_monitor, get_performance_collector
+    )
+except ImportError as e:
+    print(f"Warning: Could not import src.lib.performance: {e}")
+    measure_performance = None
+
+
+def time_per_call_us(func, iterations):
+    """Run func iterations times; return mean microseconds per call."""
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations / 1000
+
+
+def run_benchmark(iterations):
+    """Measure each timing mode against an uninstrumented baseline."""
+    def noop():
+        pass
+    
+    baseline_us = time_per_call_us(noop, iterations)
+    results = {"iterations": iterations, "baseline_us": baseline_us, "modes": {}}
+    
+    for mode, track_memory in (("lean", False), ("memory", True)):
+        def context_manager_call():
+            with measure_performance("bench.context", track_memory=track_memory):
+                pass
+        
+        decorated = performance_monitor("bench.decorator", track_memory=track_memory)(noop)
+        
+        results["modes"][mode] = {
+            "measure_performance_us": time_per_call_us(context_manager_call, iterations) - baseline_us,
+            "performance_monitor_us": time_per_call_us(decorated, iterations) - baseline_us,
+        }
+        get_performance_collector().reset_stats()
+    
+    return results
+
+
+def print_results(results):
+    """Pretty print overhead per mode."""
+    print("\n" + "=" * 64)
+    print(f"Timing overhead per call ({results['iterations']} iterations)")
+    print("=" * 64)
+    print(f"{'mode':<10} {'measure_performance':>22} {'performance_monitor':>22}")
+    print("-" * 64)
+    for mode, timings in results["modes"].items():
+        print(
+            f"{mode:<10} {timings['measure_performance_us']:>20.2f}us "
+            f"{timings['performance_monitor_us']:>20.2f}us"
+        )
+    
+    lean = results["modes"]["lean"]["measure_performance_us"]
+    memory = results["modes"]["memory"]["measure_performance_us"]
+    if lean > 0:
+        print(f"\nMemory sampling costs {memory / lean:.1f}x the lean timer")
+
+
+def main():
+    """Run the overhead benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark performance instrumentation overhead")
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per measurement")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    if measure_performance is None:
+        print("Error: performance module not available")
+        sys.exit(1)
+    
+    # Keep the benchmark out of the persistent latency store
+    os.environ["CHRONICLE_PERF_STORE"] = "0"
+    
+    results = run_benchmark(args.iterations)
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()